@@ -4,6 +4,7 @@ from app.auth.schemas import FunctionalRangeIn
 from app.services.user_service import get_current_user
 from bson import ObjectId
 from app.db import functional_ranges_collection
+from app.services.ranges_catalog import ranges_catalog
 
 router = APIRouter(dependencies=[Depends(get_current_user)])
 
@@ -40,6 +41,7 @@ async def add_functional_range(data: FunctionalRangeIn):
     new_doc = data.dict()
     result = await functional_ranges_collection.insert_one(new_doc)
     created = await functional_ranges_collection.find_one({"_id": result.inserted_id})
+    await ranges_catalog.bump_version()
     return {"message": "Functional range added successfully", "id": str(result.inserted_id), "functional_range": functional_range_helper(created)}
 
 # Update Existing Functional Range
@@ -52,6 +54,7 @@ async def update_functional_range(range_id: str, data: FunctionalRangeIn):
     )
     if not updated:
         raise HTTPException(status_code=404, detail="Functional range not found")
+    await ranges_catalog.bump_version()
     return {"message": "Functional range updated successfully"}
 
 # Delete Functional Range
@@ -78,4 +81,5 @@ async def delete_functional_range(range_id: str, force: bool = False):
         )
 
     await functional_ranges_collection.delete_one({"_id": ObjectId(range_id)})
+    await ranges_catalog.bump_version()
     return {"status": "deleted", "id": range_id}
@@ -1,78 +1,126 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
-import re
+from fastapi.responses import StreamingResponse
+import json
+import math
 from typing import List
 
 from fastapi.params import Depends
-from app.services.ocr_service import (
-    ALIASES_MAP,
-    build_empty_lab_reports,
-    call_mistral_ocr,
-    call_mistral_image_ocr,
-    find_value_unit_near,
-    validate_or_fill_unit, 
-)
-from app.utils.constants import CANONICAL_PANELS
-from app.services.user_service import get_current_user
+from app.services.ocr_admission import AdmissionRejected, ocr_admission
+from app.services.ocr_service import OcrExtractionError, run_extraction
+from app.services.ocr_jobs import JobQueueFull, TooManyUserJobs, ocr_jobs
+from app.services.ocr_client import pool_stats
+from app.services.ocr_resilience import ocr_caller
+from app.services.ocr_cache import ocr_cache
+from app.services.upload_spool import spool_upload
+from app.services.user_service import get_current_admin, get_current_user
 
 router = APIRouter(dependencies=[Depends(get_current_user)])
 
 
+def _too_many_requests(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+
+
 @router.post("/extract")
-async def extract_lab_report(files: List[UploadFile] = File(...)):
+async def extract_lab_report(files: List[UploadFile] = File(...), user_id=Depends(get_current_user)):
     """Upload PDFs or images → Extract markers using Mistral OCR."""
     if not files:
         raise HTTPException(status_code=400, detail="No files uploaded")
 
-    full_text = ""
-    lab_reports = build_empty_lab_reports()
-    found_results = {}
-
-    for file in files:
-        filename = file.filename.lower()
-        content = await file.read()
-
-        mime = None
-        if filename.endswith(".pdf"):
-            mime = "application/pdf"
-        elif filename.endswith((".png", ".jpg", ".jpeg", ".webp")):
-            mime = f"image/{filename.split('.')[-1]}"
-        else:
-            raise HTTPException(status_code=400, detail=f"Unsupported file type: {filename}")
-
-        try:
-            if mime.startswith("application"):
-                ocr_data = await call_mistral_ocr(content, mime)
-            else:
-                ocr_data = await call_mistral_image_ocr(content, mime, filename)
-
-            pages = ocr_data.get("pages", [])
-            for page in pages:
-                text = page.get("text") or page.get("markdown", "")
-                full_text += "\n" + text
-        except Exception as e:
-            raise HTTPException(status_code=502, detail=f"OCR processing failed for {filename}: {e}")
-
-    # Extract markers and validated units
-    for alias, canonical in ALIASES_MAP.items():
-        if canonical in found_results:
-            continue
-        if re.search(re.escape(alias), full_text, re.IGNORECASE):
-            val, unit = find_value_unit_near(full_text, alias)
-            unit = validate_or_fill_unit(canonical, unit)
-            found_results[canonical] = {"value": val, "unit": unit}
-
-    # Build final structure
-    for panel, markers in CANONICAL_PANELS.items():
-        for m in markers:
-            data = found_results.get(m) or {"value": None, "unit": None}
-            lab_reports[panel][m] = data
+    uploads = []
+    try:
+        # The multipart body is already parsed by now; admitting before spooling only
+        # spares shed requests the copy into our spool files
+        async with ocr_admission.slot(str(user_id), cost=len(files)):
+            for file in files:
+                uploads.append(await spool_upload(file))
+            return await run_extraction(uploads)
+    except AdmissionRejected as e:
+        raise _too_many_requests(e)
+    except OcrExtractionError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    finally:
+        for upload in uploads:
+            upload.close()
+
+
+@router.post("/jobs", status_code=202)
+async def create_ocr_job(files: List[UploadFile] = File(...), user_id=Depends(get_current_user)):
+    """Queue an OCR extraction and return its job id right away."""
+    if not files:
+        raise HTTPException(status_code=400, detail="No files uploaded")
+
+    uploads = []
+    try:
+        for file in files:
+            uploads.append(await spool_upload(file))
+        job = ocr_jobs.submit(str(user_id), uploads)
+    except JobQueueFull as e:
+        for upload in uploads:
+            upload.close()
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    except TooManyUserJobs as e:
+        for upload in uploads:
+            upload.close()
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    except Exception:
+        for upload in uploads:
+            upload.close()
+        raise
 
     return {
-        "success": True,
-        "lab_reports": lab_reports,
-        "metadata": {
-            "files_processed": len(files),
-            "aliases_loaded": len(ALIASES_MAP),
-            "total_text_length": len(full_text),
-        },
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/ocr/jobs/{job.id}",
+        "events_url": f"/ocr/jobs/{job.id}/events",
     }
+
+
+def _get_user_job(job_id: str, user_id: str):
+    job = ocr_jobs.get(job_id)
+    if not job or job.user_id != str(user_id):
+        raise HTTPException(status_code=404, detail="OCR job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def get_ocr_job(job_id: str, user_id=Depends(get_current_user)):
+    """Current status, per-file/per-page progress and, once finished, the lab_reports result."""
+    return _get_user_job(job_id, user_id).summary()
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_ocr_job_events(job_id: str, user_id=Depends(get_current_user)):
+    """Server-sent events stream of the job's progress, ending with its final result."""
+    job = _get_user_job(job_id, user_id)
+
+    async def event_stream():
+        async for event in ocr_jobs.events(job):
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/pool-stats", dependencies=[Depends(get_current_admin)])
+async def get_ocr_pool_stats():
+    """Connection pool usage of the shared OCR HTTP client, plus retry/breaker/hedging and admission counters (admin only)."""
+    return {**pool_stats(), "resilience": ocr_caller.snapshot(), "admission": ocr_admission.snapshot()}
+
+
+@router.get("/cache/stats", dependencies=[Depends(get_current_admin)])
+async def get_ocr_cache_stats():
+    """Hit/miss counters of the OCR result cache (admin only)."""
+    return ocr_cache.snapshot()
+
+
+@router.delete("/cache", dependencies=[Depends(get_current_admin)])
+async def purge_ocr_cache():
+    """Drop every cached OCR result (admin only)."""
+    deleted = await ocr_cache.purge()
+    return {"message": "OCR cache purged", "deleted": deleted}
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import StreamingResponse
 from datetime import datetime
-from app.auth.schemas import ReportRequest
+from app.auth.schemas import BatchReportRequest, ReportRequest
+from app.config import settings
+from app.services.report_batch import generate_medical_reports
 from app.services.report_service import generate_medical_report, create_lab_report_pdf
 from app.services.user_service import get_current_user
 from app.utils.logger import setup_logging
@@ -41,6 +43,19 @@ async def generate_report(request: ReportRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/generate-reports")
+async def generate_reports(batch: BatchReportRequest):
+    """Structured reports (no PDFs, not saved) for many submissions at once, e.g. a clinic partner's patients."""
+    if len(batch.requests) > settings.REPORT_BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {settings.REPORT_BATCH_MAX_REQUESTS} requests per batch"
+        )
+    logger.info(f"Received batch report request: {len(batch.requests)} submissions")
+    try:
+        return {"reports": await generate_medical_reports(batch.requests)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/my-reports")
 async def get_my_reports(user_id=Depends(get_current_user)):
     try:
@@ -48,6 +48,9 @@ class ReportRequest(BaseModel):
     lab_upload_option: str
     lab_reports: Dict[str, Dict[str, Marker]]
 
+class BatchReportRequest(BaseModel):
+    requests: List[ReportRequest]
+
 class SupplementModel(BaseModel):
     name: str
     productLink: Optional[str] = None
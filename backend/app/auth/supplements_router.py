@@ -4,6 +4,7 @@ from app.auth.schemas import SupplementModel
 from app.services.user_service import get_current_user
 from bson import ObjectId
 from app.db import supplements_collection, functional_ranges_collection
+from app.services.ranges_catalog import ranges_catalog
 
 router = APIRouter(dependencies=[Depends(get_current_user)])
 
@@ -44,6 +45,7 @@ async def add_supplement(data: SupplementModel):
     new_supp = data.dict()
     new_supp["_id"] = f"supplement_{ObjectId()}"  
     await supplements_collection.insert_one(new_supp)
+    await ranges_catalog.bump_version()
     return {"message": "Supplement added successfully", "id": new_supp["_id"]}
 
 # Update Existing Supplement
@@ -56,6 +58,7 @@ async def update_supplement(supplement_id: str, data: SupplementModel):
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Supplement not found")
+    await ranges_catalog.bump_version()
     return {"message": "Supplement updated successfully"}
 
 @router.delete("/delete/{supplement_id}")
@@ -80,6 +83,7 @@ async def delete_supplement(supplement_id: str):
         {"ifHigh.supplements": supplement_id},
         {"$pull": {"ifHigh.supplements": supplement_id}}
     )
+    await ranges_catalog.bump_version()
 
     return {
         "message": "Supplement deactivated and references removed from functional ranges."
@@ -27,6 +27,103 @@ class Settings(BaseSettings):
     GOOGLE_CLIENT_SECRET: str
     SESSION_SECRET: str
     MISTRAL_API_KEY: str
+
+    # OCR fan-out: files OCR'd at once per upload, and across the whole process
+    OCR_MAX_CONCURRENCY_PER_REQUEST: int = 3
+    OCR_MAX_CONCURRENCY_GLOBAL: int = 8
+
+    # OCR endpoint; defaults to Mistral, point it at benchmarks/fake_ocr_server.py for offline load tests
+    OCR_API_URL: str | None = None
+
+    # Shared OCR HTTP client (connection pool + timeouts, seconds)
+    OCR_HTTP_MAX_CONNECTIONS: int = 20
+    OCR_HTTP_MAX_KEEPALIVE: int = 10
+    OCR_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    OCR_HTTP2: bool = False
+    OCR_HTTP_CONNECT_TIMEOUT: float = 10.0
+    OCR_HTTP_READ_TIMEOUT: float = 120.0
+    OCR_HTTP_WRITE_TIMEOUT: float = 60.0
+    OCR_HTTP_POOL_TIMEOUT: float = 30.0
+    # Skip embedded image payloads and stream-parse only page text out of OCR responses
+    OCR_LEAN_RESPONSE: bool = True
+
+    # OCR resilience: retries (seconds), circuit breaker, size-based deadline, hedging (0 = off)
+    OCR_RETRY_MAX_ATTEMPTS: int = 3
+    OCR_RETRY_BASE_DELAY: float = 0.5
+    OCR_RETRY_MAX_DELAY: float = 10.0
+    OCR_BREAKER_FAILURE_THRESHOLD: int = 5
+    OCR_BREAKER_RESET_SECONDS: float = 30.0
+    OCR_DEADLINE_BASE_SECONDS: float = 20.0
+    OCR_DEADLINE_PER_MB_SECONDS: float = 6.0
+    OCR_DEADLINE_MAX_SECONDS: float = 120.0
+    OCR_HEDGE_AFTER_SECONDS: float = 0.0
+
+    # OCR result cache (in-memory LRU in front of the ocr_cache collection)
+    OCR_CACHE_ENABLED: bool = True
+    OCR_CACHE_MAX_ENTRIES: int = 256
+    OCR_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    OCR_CACHE_GENERATION_CHECK_SECONDS: float = 2.0  # how stale a purge on another worker may be seen
+
+    # Uploads are spooled to disk past OCR_SPOOL_MEMORY_BYTES and rejected past OCR_MAX_UPLOAD_BYTES
+    OCR_MAX_UPLOAD_BYTES: int = 25 * 1024 * 1024
+    OCR_SPOOL_MEMORY_BYTES: int = 1024 * 1024
+
+    # Marker extraction over more text than this (chars) runs in a worker thread
+    OCR_EXTRACT_THREAD_THRESHOLD: int = 200_000
+    # Markers with no exact alias match get a bounded-edit-distance lookup (OCR typos)
+    OCR_FUZZY_MATCHING_ENABLED: bool = True
+    # lab_test_aliases.json is checked this often (seconds) and hot-reloaded when it changes; 0 disables
+    OCR_ALIASES_RELOAD_SECONDS: float = 5.0
+
+    # PDF pages whose embedded text layer has at least this many alphanumerics skip remote OCR
+    OCR_TEXT_LAYER_ENABLED: bool = True
+    OCR_TEXT_LAYER_MIN_CHARS: int = 50
+
+    # PDFs with at least OCR_PDF_SPLIT_MIN_PAGES pages to OCR are split locally and OCR'd chunk by chunk in parallel
+    OCR_PDF_SPLIT_ENABLED: bool = True
+    OCR_PDF_SPLIT_MIN_PAGES: int = 8
+    OCR_PDF_CHUNK_PAGES: int = 4
+    OCR_PDF_CHUNK_CONCURRENCY: int = 4
+
+    # Images / scanned PDF pages within this many of 1024 perceptual-hash bits of an earlier page, and whose
+    # thumbnails differ by at most OCR_DEDUPE_MAX_TILE_DIFF grey levels per 8×8 tile, are not OCR'd again
+    OCR_DEDUPE_ENABLED: bool = False
+    OCR_DEDUPE_MAX_DISTANCE: int = 8
+    OCR_DEDUPE_MAX_TILE_DIFF: int = 12
+    OCR_DEDUPE_MAX_PDF_PAGES: int = 60
+
+    # Photos are downscaled/grayscaled/re-encoded on a thread pool before upload to OCR
+    OCR_IMAGE_PREPROCESS_ENABLED: bool = True
+    OCR_IMAGE_MAX_SIDE: int = 2000
+    OCR_IMAGE_GRAYSCALE: bool = True
+    OCR_IMAGE_JPEG_QUALITY: int = 85
+    OCR_IMAGE_WORKERS: int = 2
+
+    # Asynchronous OCR jobs (/ocr/jobs): in-process worker pool
+    OCR_JOB_WORKERS: int = 4
+    OCR_JOB_QUEUE_SIZE: int = 100
+    OCR_JOB_MAX_PER_USER: int = 5  # queued + running jobs one user may hold
+    OCR_JOB_RETENTION_SECONDS: int = 3600
+    OCR_JOB_SHUTDOWN_GRACE_SECONDS: float = 60.0
+
+    # Admission control for OCR work; "mongo" shares the budget across uvicorn workers
+    OCR_ADMISSION_ENABLED: bool = True
+    OCR_ADMISSION_STORE: str = "local"
+    OCR_ADMISSION_MAX_CONCURRENT: int = 16
+    OCR_ADMISSION_PER_USER_CONCURRENT: int = 2
+    OCR_ADMISSION_RATE_PER_SECOND: float = 5.0  # files admitted per second, all users
+    OCR_ADMISSION_BURST: float = 20.0
+    OCR_ADMISSION_QUEUE_SIZE: int = 50
+    OCR_ADMISSION_PER_USER_QUEUE: int = 3
+    OCR_ADMISSION_MAX_WAIT_SECONDS: float = 30.0
+    OCR_ADMISSION_LEASE_SECONDS: float = 300.0  # a crashed worker's slots free up after this
+
+    # Workers poll the functional ranges catalog version this often (seconds) and reload on change
+    RANGES_CATALOG_POLL_SECONDS: float = 2.0
+    # report_rules.json is checked this often (seconds) and recompiled when it changes; 0 disables
+    REPORT_RULES_RELOAD_SECONDS: float = 5.0
+    # Largest batch /report/generate-reports evaluates in one call
+    REPORT_BATCH_MAX_REQUESTS: int = 1000
     class Config:
         env_file = constants.ENV_FILE
 
@@ -6,4 +6,7 @@ client = AsyncIOMotorClient(settings.MONGO_URI)
 db = client[constants.DB_NAME]
 functional_ranges_collection = db["functional_ranges"]
 supplements_collection = db["supplements"]
-reports_collection = db["reports"]
\ No newline at end of file
+reports_collection = db["reports"]
+ocr_cache_collection = db["ocr_cache"]
+ocr_admission_collection = db["ocr_admission"]
+catalog_meta_collection = db["catalog_meta"]
@@ -54,6 +54,12 @@ from app.auth.report_router import router as report_router
 from app.auth.supplements_router import router as supplements_router
 from app.auth.functional_ranges_router import router as ranges_router
 from app.auth.ocr_router import router as ocr_router
+from app.services.ocr_client import start_ocr_client, close_ocr_client
+from app.services.ocr_cache import ocr_cache
+from app.services.ocr_jobs import ocr_jobs
+from app.services.alias_tables import alias_tables_watcher
+from app.services.ranges_catalog import ranges_catalog
+from app.services.report_rules import report_rules_watcher
 
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
 app.include_router(google_router)
@@ -69,6 +75,26 @@ async def _startup():
                 settings.MAIL_SERVER, settings.MAIL_PORT,
                 settings.MAIL_FROM, settings.MAIL_SUPPRESS_SEND)
     app.state.email_service = EmailService()
+    await start_ocr_client()
+    try:
+        await ocr_cache.ensure_indexes()
+    except Exception as e:
+        logger.warning("Could not create OCR cache TTL index: %s", e)
+    ocr_jobs.start()
+    alias_tables_watcher.start()
+    report_rules_watcher.start()
+    await ranges_catalog.start()
+
+
+@app.on_event("shutdown")
+async def _shutdown():
+    # Drain in-flight OCR jobs before the shared client goes away
+    await ocr_jobs.shutdown(settings.OCR_JOB_SHUTDOWN_GRACE_SECONDS)
+    await close_ocr_client()
+    await alias_tables_watcher.stop()
+    await report_rules_watcher.stop()
+    await ranges_catalog.stop()
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Bloodwork AI API!"}
@@ -0,0 +1,113 @@
+import re
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+_NORMALIZED_RUN = re.compile(r"[a-z0-9]+")
+
+
+def normalize_with_offsets(text: str) -> Tuple[str, List[int]]:
+    """
+    Normalize text the same way aliases are normalized (lowercase, a-z0-9 only)
+    and return, for every normalized character, its index in the original text.
+    """
+    if not text:
+        return "", []
+
+    lowered = text.lower()
+    parts: List[str] = []
+    offsets: List[int] = []
+
+    if len(lowered) == len(text):
+        for run in _NORMALIZED_RUN.finditer(lowered):
+            parts.append(run.group())
+            offsets.extend(range(run.start(), run.end()))
+        return "".join(parts), offsets
+
+    # Rare case: lowercasing changed the length (e.g. "İ"), map char by char.
+    for idx, ch in enumerate(text):
+        for low in ch.lower():
+            if "a" <= low <= "z" or "0" <= low <= "9":
+                parts.append(low)
+                offsets.append(idx)
+    return "".join(parts), offsets
+
+
+class AliasMatcher:
+    """
+    Aho-Corasick automaton over normalized aliases.
+
+    Built once from the alias map, it reports every (possibly overlapping)
+    alias occurrence in a single scan, so matching cost depends on the text
+    length rather than on aliases × text length.
+    """
+
+    def __init__(self, aliases: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        self.size = 0
+
+        for alias in aliases:
+            if alias:
+                self._add(alias)
+        self._build_failure_links()
+
+    def _add(self, alias: str) -> None:
+        node = 0
+        for ch in alias:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        if alias not in self._out[node]:
+            self._out[node].append(alias)
+            self.size += 1
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                # Inherit outputs of the suffix state so lookups need no chain walk
+                self._out[child].extend(a for a in self._out[self._fail[child]] if a not in self._out[child])
+
+    def iter_matches(self, normalized: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield (start, end, alias) for every alias occurrence in normalized text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for idx, ch in enumerate(normalized):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                end = idx + 1
+                for alias in out[node]:
+                    yield end - len(alias), end, alias
+
+    def first_occurrences(self, text: str) -> Dict[str, Tuple[int, int]]:
+        """
+        Map each alias found in text to the (start, end) span of its first
+        occurrence, expressed as offsets into the original (unnormalized) text.
+        Matches must start at a word boundary, since normalization removes the
+        separators between words.
+        """
+        normalized, offsets = normalize_with_offsets(text)
+        found: Dict[str, Tuple[int, int]] = {}
+        for start, end, alias in self.iter_matches(normalized):
+            if alias in found:
+                continue
+            begin = offsets[start]
+            if begin and text[begin - 1].isalnum():
+                continue
+            found[alias] = (begin, offsets[end - 1] + 1)
+        return found
@@ -0,0 +1,193 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.alias_matcher import AliasMatcher
+from app.services.fuzzy_alias import FuzzyAliasIndex
+
+logger = logging.getLogger(__name__)
+
+ALIASES_JSON_PATH = Path(__file__).resolve().parent.parent / "lab_test_aliases.json"
+
+_UNIT_STRIP = re.compile(r"[^a-z0-9%µμ]")
+
+
+def normalize(s: Optional[str]) -> str:
+    """Normalize string for matching."""
+    if not s:
+        return ""
+    return re.sub(r"[^a-z0-9]", "", s.lower())
+
+
+def normalize_unit(u: str) -> str:
+    return _UNIT_STRIP.sub("", u.lower())
+
+
+@dataclass(frozen=True)
+class AliasTables:
+    """
+    One immutable, versioned generation of the alias/unit lookup tables.
+    A reload builds a new instance and swaps the module reference, so a caller
+    holding an instance sees consistent tables for its whole extraction.
+    """
+
+    version: str
+    aliases_map: Dict[str, str]  # normalized alias → canonical
+    canonical_units: Dict[str, List[str]]  # canonical → allowed units, as written in the file
+    unit_lookup: Dict[str, Dict[str, str]]  # canonical → normalized unit → allowed unit
+    matcher: AliasMatcher = field(repr=False)
+    fuzzy: FuzzyAliasIndex = field(repr=False)
+    loaded_at: float = 0.0
+
+    def canonical_unit(self, canonical: str, detected_unit: Optional[str]) -> Optional[str]:
+        """
+        Validate detected unit against known allowed units.
+        - If valid → return normalized version
+        - If invalid → return None
+        - If missing but canonical has only one valid unit → auto-fill that one
+        """
+        allowed_units = self.canonical_units.get(canonical)
+        if not allowed_units:
+            return detected_unit  # No validation data available
+
+        if detected_unit:
+            return self.unit_lookup[canonical].get(normalize_unit(detected_unit))
+
+        if len(allowed_units) == 1:
+            return allowed_units[0]
+        return None
+
+
+def build_alias_tables(data: Dict, version: str) -> AliasTables:
+    alias_map: Dict[str, str] = {}
+    canonical_units: Dict[str, List[str]] = {}
+    unit_lookup: Dict[str, Dict[str, str]] = {}
+
+    for item in data.get("labTests", []):
+        canonical = item.get("officialName")
+        if not canonical:
+            continue
+
+        alias_map[normalize(canonical)] = canonical
+        for alias in item.get("aliases", []):
+            alias_map[normalize(alias)] = canonical
+
+        units = [u.strip() for u in item.get("units", []) if u.strip()]
+        canonical_units[canonical] = units
+        lookup: Dict[str, str] = {}
+        for unit in units:
+            lookup.setdefault(normalize_unit(unit), unit)  # first spelling wins, as before
+        unit_lookup[canonical] = lookup
+
+    return AliasTables(
+        version=version,
+        aliases_map=alias_map,
+        canonical_units=canonical_units,
+        unit_lookup=unit_lookup,
+        matcher=AliasMatcher(alias_map),
+        fuzzy=FuzzyAliasIndex(alias_map),
+        loaded_at=time.time(),
+    )
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_alias_tables(path: Path = ALIASES_JSON_PATH) -> AliasTables:
+    """
+    Load the tables from the aliases JSON file. The version is a hash of the
+    file contents, so every worker reports the same version for the same file.
+    """
+    raw = path.read_bytes()
+    tables = build_alias_tables(json.loads(raw), hashlib.sha256(raw).hexdigest()[:12])
+    logger.info(
+        "Loaded alias tables %s: %s aliases, %s canonical unit sets",
+        tables.version, len(tables.aliases_map), len(tables.canonical_units),
+    )
+    return tables
+
+
+def _initial_tables() -> AliasTables:
+    try:
+        return load_alias_tables()
+    except FileNotFoundError:
+        logger.warning("Aliases file not found at %s", ALIASES_JSON_PATH)
+    except Exception as e:
+        logger.error("Failed to load aliases JSON: %s", e)
+    return build_alias_tables({}, "empty")
+
+
+_signature = _file_signature(ALIASES_JSON_PATH)
+_current = _initial_tables()
+
+
+def current_tables() -> AliasTables:
+    """The alias/unit tables in effect right now; grab once per extraction."""
+    return _current
+
+
+def reload_if_changed() -> bool:
+    """
+    Rebuild and swap the tables when the aliases file's mtime/size changed.
+    A file that fails to parse (e.g. caught mid-write) keeps the old tables.
+    Blocking; run it in a thread.
+    """
+    global _current, _signature
+    signature = _file_signature(ALIASES_JSON_PATH)
+    if signature is None or signature == _signature:
+        return False
+    try:
+        tables = load_alias_tables(ALIASES_JSON_PATH)
+    except Exception as e:
+        logger.warning("Keeping alias tables %s; reload failed: %s", _current.version, e)
+        return False
+    _signature = signature
+    if tables.version != _current.version:
+        _current = tables  # single reference swap
+        return True
+    return False
+
+
+class AliasTablesWatcher:
+    """Polls the aliases file and hot-swaps the tables when it changes."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run(), name="alias-tables-watcher")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(reload_if_changed)
+            except Exception:
+                logger.exception("Alias tables reload check failed")
+
+
+alias_tables_watcher = AliasTablesWatcher(settings.OCR_ALIASES_RELOAD_SECONDS)
@@ -0,0 +1,124 @@
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+# Aliases shorter than this (e.g. "k", "na", "hb") are only ever matched exactly
+MIN_FUZZY_LENGTH = 5
+
+
+class FuzzyMatch(NamedTuple):
+    alias: str
+    distance: int
+    confidence: float
+
+
+def max_edits(length: int) -> int:
+    """Edit budget for a normalized term of this length."""
+    if length < MIN_FUZZY_LENGTH:
+        return 0
+    return 1 if length < 9 else 2
+
+
+def _bigrams(s: str) -> Counter:
+    padded = f"^{s}$"
+    return Counter(padded[i:i + 2] for i in range(len(padded) - 1))
+
+
+def bounded_levenshtein(a: str, b: str, limit: int) -> Optional[int]:
+    """Edit distance between a and b, or None as soon as it must exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= limit else None
+
+
+class FuzzyAliasIndex:
+    """
+    Bigram index over normalized aliases for OCR-typo tolerant lookups
+    ("hemog1obin" → "hemoglobin").
+
+    A term within k edits of an alias shares at least max(len) + 1 - 2k padded
+    bigrams with it, so only aliases passing that count (and the length filter)
+    reach the bounded edit-distance check. The work per lookup depends on the
+    term's bigrams and their posting lists, not on the size of the alias file.
+
+    `aliases` maps each alias to its canonical marker (a plain iterable makes
+    every alias its own marker). A term equally close to aliases of two
+    markers is ambiguous and does not match, and a match must keep the alias's
+    last character: that is where near-identical names differ ("Vitamin A" /
+    "Vitamin D", "Total T3" / "Total T4", "IgA" / "IgG").
+    """
+
+    def __init__(self, aliases: Iterable[str], min_confidence: float = 0.0, memo_size: int = 4096):
+        self.min_confidence = min_confidence
+        canonical_of = aliases if isinstance(aliases, Mapping) else dict.fromkeys(aliases)
+        self._aliases: List[str] = []
+        self._canonicals: List[Optional[str]] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for alias, canonical in canonical_of.items():
+            if len(alias) < MIN_FUZZY_LENGTH:
+                continue
+            alias_id = len(self._aliases)
+            self._aliases.append(alias)
+            self._canonicals.append(alias if canonical is None else canonical)
+            for gram, count in _bigrams(alias).items():
+                self._postings[gram].append((alias_id, count))
+        self._memo: Dict[str, Optional[FuzzyMatch]] = {}
+        self._memo_size = memo_size
+
+    def __len__(self) -> int:
+        return len(self._aliases)
+
+    def search(self, term: str) -> Optional[FuzzyMatch]:
+        """
+        Closest alias within the edit budget for a normalized term (shortest
+        distance, then longest alias), or None when aliases of another marker
+        are just as close; candidates below min_confidence never match.
+        """
+        if term in self._memo:
+            return self._memo[term]
+        match = self._search(term)
+        if len(self._memo) >= self._memo_size:
+            self._memo.clear()
+        self._memo[term] = match
+        return match
+
+    def _search(self, term: str) -> Optional[FuzzyMatch]:
+        limit = max_edits(len(term))
+        if not limit:
+            return None
+
+        shared: Dict[int, int] = defaultdict(int)
+        for gram, count in _bigrams(term).items():
+            for alias_id, alias_count in self._postings.get(gram, ()):
+                shared[alias_id] += min(count, alias_count)
+
+        best: Optional[FuzzyMatch] = None
+        best_canonicals = set()
+        for alias_id, common in shared.items():
+            alias = self._aliases[alias_id]
+            budget = min(limit, max_edits(len(alias)))
+            if alias[-1] != term[-1] or abs(len(alias) - len(term)) > budget:
+                continue
+            if common < max(len(alias), len(term)) + 1 - 2 * budget:
+                continue
+            distance = bounded_levenshtein(term, alias, budget)
+            if distance is None:
+                continue
+            confidence = round(1 - distance / max(len(alias), len(term)), 3)
+            if confidence < self.min_confidence:
+                continue
+            if best is None or distance < best.distance:
+                best_canonicals = set()
+            elif distance > best.distance:
+                continue
+            best_canonicals.add(self._canonicals[alias_id])
+            if best is None or (distance, -len(alias)) < (best.distance, -len(best.alias)):
+                best = FuzzyMatch(alias, distance, confidence)
+        return best if len(best_canonicals) == 1 else None
@@ -0,0 +1,66 @@
+import asyncio
+import io
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple
+
+from app.config import settings
+from app.services.upload_spool import SpooledUpload
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # optional: without Pillow images are sent unchanged
+    Image = ImageOps = None
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=settings.OCR_IMAGE_WORKERS, thread_name_prefix="ocr-image")
+
+
+def _shrink(upload: SpooledUpload) -> Tuple[bytes, Dict]:
+    """Downscale, optionally grayscale, drop EXIF and re-encode as JPEG. Blocking."""
+    max_side = settings.OCR_IMAGE_MAX_SIDE
+    upload.fileobj.seek(0)
+    img = Image.open(upload.fileobj)
+    original_size = img.size
+    if img.format == "JPEG":
+        # Let the JPEG decoder downscale by powers of two while decoding
+        img.draft("L" if settings.OCR_IMAGE_GRAYSCALE else "RGB", (max_side, max_side))
+
+    img = ImageOps.exif_transpose(img)  # bake in the orientation before EXIF is dropped
+    img = img.convert("L" if settings.OCR_IMAGE_GRAYSCALE else "RGB")
+    img.thumbnail((max_side, max_side), Image.LANCZOS)
+
+    out = io.BytesIO()
+    img.save(out, format="JPEG", quality=settings.OCR_IMAGE_JPEG_QUALITY, optimize=True)
+    return out.getvalue(), {"original_size": list(original_size), "processed_size": list(img.size)}
+
+
+async def preprocess_image(upload: SpooledUpload) -> Tuple[SpooledUpload, Dict]:
+    """
+    Shrink an image upload before OCR on the image thread pool.
+    Returns the upload to send (the original when shrinking does not help)
+    and a report of bytes saved and time spent.
+    """
+    report = {"original_bytes": upload.size, "processed_bytes": upload.size, "bytes_saved": 0, "preprocess_ms": 0.0}
+    if Image is None or not settings.OCR_IMAGE_PREPROCESS_ENABLED:
+        return upload, report
+
+    started = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        data, sizes = await loop.run_in_executor(_executor, _shrink, upload)
+    except Exception as e:
+        logger.info("Image pre-processing skipped for %s: %s", upload.filename, e)
+        return upload, report
+    report["preprocess_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    report.update(sizes)
+
+    if len(data) >= upload.size:
+        return upload, report
+
+    name = os.path.splitext(upload.filename)[0] + ".jpg"
+    report.update({"processed_bytes": len(data), "bytes_saved": upload.size - len(data)})
+    return SpooledUpload.from_bytes(name, "image/jpeg", data), report
@@ -0,0 +1,124 @@
+import re
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# GFM delimiter cell: one or more dashes, optionally colon-aligned ("|-|:--|--:|")
+_SEPARATOR_CELL = re.compile(r"^\s*:?-+:?\s*$")
+_NUMBER = re.compile(r"[-+]?\d*\.?\d+")
+
+# Header words that identify a column's role, checked in this order. Quest-style
+# reports split the result over "In Range" / "Out Of Range" columns.
+_COLUMN_ROLES = (
+    ("value", ("in range", "out of range")),
+    ("unit", ("unit",)),
+    ("range", ("reference", "range", "interval", "normal")),
+    ("flag", ("flag", "status")),
+    ("value", ("result", "value", "observed", "level")),
+    ("test", ("test", "name", "analyte", "parameter", "investigation", "component", "marker")),
+)
+
+
+class TableRow(NamedTuple):
+    test: str
+    value: Optional[float]
+    unit: Optional[str]
+
+
+def _split_cells(line: str) -> List[str]:
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|"):
+        line = line[:-1]
+    return [cell.strip() for cell in line.split("|")]
+
+
+def _is_separator(cells: List[str]) -> bool:
+    return all(_SEPARATOR_CELL.match(c) for c in cells if c) and any(cells)
+
+
+def _column_roles(header: List[str]) -> Dict[str, List[int]]:
+    """Columns per role, in header order; each column takes the first role its name matches."""
+    roles: Dict[str, List[int]] = defaultdict(list)
+    for col, name in enumerate(header):
+        name = name.lower()
+        for role, words in _COLUMN_ROLES:
+            if any(w in name for w in words):
+                roles[role].append(col)
+                break
+    return roles
+
+
+def _parse_number(cell: str) -> Tuple[Optional[float], str]:
+    """First number in a cell, and the text after it."""
+    m = _NUMBER.search(cell)
+    if not m:
+        return None, cell
+    try:
+        return float(m.group()), cell[m.end():].strip()
+    except ValueError:
+        return None, cell
+
+
+def _first_number_col(cells: List[str], cols) -> Optional[int]:
+    return next((c for c in cols if c < len(cells) and _parse_number(cells[c])[0] is not None), None)
+
+
+def _table_rows(header: Optional[List[str]], body: List[List[str]]) -> List[TableRow]:
+    roles = _column_roles(header) if header else {}
+    test_col = roles["test"][0] if roles.get("test") else 0
+    claimed = {col for cols in roles.values() for col in cols}
+    rows = []
+    for cells in body:
+        if test_col >= len(cells) or not cells[test_col]:
+            continue
+
+        if roles.get("value"):
+            value_col = _first_number_col(cells, roles["value"])
+        else:
+            # No result column in the header: the first numeric cell after the test
+            # name that no other role (range, unit, flag) claims
+            value_col = _first_number_col(cells, [c for c in range(test_col + 1, len(cells)) if c not in claimed])
+        if value_col is None:
+            continue  # no result in this row; a guess could be a reference range
+        value, rest = _parse_number(cells[value_col])
+
+        unit_cols = roles.get("unit")
+        if unit_cols and unit_cols[0] < len(cells):
+            unit = cells[unit_cols[0]] or None
+        else:
+            # Unit written in the result cell ("5.4 mg/dL") or in the next column
+            unit = rest.split()[0] if rest else None
+            if unit is None and header is None and value_col + 1 < len(cells):
+                unit = cells[value_col + 1].split()[0] if cells[value_col + 1] else None
+        rows.append(TableRow(cells[test_col], value, unit))
+    return rows
+
+
+def split_tables(text: str) -> Tuple[List[TableRow], str]:
+    """
+    Read every markdown table in an OCR page into rows of (test, value, unit),
+    one pass over the lines. Returns the rows in page order and the page text
+    with the table lines removed, for the free-text heuristics.
+    """
+    rows: List[TableRow] = []
+    remainder: List[str] = []
+    block: List[List[str]] = []
+
+    def flush() -> None:
+        if not block:
+            return
+        if len(block) >= 2 and _is_separator(block[1]):
+            rows.extend(_table_rows(block[0], block[2:]))
+        else:
+            rows.extend(_table_rows(None, [cells for cells in block if not _is_separator(cells)]))
+        block.clear()
+
+    for line in text.splitlines():
+        if line.lstrip().startswith("|") and line.count("|") >= 2:
+            block.append(_split_cells(line))
+            continue
+        flush()
+        remainder.append(line)
+    flush()
+    return rows, "\n".join(remainder)
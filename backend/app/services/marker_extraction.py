@@ -0,0 +1,67 @@
+import re
+from bisect import bisect_left
+from typing import List, NamedTuple, Optional, Tuple
+
+NUMBER, UNIT, WORD = "number", "unit", "word"
+
+# Numbers, and terms (words/units) that start with a letter or unit symbol
+_TOKEN_RE = re.compile(r"(?P<number>[-+]?\d*\.?\d+)|(?P<term>[A-Za-z%µμ×\^][\w%µμ×\^\-/.]*)")
+_UNIT_CHARS = frozenset("/%µμ×^")
+
+# How far after an alias a value may start (same window as the legacy snippet scan)
+VALUE_WINDOW = 100
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+    start: int
+    end: int
+
+
+def tokenize(text: str) -> List[Token]:
+    """Split one OCR page into number, unit and word tokens with their offsets."""
+    tokens = []
+    for m in _TOKEN_RE.finditer(text):
+        if m.lastgroup == "number":
+            kind = NUMBER
+        else:
+            term = m.group()
+            kind = UNIT if any(ch in _UNIT_CHARS for ch in term) else WORD
+        tokens.append(Token(kind, m.group(), m.start(), m.end()))
+    return tokens
+
+
+class PageIndex:
+    """A page tokenized once, with an offset index over its number tokens."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = tokenize(text)
+        self._numbers = [i for i, t in enumerate(self.tokens) if t.kind == NUMBER]
+        self._number_starts = [self.tokens[i].start for i in self._numbers]
+
+    def value_unit_after(self, offset: int, window: int = VALUE_WINDOW) -> Tuple[Optional[float], Optional[str]]:
+        """
+        First number starting within `window` chars after offset, and the term
+        right after it as the candidate unit.
+        """
+        pos = bisect_left(self._number_starts, offset)
+        if pos == len(self._numbers):
+            return None, None
+        idx = self._numbers[pos]
+        token = self.tokens[idx]
+        if token.start >= offset + window:
+            return None, None
+
+        try:
+            value = float(token.text)
+        except ValueError:
+            return None, None
+
+        unit = None
+        if idx + 1 < len(self.tokens):
+            nxt = self.tokens[idx + 1]
+            if nxt.kind != NUMBER and nxt.start < offset + window:
+                unit = nxt.text
+        return value, unit
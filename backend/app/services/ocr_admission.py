@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+
+from app.config import settings
+from app.db import ocr_admission_collection
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SCOPE = "global"
+
+
+class AdmissionRejected(Exception):
+    """Raised when OCR work cannot be admitted; carries a Retry-After hint in seconds."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LocalAdmissionStore:
+    """In-process stand-in for the shared store (single worker, dev, tests)."""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._slots: Dict[str, Dict[str, float]] = {}
+
+    async def take_tokens(self, key: str, cost: float, rate: float, capacity: float) -> Tuple[bool, float]:
+        now = time.time()
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        granted = tokens >= cost
+        self._buckets[key] = (tokens - cost if granted else tokens, now)
+        return granted, 0.0 if granted else (cost - tokens) / rate
+
+    async def acquire_slot(self, scope: str, limit: int, holder: str, ttl: float) -> bool:
+        now = time.time()
+        held = {h: exp for h, exp in self._slots.get(scope, {}).items() if exp > now}
+        self._slots[scope] = held
+        if len(held) >= limit:
+            return False
+        held[holder] = now + ttl
+        return True
+
+    async def renew_slot(self, scope: str, holder: str, ttl: float) -> None:
+        held = self._slots.get(scope, {})
+        if holder in held:
+            held[holder] = time.time() + ttl
+
+    async def release_slot(self, scope: str, holder: str) -> None:
+        self._slots.get(scope, {}).pop(holder, None)
+
+
+class MongoAdmissionStore:
+    """
+    Store shared by every uvicorn worker. Token buckets are refilled and
+    debited in one atomic pipeline update; concurrency slots are `limit`
+    documents per scope claimed with find_one_and_update. Holders renew their
+    lease while working, so only a slot whose lease expired (crashed worker)
+    can be claimed again.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self._ensured: Dict[str, int] = {}
+
+    async def take_tokens(self, key: str, cost: float, rate: float, capacity: float) -> Tuple[bool, float]:
+        now = time.time()
+        refilled = {"$min": [capacity, {"$add": [
+            {"$ifNull": ["$tokens", capacity]},
+            {"$multiply": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, rate]},
+        ]}]}
+        doc = await self.collection.find_one_and_update(
+            {"_id": f"bucket:{key}"},
+            [
+                {"$set": {"refilled": refilled}},
+                {"$set": {
+                    "granted": {"$gte": ["$refilled", cost]},
+                    "tokens": {"$cond": [{"$gte": ["$refilled", cost]}, {"$subtract": ["$refilled", cost]}, "$refilled"]},
+                    "updated_at": now,
+                }},
+                {"$unset": "refilled"},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc["granted"]:
+            return True, 0.0
+        return False, (cost - doc["tokens"]) / rate
+
+    async def _ensure_slots(self, scope: str, limit: int) -> None:
+        if self._ensured.get(scope) == limit:
+            return
+        docs = [{"_id": f"slot:{scope}:{i}", "scope": scope, "holder": None, "expires_at": datetime.now(timezone.utc)} for i in range(limit)]
+        try:
+            await self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError:
+            pass  # slots created earlier by this or another worker
+        self._ensured[scope] = limit
+
+    async def acquire_slot(self, scope: str, limit: int, holder: str, ttl: float) -> bool:
+        await self._ensure_slots(scope, limit)
+        now = datetime.now(timezone.utc)
+        doc = await self.collection.find_one_and_update(
+            {
+                "scope": scope,
+                "_id": {"$in": [f"slot:{scope}:{i}" for i in range(limit)]},
+                "$or": [{"holder": None}, {"expires_at": {"$lt": now}}],
+            },
+            {"$set": {"holder": holder, "expires_at": now + timedelta(seconds=ttl)}},
+        )
+        return doc is not None
+
+    async def renew_slot(self, scope: str, holder: str, ttl: float) -> None:
+        await self.collection.update_one(
+            {"scope": scope, "holder": holder},
+            {"$set": {"expires_at": datetime.now(timezone.utc) + timedelta(seconds=ttl)}},
+        )
+
+    async def release_slot(self, scope: str, holder: str) -> None:
+        await self.collection.update_one(
+            {"scope": scope, "holder": holder},
+            {"$set": {"holder": None, "expires_at": datetime.now(timezone.utc)}},
+        )
+
+
+class AdmissionController:
+    """
+    Admission for OCR work: a global token bucket (files per second), global and
+    per-user concurrency slots, and a bounded local wait queue with a per-user
+    share. Requests that cannot even queue are rejected with a Retry-After hint.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._waiting = 0
+        self._waiting_by_user: Dict[str, int] = {}
+        self.stats = {"admitted": 0, "rejected_queue_full": 0, "rejected_timeout": 0, "waited": 0}
+
+    @asynccontextmanager
+    async def slot(
+        self, user_id: str, cost: int = 1, max_wait: Optional[float] = None, bounded: bool = True
+    ) -> AsyncIterator[None]:
+        """
+        Hold an OCR admission slot for `cost` files; a cost above the bucket's
+        capacity is charged as a full bucket. max_wait=None uses
+        OCR_ADMISSION_MAX_WAIT_SECONDS; bounded=False skips the wait-queue limits
+        for callers that already queue elsewhere (the /ocr/jobs workers).
+        """
+        if not settings.OCR_ADMISSION_ENABLED:
+            yield
+            return
+
+        holder = uuid.uuid4().hex
+        cost = min(cost, settings.OCR_ADMISSION_BURST)  # a larger cost could never be granted
+        wait = settings.OCR_ADMISSION_MAX_WAIT_SECONDS if max_wait is None else max_wait
+        await self._admit(user_id, holder, cost, wait, bounded)
+        renewer = asyncio.create_task(self._renew(user_id, holder))
+        try:
+            yield
+        finally:
+            renewer.cancel()
+            await self._release(user_id, holder)
+
+    async def _renew(self, user_id: str, holder: str) -> None:
+        """Keep the slot leases alive for work that outlasts OCR_ADMISSION_LEASE_SECONDS."""
+        ttl = settings.OCR_ADMISSION_LEASE_SECONDS
+        while True:
+            await asyncio.sleep(ttl / 3)
+            try:
+                await self.store.renew_slot(GLOBAL_SCOPE, holder, ttl)
+                await self.store.renew_slot(f"user:{user_id}", holder, ttl)
+            except Exception:
+                logger.warning("Could not renew OCR admission lease for %s", holder, exc_info=True)
+
+    async def _admit(self, user_id: str, holder: str, cost: int, max_wait: float, bounded: bool) -> None:
+        if await self._try_admit(user_id, holder, cost):
+            self.stats["admitted"] += 1
+            return
+
+        user_waiting = self._waiting_by_user.get(user_id, 0)
+        queue_full = self._waiting >= settings.OCR_ADMISSION_QUEUE_SIZE or user_waiting >= settings.OCR_ADMISSION_PER_USER_QUEUE
+        if bounded and queue_full:
+            self.stats["rejected_queue_full"] += 1
+            raise AdmissionRejected("Too many OCR requests in progress; please retry shortly", self._retry_hint())
+
+        # Unbounded waiters queue elsewhere and must not use up the /extract wait queue
+        if bounded:
+            self._waiting += 1
+            self._waiting_by_user[user_id] = user_waiting + 1
+        self.stats["waited"] += 1
+        give_up_at = time.monotonic() + max_wait
+        try:
+            while True:
+                await asyncio.sleep(random.uniform(0.05, 0.25))
+                if await self._try_admit(user_id, holder, cost):
+                    self.stats["admitted"] += 1
+                    return
+                if time.monotonic() >= give_up_at:
+                    self.stats["rejected_timeout"] += 1
+                    raise AdmissionRejected("Timed out waiting for OCR capacity; please retry shortly", self._retry_hint())
+        finally:
+            if bounded:
+                self._waiting -= 1
+                self._waiting_by_user[user_id] -= 1
+                if not self._waiting_by_user[user_id]:
+                    del self._waiting_by_user[user_id]
+
+    async def _try_admit(self, user_id: str, holder: str, cost: int) -> bool:
+        ttl = settings.OCR_ADMISSION_LEASE_SECONDS
+        if not await self.store.acquire_slot(f"user:{user_id}", settings.OCR_ADMISSION_PER_USER_CONCURRENT, holder, ttl):
+            return False
+        if not await self.store.acquire_slot(GLOBAL_SCOPE, settings.OCR_ADMISSION_MAX_CONCURRENT, holder, ttl):
+            await self.store.release_slot(f"user:{user_id}", holder)
+            return False
+        granted, _ = await self.store.take_tokens(
+            GLOBAL_SCOPE, cost, settings.OCR_ADMISSION_RATE_PER_SECOND, settings.OCR_ADMISSION_BURST
+        )
+        if not granted:
+            await self._release(user_id, holder)
+        return granted
+
+    async def _release(self, user_id: str, holder: str) -> None:
+        await self.store.release_slot(GLOBAL_SCOPE, holder)
+        await self.store.release_slot(f"user:{user_id}", holder)
+
+    @staticmethod
+    def _retry_hint() -> float:
+        return max(1.0, settings.OCR_ADMISSION_MAX_WAIT_SECONDS / 2)
+
+    def snapshot(self) -> Dict:
+        return {**self.stats, "waiting": self._waiting, "waiting_users": len(self._waiting_by_user)}
+
+
+def _build_store():
+    if settings.OCR_ADMISSION_STORE == "mongo":
+        return MongoAdmissionStore(ocr_admission_collection)
+    return LocalAdmissionStore()
+
+
+ocr_admission = AdmissionController(_build_store())
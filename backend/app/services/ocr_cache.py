@@ -0,0 +1,148 @@
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from pymongo import ReturnDocument
+
+from app.config import settings
+from app.db import catalog_meta_collection, ocr_cache_collection
+
+logger = logging.getLogger(__name__)
+
+CACHE_META_ID = "ocr_cache"
+
+
+def cache_key(sha256_hex: str, model: str) -> str:
+    """Content address of an upload: SHA-256 of its bytes plus the OCR model name."""
+    return f"{sha256_hex}:{model}"
+
+
+class OcrCache:
+    """
+    Bounded in-memory LRU of OCR page texts in front of a Mongo collection
+    whose documents expire through a TTL index.
+
+    A purge bumps a generation counter in `catalog_meta`; lookups re-read it at
+    most every `generation_check_seconds` and drop the LRU when it moved, so
+    other workers stop serving purged results.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, generation_check_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.generation_check_seconds = generation_check_seconds
+        self._lru: "OrderedDict[str, tuple[float, List[str]]]" = OrderedDict()
+        self._generation: Optional[int] = None
+        self._generation_checked_at = float("-inf")
+        self.stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0, "errors": 0, "purges_seen": 0}
+
+    async def ensure_indexes(self) -> None:
+        await ocr_cache_collection.create_index("created_at", expireAfterSeconds=self.ttl_seconds)
+
+    def _remember(self, key: str, pages: List[str], stored_at: float) -> None:
+        self._lru[key] = (stored_at, pages)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    async def _check_generation(self) -> None:
+        now = time.monotonic()
+        if now - self._generation_checked_at < self.generation_check_seconds:
+            return
+        self._generation_checked_at = now
+        try:
+            meta = await catalog_meta_collection.find_one({"_id": CACHE_META_ID})
+        except Exception as e:
+            logger.warning("OCR cache generation check failed: %s", e)
+            self.stats["errors"] += 1
+            return
+        generation = int(meta.get("generation", 0)) if meta else 0
+        if self._generation is not None and generation != self._generation:
+            self.stats["purges_seen"] += 1
+            self._lru.clear()
+        self._generation = generation
+
+    async def get(self, key: str) -> Optional[List[str]]:
+        await self._check_generation()
+        entry = self._lru.get(key)
+        if entry is not None:
+            stored_at, pages = entry
+            if time.time() - stored_at < self.ttl_seconds:
+                self._lru.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return pages
+            del self._lru[key]
+
+        try:
+            doc = await ocr_cache_collection.find_one({"_id": key})
+        except Exception as e:
+            # The cache must never break OCR; treat lookup failures as misses
+            logger.warning("OCR cache lookup failed: %s", e)
+            self.stats["errors"] += 1
+            doc = None
+
+        if doc:
+            # Motor returns naive datetimes that are UTC
+            created_at = doc["created_at"]
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            if datetime.now(timezone.utc) - created_at < timedelta(seconds=self.ttl_seconds):
+                self.stats["db_hits"] += 1
+                self._remember(key, doc["pages"], created_at.timestamp())
+                return doc["pages"]
+
+        self.stats["misses"] += 1
+        return None
+
+    async def put(self, key: str, pages: List[str]) -> None:
+        now = datetime.now(timezone.utc)
+        self._remember(key, pages, time.time())
+        try:
+            await ocr_cache_collection.replace_one(
+                {"_id": key},
+                {"_id": key, "pages": pages, "created_at": now},
+                upsert=True,
+            )
+            self.stats["stores"] += 1
+        except Exception as e:
+            logger.warning("OCR cache store failed: %s", e)
+            self.stats["errors"] += 1
+
+    async def purge(self) -> int:
+        """
+        Drop every cached result, in memory and in Mongo, and bump the generation
+        so the other workers drop theirs. Returns the number of DB entries removed.
+        """
+        self._lru.clear()
+        result = await ocr_cache_collection.delete_many({})
+        # Bump after deleting: a worker that sees the new generation cannot refill from stale documents
+        meta = await catalog_meta_collection.find_one_and_update(
+            {"_id": CACHE_META_ID},
+            {"$inc": {"generation": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        self._lru.clear()
+        self._generation = meta["generation"]
+        return result.deleted_count
+
+    def snapshot(self) -> Dict:
+        hits = self.stats["memory_hits"] + self.stats["db_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "hits": hits,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._lru),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+ocr_cache = OcrCache(
+    settings.OCR_CACHE_MAX_ENTRIES,
+    settings.OCR_CACHE_TTL_SECONDS,
+    settings.OCR_CACHE_GENERATION_CHECK_SECONDS,
+)
@@ -0,0 +1,115 @@
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+_counters = {"requests_total": 0, "in_flight": 0, "peak_in_flight": 0, "errors_total": 0}
+
+
+def _build_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.OCR_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.OCR_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=settings.OCR_HTTP_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(
+        connect=settings.OCR_HTTP_CONNECT_TIMEOUT,
+        read=settings.OCR_HTTP_READ_TIMEOUT,
+        write=settings.OCR_HTTP_WRITE_TIMEOUT,
+        pool=settings.OCR_HTTP_POOL_TIMEOUT,
+    )
+    try:
+        return httpx.AsyncClient(limits=limits, timeout=timeout, http2=settings.OCR_HTTP2)
+    except ImportError:
+        # http2=True needs the optional "h2" package (httpx[http2])
+        logger.warning("OCR_HTTP2 is enabled but h2 is not installed; falling back to HTTP/1.1")
+        return httpx.AsyncClient(limits=limits, timeout=timeout)
+
+
+async def start_ocr_client() -> httpx.AsyncClient:
+    """Create the application-scoped OCR client (called from the startup hook)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+        logger.info(
+            "OCR HTTP client started: max_connections=%s keepalive=%s http2=%s",
+            settings.OCR_HTTP_MAX_CONNECTIONS, settings.OCR_HTTP_MAX_KEEPALIVE, settings.OCR_HTTP2,
+        )
+    return _client
+
+
+async def close_ocr_client() -> None:
+    """Close the shared client and its pooled connections (called on shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_ocr_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it lazily outside the app lifecycle (scripts, workers)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def post(url: str, **kwargs) -> httpx.Response:
+    """POST through the shared pool, tracking in-flight request counters."""
+    client = get_ocr_client()
+    _counters["requests_total"] += 1
+    _counters["in_flight"] += 1
+    _counters["peak_in_flight"] = max(_counters["peak_in_flight"], _counters["in_flight"])
+    try:
+        return await client.post(url, **kwargs)
+    except Exception:
+        _counters["errors_total"] += 1
+        raise
+    finally:
+        _counters["in_flight"] -= 1
+
+
+@asynccontextmanager
+async def stream_post(url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+    """POST through the shared pool and hand back the response before its body is read."""
+    client = get_ocr_client()
+    _counters["requests_total"] += 1
+    _counters["in_flight"] += 1
+    _counters["peak_in_flight"] = max(_counters["peak_in_flight"], _counters["in_flight"])
+    try:
+        async with client.stream("POST", url, **kwargs) as resp:
+            yield resp
+    except Exception:
+        _counters["errors_total"] += 1
+        raise
+    finally:
+        _counters["in_flight"] -= 1
+
+
+def pool_stats() -> Dict:
+    """Snapshot of request counters and connection pool usage, for sizing the pool under load."""
+    stats = {
+        **_counters,
+        "max_connections": settings.OCR_HTTP_MAX_CONNECTIONS,
+        "max_keepalive_connections": settings.OCR_HTTP_MAX_KEEPALIVE,
+        "http2": settings.OCR_HTTP2,
+        "client_open": _client is not None and not _client.is_closed,
+    }
+
+    # httpx does not expose pool internals publicly; read httpcore's pool defensively
+    pool = getattr(getattr(_client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []) or [])
+    pool_requests = list(getattr(pool, "_requests", []) or [])
+    stats.update({
+        "connections": len(connections),
+        "idle_connections": sum(1 for c in connections if c.is_idle()),
+        "http2_connections": sum(1 for c in connections if "HTTP/2" in repr(c)),
+        "queued_requests": sum(1 for r in pool_requests if getattr(r, "is_queued", lambda: False)()),
+    })
+    return stats
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.config import settings
+from app.services.ocr_admission import AdmissionRejected, ocr_admission
+from app.services.ocr_service import OcrExtractionError, run_extraction
+from app.services.upload_spool import SpooledUpload
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+
+class JobQueueFull(Exception):
+    """Raised when the OCR job queue cannot take another job."""
+
+
+class TooManyUserJobs(Exception):
+    """Raised when a user already has OCR_JOB_MAX_PER_USER jobs queued or running."""
+
+
+@dataclass
+class OcrJob:
+    id: str
+    user_id: str
+    uploads: List[SpooledUpload] = field(repr=False)
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    files: List[Dict] = field(default_factory=list)
+    events: List[Dict] = field(default_factory=list, repr=False)
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    changed: asyncio.Condition = field(default_factory=asyncio.Condition, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def summary(self) -> Dict:
+        pages_total = sum(f["page_count"] or 0 for f in self.files)
+        pages_done = sum(f["pages_done"] for f in self.files)
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "progress": {
+                "files_total": len(self.files),
+                "files_done": sum(1 for f in self.files if f["status"] in (SUCCEEDED, FAILED)),
+                "pages_done": pages_done,
+                "pages_total": pages_total,
+            },
+            "files": self.files,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class OcrJobManager:
+    """
+    In-process OCR job queue served by a bounded pool of worker tasks.
+    Progress is recorded as an append-only event list that pollers and
+    SSE subscribers read from.
+    """
+
+    def __init__(self, workers: int, queue_size: int, retention_seconds: int, max_per_user: int):
+        self.worker_count = workers
+        self.max_per_user = max_per_user
+        self.retention_seconds = retention_seconds
+        self._queue: "asyncio.Queue[OcrJob]" = asyncio.Queue(maxsize=queue_size)
+        self._jobs: Dict[str, OcrJob] = {}
+        self._workers: List[asyncio.Task] = []
+        self._accepting = False
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._accepting = True
+        self._workers = [asyncio.create_task(self._worker(i), name=f"ocr-job-worker-{i}") for i in range(self.worker_count)]
+        logger.info("OCR job pool started with %s workers", self.worker_count)
+
+    async def shutdown(self, grace_seconds: float) -> None:
+        """Stop accepting jobs, let queued and running ones finish within the grace period, then cancel."""
+        self._accepting = False
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=grace_seconds)
+        except asyncio.TimeoutError:
+            logger.warning("OCR job pool did not drain within %ss; cancelling remaining jobs", grace_seconds)
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, user_id: str, uploads: List[SpooledUpload]) -> OcrJob:
+        self._evict_expired()
+        if not self._accepting:
+            raise JobQueueFull("OCR job pool is not accepting jobs")
+        active = sum(1 for j in self._jobs.values() if j.user_id == user_id and not j.done)
+        if active >= self.max_per_user:
+            raise TooManyUserJobs(f"You already have {active} OCR jobs in progress; wait for one to finish")
+        job = OcrJob(id=uuid.uuid4().hex, user_id=user_id, uploads=uploads)
+        job.files = [
+            {"filename": u.filename, "status": QUEUED, "pages_done": 0, "page_count": None, "error": None}
+            for u in uploads
+        ]
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFull("OCR job queue is full")
+        self._jobs[job.id] = job
+        self._record(job, "queued", {"files": len(uploads)})
+        return job
+
+    def get(self, job_id: str) -> Optional[OcrJob]:
+        return self._jobs.get(job_id)
+
+    async def events(self, job: OcrJob, keepalive_seconds: float = 15.0) -> AsyncIterator[Optional[Dict]]:
+        """Yield the job's events from the beginning until it finishes; None marks a keep-alive tick."""
+        index = 0
+        while True:
+            async with job.changed:
+                try:
+                    await asyncio.wait_for(
+                        job.changed.wait_for(lambda: len(job.events) > index or job.done),
+                        timeout=keepalive_seconds,
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                pending = job.events[index:]
+            index += len(pending)
+            if not pending:
+                if job.done:
+                    return
+                yield None
+                continue
+            for event in pending:
+                yield event
+
+    def _record(self, job: OcrJob, event: str, data: Dict) -> None:
+        job.events.append({"event": event, "data": data, "ts": time.time()})
+        asyncio.ensure_future(self._notify(job))
+
+    @staticmethod
+    async def _notify(job: OcrJob) -> None:
+        async with job.changed:
+            job.changed.notify_all()
+
+    def _on_progress(self, job: OcrJob, event: str, data: Dict) -> None:
+        entry = job.files[data["file_index"]] if "file_index" in data else None
+        if event == "file_started":
+            entry["status"] = RUNNING
+        elif event == "page_done":
+            entry["pages_done"] = data["page_index"] + 1
+            entry["page_count"] = data["page_count"]
+        elif event == "file_done":
+            entry["status"] = SUCCEEDED
+            entry["page_count"] = data["pages"]
+        elif event == "file_failed":
+            entry["status"] = FAILED
+            entry["error"] = data["error"]
+        self._record(job, event, data)
+
+    async def _worker(self, number: int) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                self._finish(job, FAILED, error="Cancelled during shutdown")
+                raise
+            finally:
+                for upload in job.uploads:
+                    upload.close()
+                job.uploads = []
+                self._queue.task_done()
+
+    async def _run(self, job: OcrJob) -> None:
+        try:
+            # Jobs already wait in the job queue, so only the slot/rate limits apply here
+            async with ocr_admission.slot(job.user_id, cost=len(job.uploads), max_wait=self.retention_seconds, bounded=False):
+                job.status = RUNNING
+                self._record(job, "running", {})
+                result = await run_extraction(job.uploads, on_progress=lambda e, d: self._on_progress(job, e, d))
+        except (OcrExtractionError, AdmissionRejected) as e:
+            self._finish(job, FAILED, error=str(e))
+        except Exception as e:
+            logger.exception("OCR job %s crashed", job.id)
+            self._finish(job, FAILED, error=f"Unexpected error: {e}")
+        else:
+            self._finish(job, SUCCEEDED, result=result)
+
+    def _finish(self, job: OcrJob, status: str, result: Optional[Dict] = None, error: Optional[str] = None) -> None:
+        job.status, job.result, job.error, job.finished_at = status, result, error, time.time()
+        self._record(job, status, {"result": result} if result is not None else {"error": error})
+
+    def _evict_expired(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        for job_id in [j.id for j in self._jobs.values() if j.done and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+
+ocr_jobs = OcrJobManager(
+    workers=settings.OCR_JOB_WORKERS,
+    queue_size=settings.OCR_JOB_QUEUE_SIZE,
+    retention_seconds=settings.OCR_JOB_RETENTION_SECONDS,
+    max_per_user=settings.OCR_JOB_MAX_PER_USER,
+)
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the backend while the circuit breaker is open."""
+
+
+class OcrDeadlineExceeded(Exception):
+    """Raised when an OCR call, retries included, runs past its deadline."""
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS
+    return isinstance(exc, httpx.TransportError)
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date) from a failed response."""
+    if not isinstance(exc, httpx.HTTPStatusError):
+        return None
+    value = exc.response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def deadline_for(size_bytes: int) -> float:
+    """Overall time budget for one OCR call, growing with the upload size."""
+    budget = settings.OCR_DEADLINE_BASE_SECONDS + settings.OCR_DEADLINE_PER_MB_SECONDS * size_bytes / (1024 * 1024)
+    return min(budget, settings.OCR_DEADLINE_MAX_SECONDS)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+    closed -> open after `failure_threshold` failures; open -> half-open after
+    `reset_seconds`, where a single probe call decides between closed and open.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def before_call(self) -> None:
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_seconds:
+                raise CircuitOpenError("OCR backend unavailable (circuit open)")
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self._probe_in_flight:
+                raise CircuitOpenError("OCR backend unavailable (circuit half-open, probe in flight)")
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        self.state, self.failures, self._probe_in_flight = "closed", 0, False
+
+    def abandon(self) -> None:
+        """A call was cancelled before it finished; let the next call probe instead."""
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._probe_in_flight = False
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning("OCR circuit breaker opened after %s failures", self.failures)
+            self.state, self.opened_at = "open", time.monotonic()
+
+    def retry_in(self) -> float:
+        """Seconds until the breaker lets a probe through."""
+        if self.state != "open":
+            return 0.0
+        return max(0.0, self.reset_seconds - (time.monotonic() - self.opened_at))
+
+
+class ResilientCaller:
+    """Jittered exponential retry, circuit breaking, size-based deadlines and optional hedging."""
+
+    def __init__(self, breaker: CircuitBreaker):
+        self.breaker = breaker
+        self.stats = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "short_circuited": 0, "deadline_exceeded": 0}
+
+    async def call(self, send: Callable[[], Awaitable[T]], size_bytes: int = 0) -> T:
+        self.stats["calls"] += 1
+        deadline = deadline_for(size_bytes)
+        return await self._with_retries(send, deadline, time.monotonic() + deadline)
+
+    async def _with_retries(self, send: Callable[[], Awaitable[T]], deadline: float, deadline_at: float) -> T:
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                self.stats["short_circuited"] += 1
+                raise
+            try:
+                result = await asyncio.wait_for(self._attempt(send), timeout=max(0.0, deadline_at - time.monotonic()))
+            except asyncio.TimeoutError:
+                # A hanging backend is a failure, so the breaker can open on it
+                self.breaker.record_failure()
+                self.stats["deadline_exceeded"] += 1
+                raise OcrDeadlineExceeded(f"OCR call exceeded its {deadline:.1f}s deadline")
+            except asyncio.CancelledError:
+                self.breaker.abandon()  # cancelled by our caller, not the backend's fault
+                raise
+            except Exception as e:
+                if is_retryable(e):
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()  # the backend answered; the request itself was bad
+                    raise
+                if attempt >= settings.OCR_RETRY_MAX_ATTEMPTS:
+                    raise
+                delay = self._backoff(attempt, e)
+                if time.monotonic() + delay >= deadline_at:
+                    raise
+                self.stats["retries"] += 1
+                logger.info("OCR attempt %s failed (%s); retrying in %.2fs", attempt, e, delay)
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    @staticmethod
+    def _backoff(attempt: int, exc: BaseException) -> float:
+        hinted = retry_after_seconds(exc)
+        if hinted is not None:
+            return min(hinted, settings.OCR_RETRY_MAX_DELAY)
+        ceiling = min(settings.OCR_RETRY_MAX_DELAY, settings.OCR_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)  # full jitter
+
+    async def _attempt(self, send: Callable[[], Awaitable[T]]) -> T:
+        hedge_after = settings.OCR_HEDGE_AFTER_SECONDS
+        if not hedge_after:
+            return await send()
+
+        primary = asyncio.ensure_future(send())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if done:
+                return primary.result()
+
+            # Slow tail call: race a second identical request and keep the first success
+            self.stats["hedges"] += 1
+            tasks.add(asyncio.ensure_future(send()))
+            error: Optional[BaseException] = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.stats["hedge_wins"] += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def snapshot(self) -> Dict:
+        return {
+            **self.stats,
+            "breaker_state": self.breaker.state,
+            "breaker_failures": self.breaker.failures,
+            "breaker_retry_in": round(self.breaker.retry_in(), 1),
+        }
+
+
+ocr_caller = ResilientCaller(CircuitBreaker(settings.OCR_BREAKER_FAILURE_THRESHOLD, settings.OCR_BREAKER_RESET_SECONDS))
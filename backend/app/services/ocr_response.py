@@ -0,0 +1,48 @@
+import json
+from typing import AsyncIterator, Dict
+
+import httpx
+
+try:
+    import ijson
+except ImportError:  # optional: without ijson the response is decoded in one go
+    ijson = None
+
+# The only page fields extract_lab_report reads
+_PAGE_FIELDS = {"pages.item.index": "index", "pages.item.markdown": "markdown", "pages.item.text": "text"}
+
+
+class _ResponseReader:
+    """File-like adapter so ijson can pull an httpx response body chunk by chunk."""
+
+    def __init__(self, resp: httpx.Response):
+        self._chunks = resp.aiter_bytes()
+
+    async def read(self, size: int = -1) -> bytes:
+        if size == 0:  # ijson probes the stream type with a zero-length read
+            return b""
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return b""
+
+
+async def iter_page_texts(resp: httpx.Response) -> AsyncIterator[Dict]:
+    """
+    Yield {"index", "markdown"/"text"} per OCR page while the response streams in.
+    Other fields (image blobs, bounding boxes, usage info) are skipped without
+    being materialized, so memory tracks the size of the page text.
+    """
+    if ijson is None:
+        for page in json.loads(await resp.aread()).get("pages", []):
+            yield {k: page[k] for k in ("index", "markdown", "text") if k in page}
+        return
+
+    page: Dict = {}
+    async for prefix, event, value in ijson.parse_async(_ResponseReader(resp)):
+        field = _PAGE_FIELDS.get(prefix)
+        if field is not None:
+            page[field] = value if field != "index" else int(value)
+        elif prefix == "pages.item" and event == "end_map":
+            yield page
+            page = {}
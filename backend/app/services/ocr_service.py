@@ -1,162 +1,502 @@
-import os
-from pathlib import Path
+import asyncio
+import logging
+import time
 import re
-import json
-import base64
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from app.config import settings
 from app.utils.constants import (
     CANONICAL_PANELS,
     MISTRAL_API_KEY,
     MISTRAL_API_URL,
-    NUMERIC_PATTERN,
-    UNIT_PATTERN,
+    MISTRAL_OCR_MODEL,
 )
-import httpx
+from app.services.alias_tables import AliasTables, current_tables, normalize
+from app.services.marker_extraction import NUMBER, WORD, PageIndex
+from app.services.markdown_tables import split_tables
+from app.services.pdf_text import extract_text_layer, has_usable_text, split_pdf
+from app.services.image_preprocess import preprocess_image
+from app.services.page_dedupe import DuplicatePages, find_duplicate_pages
+from app.services import ocr_client
+from app.services.ocr_cache import cache_key, ocr_cache
+from app.services.upload_spool import SpooledUpload, data_url_payload
+from app.services.ocr_response import iter_page_texts
+from app.services.ocr_resilience import ocr_caller
 
-ALIASES_JSON_PATH = Path(__file__).resolve().parent.parent / "lab_test_aliases.json"
+logger = logging.getLogger(__name__)
 
+_PARENTHESIZED = re.compile(r"\(([^)]*)\)")
 
-def normalize(s: Optional[str]) -> str:
-    """Normalize string for matching."""
-    if not s:
-        return ""
-    return re.sub(r"[^a-z0-9]", "", s.lower())
 
-
-def load_aliases_map_and_units():
+def lookup_canonical(name: str, tables: Optional[AliasTables] = None) -> Optional[Tuple[str, float]]:
     """
-    Load alias → canonical and canonical → allowed units maps from JSON file.
+    (canonical marker, confidence) for a table's test cell: an O(1) normalized
+    lookup of the whole cell, then of the cell without / inside its parentheses
+    ("Hemoglobin (Hb)"), then the longest alias at the earliest position, and
+    finally a bounded-edit-distance fuzzy lookup for OCR typos.
     """
-    alias_map = {}
-    canonical_units = {}
+    tables = tables or current_tables()
+    parts = [name, _PARENTHESIZED.sub("", name), *_PARENTHESIZED.findall(name)]
+    for part in parts:
+        canonical = tables.aliases_map.get(normalize(part))
+        if canonical:
+            return canonical, 1.0
+    hits = tables.matcher.first_occurrences(name)
+    if hits:
+        alias = min(hits, key=lambda a: (hits[a][0], -len(a)))
+        return tables.aliases_map[alias], 1.0
+    if settings.OCR_FUZZY_MATCHING_ENABLED:
+        for part in parts:
+            match = tables.fuzzy.search(normalize(part))
+            if match:
+                return tables.aliases_map[match.alias], match.confidence
+    return None
 
-    if not os.path.exists(ALIASES_JSON_PATH):
-        print(f"[WARN] Aliases file not found at {ALIASES_JSON_PATH}")
-        return alias_map, canonical_units
 
-    try:
-        with open(ALIASES_JSON_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        for item in data.get("labTests", []):
-            canonical = item.get("officialName")
-            aliases = item.get("aliases", [])
-            units = item.get("units", [])
-            if not canonical:
+def _page_index(indexes: List[Optional[PageIndex]], pages: Sequence[str], page_no: int) -> PageIndex:
+    if indexes[page_no] is None:
+        indexes[page_no] = PageIndex(pages[page_no])
+    return indexes[page_no]
+
+
+def _extract_from_text(
+    pages: Sequence[str], indexes: List[Optional[PageIndex]], tables: AliasTables
+) -> Dict[str, Dict]:
+    """
+    Free-text heuristics. Each page is tokenized once and scanned once for
+    aliases; values/units are then looked up in the token index. For each
+    canonical marker the first alias (in alias-file order) present wins, and
+    its value/unit are read right after its first occurrence.
+    """
+    first_hits: Dict[str, Tuple[int, int]] = {}  # alias -> (page number, end offset)
+    for page_no, text in enumerate(pages):
+        for alias, (_, end) in tables.matcher.first_occurrences(text).items():
+            first_hits.setdefault(alias, (page_no, end))
+
+    found_results = {}
+    for alias, canonical in tables.aliases_map.items():
+        if canonical in found_results:
+            continue
+        hit = first_hits.get(alias)
+        if hit:
+            page_no, end = hit
+            val, unit = _page_index(indexes, pages, page_no).value_unit_after(end)
+            unit = tables.canonical_unit(canonical, unit)
+            found_results[canonical] = {"value": val, "unit": unit, "confidence": 1.0, "source": "text"}
+    return found_results
+
+
+# Most trailing words of a run tried as one fuzzy term ("Total Cho1esterol")
+_FUZZY_MAX_WORDS = 3
+
+
+def _fuzzy_from_text(
+    pages: Sequence[str], indexes: List[Optional[PageIndex]], wanted: set, tables: AliasTables
+) -> Dict[str, Dict]:
+    """
+    Fuzzy pass for markers no exact match found, in document order. Only a
+    run of adjacent words on a line that is followed directly by its value is
+    a candidate, and the term must end where the run ends: the last one to
+    three words of "Vitamin B12 450" are tried, never "Vitamin" alone.
+    """
+    found_results: Dict[str, Dict] = {}
+    for page_no, text in enumerate(pages):
+        if not wanted:
+            break
+        index = _page_index(indexes, pages, page_no)
+        tokens = index.tokens
+        i = 0
+        while i < len(tokens):
+            if tokens[i].kind != WORD:
+                i += 1
+                continue
+            last = i
+            while (
+                last + 1 < len(tokens)
+                and (tokens[last + 1].kind == WORD or tokens[last + 1].text == "%")  # "Monocytes % 7.2"
+                and "\n" not in text[tokens[last].end:tokens[last + 1].start]
+            ):
+                last += 1
+                if tokens[last].text == "%":
+                    break
+            run_start, i = i, last + 1
+            if i == len(tokens) or tokens[i].kind != NUMBER:
+                continue  # anything but the value right after the run (a word, a unit) rules it out
+
+            for first in range(max(run_start, last + 1 - _FUZZY_MAX_WORDS), last + 1):
+                term = "".join(normalize(token.text) for token in tokens[first:last + 1])
+                if term in tables.aliases_map:
+                    break  # exact aliases were already handled
+                match = tables.fuzzy.search(term)
+                if match is None:
+                    continue
+                canonical = tables.aliases_map[match.alias]
+                if canonical not in wanted:
+                    break
+                val, unit = index.value_unit_after(tokens[last].end)
+                if val is None:
+                    break
+                found_results[canonical] = {
+                    "value": val,
+                    "unit": tables.canonical_unit(canonical, unit),
+                    "confidence": match.confidence,
+                    "source": "text",
+                    "matched": text[tokens[first].start:tokens[last].end],
+                }
+                wanted.discard(canonical)
+                break
+    return found_results
+
+
+def extract_markers_from_pages(pages: Sequence[str], tables: Optional[AliasTables] = None) -> Dict[str, Dict]:
+    """
+    Resolve canonical markers from OCR pages. Markdown table rows are read
+    cell by cell (the first row per marker wins), so values never come from a
+    reference-range column or a neighbouring row. Text outside tables, and
+    pages without tables, go through the free-text heuristics, which only fill
+    markers no table row provided; markers still missing get a fuzzy pass.
+    Each result carries a confidence: 1.0 for exact alias matches, lower for
+    fuzzy ones. All lookups use one generation of the alias tables.
+    """
+    tables = tables or current_tables()
+    found_results: Dict[str, Dict] = {}
+    text_pages = []
+    for text in pages:
+        rows, remainder = split_tables(text)
+        for row in rows:
+            if row.value is None:
                 continue
+            resolved = lookup_canonical(row.test, tables)
+            if resolved and resolved[0] not in found_results:
+                canonical, confidence = resolved
+                found_results[canonical] = {
+                    "value": row.value,
+                    "unit": tables.canonical_unit(canonical, row.unit),
+                    "confidence": confidence,
+                    "source": "table",
+                }
+                if confidence < 1.0:
+                    found_results[canonical]["matched"] = row.test
+        text_pages.append(remainder if rows else text)
+
+    indexes: List[Optional[PageIndex]] = [None] * len(text_pages)
+    for canonical, data in _extract_from_text(text_pages, indexes, tables).items():
+        found_results.setdefault(canonical, data)
+
+    if settings.OCR_FUZZY_MATCHING_ENABLED:
+        wanted = set(tables.aliases_map.values()) - set(found_results)
+        found_results.update(_fuzzy_from_text(text_pages, indexes, wanted, tables))
+    return found_results
+
 
-            alias_map[normalize(canonical)] = canonical
-            for alias in aliases:
-                alias_map[normalize(alias)] = canonical
+def build_empty_lab_reports() -> Dict:
+    data = {}
+    for panel, markers in CANONICAL_PANELS.items():
+        data[panel] = {m: {"value": None, "unit": None} for m in markers}
+    return data
 
-            # Map valid units for canonical
-            canonical_units[canonical] = [u.strip() for u in units if u.strip()]
 
-        print(
-            f"[INFO] Loaded {len(alias_map)} aliases and {len(canonical_units)} canonical unit sets"
-        )
-        return alias_map, canonical_units
-    except Exception as e:
-        print(f"[ERROR] Failed to load aliases JSON: {e}")
-        return alias_map, canonical_units
+# Process-wide cap on remote OCR calls in flight, shared by every request
+_global_ocr_slots = asyncio.Semaphore(settings.OCR_MAX_CONCURRENCY_GLOBAL)
 
 
-ALIASES_MAP, CANONICAL_UNITS = load_aliases_map_and_units()
+async def _post_ocr_document(upload: SpooledUpload, payload: Dict, url_field: str) -> Dict:
+    """
+    Stream a JSON OCR request whose document is the upload as a base64 data URL,
+    with retries, circuit breaking and a size-based deadline around it.
+    """
+    body = data_url_payload(upload, payload, url_field)
+    url = settings.OCR_API_URL or MISTRAL_API_URL
+    headers = {
+        "Authorization": f"Bearer {MISTRAL_API_KEY}",
+        "Content-Type": "application/json",
+        "Content-Length": str(body.content_length),
+    }
 
+    async def send() -> Dict:
+        if not settings.OCR_LEAN_RESPONSE:
+            resp = await ocr_client.post(url, content=body, headers=headers)
+            resp.raise_for_status()
+            return resp.json()
 
-def find_value_unit_near(text: str, keyword: str) -> Tuple[Optional[float], Optional[str]]:
-    """Find nearest numeric and unit around a keyword in text."""
-    pattern = re.compile(re.escape(keyword), re.IGNORECASE)
-    matches = list(pattern.finditer(text))
-    if not matches:
-        return None, None
+        # Lean mode: parse pages as the body streams in, keeping only their text fields
+        async with ocr_client.stream_post(url, content=body, headers=headers) as resp:
+            resp.raise_for_status()
+            return {"pages": [page async for page in iter_page_texts(resp)]}
 
-    match = matches[0]  # first occurrence
-    start_idx = max(0, match.end())
-    snippet = text[start_idx : start_idx + 100]
+    # Take the slot first: the deadline (and the breaker) only see time spent on the backend, not local queueing
+    async with _global_ocr_slots:
+        return await ocr_caller.call(send, size_bytes=upload.size)
 
-    val_match = re.search(NUMERIC_PATTERN, snippet)
-    if not val_match:
-        return None, None
 
-    try:
-        value = float(val_match.group())
-    except ValueError:
-        return None, None
+async def call_mistral_ocr(upload: SpooledUpload, pages: Optional[List[int]] = None) -> Dict:
+    """Call Mistral OCR for PDF or document files, optionally for a subset of 0-based pages."""
+    payload = {
+        "model": MISTRAL_OCR_MODEL,
+        "document": {"type": "document_url", "document_url": None},
+    }
+    if pages is not None:
+        payload["pages"] = pages
+    return await _post_ocr_document(upload, payload, "document_url")
+
+
+async def call_mistral_image_ocr(upload: SpooledUpload) -> Dict:
+    """Call Mistral OCR for image files (png, jpg, jpeg, webp)."""
+    payload = {
+        "model": MISTRAL_OCR_MODEL,
+        "document": {"type": "image_url", "image_url": None},
+        "include_image_base64": not settings.OCR_LEAN_RESPONSE,
+    }
+    return await _post_ocr_document(upload, payload, "image_url")
 
-    unit_match = re.search(UNIT_PATTERN, snippet[val_match.end() :])
-    unit = unit_match.group().strip() if unit_match else None
 
-    return value, unit
+def _page_text(page: Dict) -> str:
+    return page.get("text") or page.get("markdown", "")
 
 
-def validate_or_fill_unit(canonical: str, detected_unit: Optional[str]) -> Optional[str]:
+async def _ocr_pdf_chunks(upload: SpooledUpload, pages: Optional[List[int]]) -> Optional[Dict[int, str]]:
     """
-    Validate detected unit against known allowed units.
-    - If valid → return normalized version
-    - If invalid → return None
-    - If missing but canonical has only one valid unit → auto-fill that one
+    OCR a large PDF as locally split page chunks, concurrently under
+    OCR_PDF_CHUNK_CONCURRENCY. Each chunk is its own OCR call, retried on its
+    own, and the document takes about as long as its slowest chunk.
+    Returns {page index: text}, or None when the PDF is too small to split.
     """
-    allowed_units = CANONICAL_UNITS.get(canonical)
-    if not allowed_units:
-        return detected_unit  # No validation data available
+    parts = await asyncio.to_thread(
+        split_pdf, upload, pages, settings.OCR_PDF_CHUNK_PAGES, settings.OCR_PDF_SPLIT_MIN_PAGES
+    )
+    if parts is None:
+        return None
+
+    chunk_slots = asyncio.Semaphore(settings.OCR_PDF_CHUNK_CONCURRENCY)
+
+    async def run(indices: List[int], part: SpooledUpload) -> Dict[int, str]:
+        async with chunk_slots:
+            data = await call_mistral_ocr(part)
+        texts = {}
+        for pos, page in enumerate(data.get("pages", [])):
+            local = page.get("index", pos)
+            if 0 <= local < len(indices):
+                texts[indices[local]] = _page_text(page)
+        return texts
 
-    def normalize_unit(u):
-        return re.sub(r"[^a-z0-9%µμ]", "", u.lower())
+    try:
+        results = await asyncio.gather(*(run(indices, part) for indices, part in parts), return_exceptions=True)
+    finally:
+        for _, part in parts:
+            part.close()
 
-    if detected_unit:
-        norm_detected = normalize_unit(detected_unit)
-        for valid in allowed_units:
-            if normalize_unit(valid) == norm_detected:
-                return valid  # Keep properly formatted valid version
-        return None  # Reject invalid unit
+    merged: Dict[int, str] = {}
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+        merged.update(result)
+    return merged
 
-    # Auto-fill if exactly one valid unit
-    if len(allowed_units) == 1:
-        return allowed_units[0]
 
-    return None
+def _duplicate_route(page: int, original: Tuple[int, int]) -> Dict:
+    return {"page": page, "route": "duplicate", "duplicate_of": {"file_index": original[0], "page": original[1]}}
 
 
-def build_empty_lab_reports() -> Dict:
-    data = {}
-    for panel, markers in CANONICAL_PANELS.items():
-        data[panel] = {m: {"value": None, "unit": None} for m in markers}
-    return data
-
-
-async def call_mistral_ocr(file_bytes: bytes, mime_type: str) -> Dict:
-    """Call Mistral OCR for PDF or document files."""
-    b64data = base64.b64encode(file_bytes).decode("utf-8")
-    payload = {
-        "model": "mistral-ocr-latest",
-        "document": {
-            "type": "document_url",
-            "document_url": f"data:{mime_type};base64,{b64data}",
-        },
+async def _ocr_pdf(
+    upload: SpooledUpload, skip: Optional[Dict[int, Tuple[int, int]]] = None, layer: Optional[List[str]] = None
+) -> Dict:
+    """
+    Use the embedded text layer where a page has one and send only the
+    remaining pages to remote OCR, split into parallel chunks when there are many.
+    Pages in `skip` (duplicates of earlier pages) are not sent to remote OCR;
+    whatever text layer they have is still kept. `layer` is a text layer
+    already read (by page de-duplication); otherwise it is extracted here.
+    """
+    skip = skip or {}
+    started = time.perf_counter()
+    if layer is None and settings.OCR_TEXT_LAYER_ENABLED:
+        layer = await asyncio.to_thread(extract_text_layer, upload)
+    text_layer_ms = (time.perf_counter() - started) * 1000
+
+    if layer is None:
+        pages: List[str] = []
+        missing = None  # unreadable locally: OCR the whole document
+    else:
+        pages = list(layer)
+        missing = [i for i, text in enumerate(layer) if i not in skip and not has_usable_text(text)]
+
+    ocr_ms = 0.0
+    chunked = None
+    if missing is None or missing:
+        started = time.perf_counter()
+        if settings.OCR_PDF_SPLIT_ENABLED:
+            chunked = await _ocr_pdf_chunks(upload, missing)
+        if chunked is not None:
+            if missing is None:
+                pages = [chunked.get(i, "") for i in range(max(chunked, default=-1) + 1)]
+            else:
+                for idx, text in chunked.items():
+                    pages[idx] = text
+        else:
+            subset = missing if missing is not None and len(missing) < len(pages) else None
+            ocr_data = await call_mistral_ocr(upload, pages=subset)
+            ocr_pages = ocr_data.get("pages", [])
+            if subset is None:
+                pages = [_page_text(page) for page in ocr_pages]
+            else:
+                for pos, page in enumerate(ocr_pages):
+                    idx = page.get("index", subset[pos] if pos < len(subset) else -1)
+                    if 0 <= idx < len(pages):
+                        pages[idx] = _page_text(page)
+        ocr_ms = (time.perf_counter() - started) * 1000
+
+    remote = set(range(len(pages))) if missing is None else set(missing)
+    routing = [
+        {"page": i, "route": "ocr"} if i in remote
+        else _duplicate_route(i, skip[i]) if i in skip and not has_usable_text(pages[i])
+        else {"page": i, "route": "text_layer"}
+        for i in range(len(pages))
+    ]
+    return {
+        "pages": pages,
+        "routing": routing,
+        "text_layer_ms": round(text_layer_ms, 1),
+        "ocr_ms": round(ocr_ms, 1),
+        "ocr_chunks": None if chunked is None else -(-len(remote) // settings.OCR_PDF_CHUNK_PAGES),
     }
-    headers = {"Authorization": f"Bearer {MISTRAL_API_KEY}", "Content-Type": "application/json"}
-
-    async with httpx.AsyncClient(timeout=120) as client:
-        resp = await client.post(MISTRAL_API_URL, json=payload, headers=headers)
-        resp.raise_for_status()
-        return resp.json()
 
 
-async def call_mistral_image_ocr(file_bytes: bytes, mime_type: str, filename: str = "upload.png") -> Dict:
-    """Call Mistral OCR for image files (png, jpg, jpeg, webp)."""
-    b64data = base64.b64encode(file_bytes).decode("utf-8")
-    payload = {
-        "model": "mistral-ocr-latest",
-        "document": {
-            "type": "image_url",
-            "image_url": f"data:{mime_type};base64,{b64data}",
+async def ocr_file(
+    upload: SpooledUpload, skip: Optional[Dict[int, Tuple[int, int]]] = None, layer: Optional[List[str]] = None
+) -> Dict:
+    """
+    OCR a single upload, reusing cached results. `skip` maps pages that
+    duplicate an earlier page of the request to that page; they are not sent to remote OCR.
+    `layer` is the PDF's text layer when it was already read.
+    Returns {"pages": [page texts in order], "routing": [per-page route], ...timings}.
+    """
+    if skip and not upload.mime.startswith("application"):
+        return {"pages": [], "routing": [_duplicate_route(0, skip[0])]}
+
+    key = cache_key(upload.sha256, MISTRAL_OCR_MODEL) if settings.OCR_CACHE_ENABLED else None
+    if key:
+        cached = await ocr_cache.get(key)
+        if cached is not None:
+            return {"pages": cached, "routing": [{"page": i, "route": "cache"} for i in range(len(cached))]}
+
+    if upload.mime.startswith("application"):
+        result = await _ocr_pdf(upload, skip, layer)
+    else:
+        processed, preprocess = await preprocess_image(upload)
+        started = time.perf_counter()
+        try:
+            ocr_data = await call_mistral_image_ocr(processed)
+        finally:
+            if processed is not upload:
+                processed.close()
+        pages = [_page_text(page) for page in ocr_data.get("pages", [])]
+        result = {
+            "pages": pages,
+            "routing": [{"page": i, "route": "ocr"} for i in range(len(pages))],
+            "ocr_ms": round((time.perf_counter() - started) * 1000, 1),
+            "preprocess": preprocess,
+        }
+
+    if key and not skip:  # a de-duplicated result is missing pages
+        await ocr_cache.put(key, result["pages"])
+    return result
+
+
+ProgressCallback = Callable[[str, Dict], None]
+
+
+async def ocr_files_concurrently(
+    uploads: Sequence[SpooledUpload],
+    per_request_limit: Optional[int] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    duplicates: Optional[DuplicatePages] = None,
+) -> List[Dict]:
+    """
+    OCR uploads concurrently, bounded both per call and by the process-wide limit.
+    Pages listed in `duplicates` are skipped.
+    Returns one result per upload, in upload order:
+      {"filename", "pages": [...]} on success or {"filename", "error": str} on failure.
+    """
+    request_slots = asyncio.Semaphore(per_request_limit or settings.OCR_MAX_CONCURRENCY_PER_REQUEST)
+    notify = on_progress or (lambda event, data: None)
+
+    async def run(index: int, upload: SpooledUpload) -> Dict:
+        async with request_slots:
+            notify("file_started", {"file_index": index, "filename": upload.filename})
+            try:
+                if duplicates:
+                    result = await ocr_file(upload, duplicates.for_upload(index), duplicates.text_layer(index))
+                else:
+                    result = await ocr_file(upload)
+            except Exception as e:
+                logger.warning("OCR failed for %s: %s", upload.filename, e)
+                notify("file_failed", {"file_index": index, "filename": upload.filename, "error": str(e)})
+                return {"filename": upload.filename, "error": str(e)}
+            page_count = len(result["pages"])
+            for page_index in range(page_count):
+                notify("page_done", {"file_index": index, "page_index": page_index, "page_count": page_count})
+            notify("file_done", {"file_index": index, "filename": upload.filename, "pages": page_count})
+            return {"filename": upload.filename, **result}
+
+    return await asyncio.gather(*(run(i, upload) for i, upload in enumerate(uploads)))
+
+
+class OcrExtractionError(Exception):
+    """Raised when none of the uploaded files could be OCR'd."""
+
+
+async def run_extraction(uploads: Sequence[SpooledUpload], on_progress: Optional[ProgressCallback] = None) -> Dict:
+    """OCR the uploads and extract canonical markers into the lab_reports structure."""
+    duplicates = await find_duplicate_pages(uploads)
+    results = await ocr_files_concurrently(uploads, on_progress=on_progress, duplicates=duplicates)
+    failed = [{"filename": r["filename"], "error": r["error"]} for r in results if "error" in r]
+    if len(failed) == len(results):
+        first = failed[0]
+        raise OcrExtractionError(f"OCR processing failed for {first['filename']}: {first['error']}")
+
+    pages = [text for result in results for text in result.get("pages", [])]
+    total_text_length = sum(len(text) + 1 for text in pages)
+
+    # Extract markers and validated units; big documents go to a worker thread
+    tables = current_tables()  # one table generation for the whole extraction, even across a reload
+    if on_progress:
+        on_progress("extracting", {"text_length": total_text_length})
+    if total_text_length > settings.OCR_EXTRACT_THREAD_THRESHOLD:
+        found_results = await asyncio.to_thread(extract_markers_from_pages, pages, tables)
+    else:
+        found_results = extract_markers_from_pages(pages, tables)
+
+    # Build final structure
+    lab_reports = build_empty_lab_reports()
+    marker_confidence = {}
+    for panel, markers in CANONICAL_PANELS.items():
+        for m in markers:
+            data = found_results.get(m)
+            if not data:
+                continue
+            lab_reports[panel][m] = {"value": data["value"], "unit": data["unit"]}
+            marker_confidence[m] = {k: v for k, v in data.items() if k not in ("value", "unit")}
+
+    return {
+        "success": True,
+        "lab_reports": lab_reports,
+        "metadata": {
+            "files_processed": len(results) - len(failed),
+            "files_failed": failed,
+            "partial": bool(failed),
+            "aliases_loaded": len(tables.aliases_map),
+            "alias_tables_version": tables.version,
+            "marker_confidence": marker_confidence,
+            "total_text_length": total_text_length,
+            "page_routing": [
+                {k: v for k, v in r.items() if k != "pages"} for r in results if "error" not in r
+            ],
+            "pages_from_text_layer": sum(
+                1 for r in results for p in r.get("routing", []) if p["route"] == "text_layer"
+            ),
+            "pages_from_ocr": sum(1 for r in results for p in r.get("routing", []) if p["route"] == "ocr"),
+            "pages_skipped_duplicate": sum(
+                1 for r in results for p in r.get("routing", []) if p["route"] == "duplicate"
+            ),
+            "image_bytes_saved": sum(r.get("preprocess", {}).get("bytes_saved", 0) for r in results),
         },
-        "include_image_base64": True,
     }
-    headers = {"Authorization": f"Bearer {MISTRAL_API_KEY}", "Content-Type": "application/json"}
-
-    async with httpx.AsyncClient(timeout=120) as client:
-        resp = await client.post(MISTRAL_API_URL, json=payload, headers=headers)
-        resp.raise_for_status()
-        return resp.json()
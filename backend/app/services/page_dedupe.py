@@ -0,0 +1,154 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.services.pdf_text import extract_text_layer, has_usable_text
+from app.services.upload_spool import SpooledUpload
+
+try:
+    from PIL import Image, ImageChops, ImageOps
+except ImportError:  # optional: without Pillow nothing is de-duplicated
+    Image = ImageChops = ImageOps = None
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # optional: without pdfium PDF pages are not hashed
+    pdfium = None
+
+logger = logging.getLogger(__name__)
+
+# Rendering scale for PDF pages (1.0 = 72 dpi)
+_RENDER_SCALE = 1.0
+
+# Pages whose hashes match are compared on thumbnails up to this many pixels a
+# side, as the mean grey-level difference of each _CONFIRM_TILE-pixel tile: a
+# re-encoded copy differs a little everywhere, a page with other results a lot
+# in the few tiles holding them.
+_CONFIRM_SIZE = 512
+_CONFIRM_TILE = 8
+
+
+# Difference hash of a 33×32 thumbnail: 1024 bits. Different pages printed from
+# the same lab report template can still be only a few bits apart, so a close
+# hash only nominates a pair for same_content() to check.
+HASH_SIZE = 32
+
+
+def dhash(img: "Image.Image", size: int = HASH_SIZE) -> int:
+    """Difference hash: brightness gradients of a (size+1)×size grayscale thumbnail."""
+    small = img.convert("L").resize((size + 1, size), Image.LANCZOS)
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            right = pixels[row * (size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return bits
+
+
+class PageFingerprint(NamedTuple):
+    hash: int
+    thumbnail: "Image.Image"
+
+
+def fingerprint(img: "Image.Image") -> PageFingerprint:
+    gray = ImageOps.autocontrast(img.convert("L"))
+    thumbnail = gray.copy()
+    thumbnail.thumbnail((_CONFIRM_SIZE, _CONFIRM_SIZE))
+    return PageFingerprint(dhash(gray), thumbnail)
+
+
+def same_content(a: PageFingerprint, b: PageFingerprint) -> bool:
+    """Hashes within OCR_DEDUPE_MAX_DISTANCE bits, confirmed tile by tile on the thumbnails."""
+    if bin(a.hash ^ b.hash).count("1") > settings.OCR_DEDUPE_MAX_DISTANCE:
+        return False
+    other = b.thumbnail if b.thumbnail.size == a.thumbnail.size else b.thumbnail.resize(a.thumbnail.size, Image.LANCZOS)
+    diff = ImageChops.difference(a.thumbnail, other)
+    width, height = a.thumbnail.size
+    tiles = diff.resize((max(1, width // _CONFIRM_TILE), max(1, height // _CONFIRM_TILE)), Image.BOX)
+    return tiles.getextrema()[1] <= settings.OCR_DEDUPE_MAX_TILE_DIFF
+
+
+def _upload_fingerprints(upload: SpooledUpload) -> Tuple[List[Optional[PageFingerprint]], Optional[List[str]]]:
+    """
+    One fingerprint per page that would go to remote OCR (a single one for
+    images); None for PDF pages served from their text layer. Also returns the
+    PDF text layer it read, so OCR does not extract it again. Blocking.
+    """
+    layer = None
+    try:
+        if upload.mime.startswith("image"):
+            upload.fileobj.seek(0)
+            img = Image.open(upload.fileobj)
+            img.draft("L", (_CONFIRM_SIZE, _CONFIRM_SIZE))
+            return [fingerprint(ImageOps.exif_transpose(img))], None
+        layer = extract_text_layer(upload) if settings.OCR_TEXT_LAYER_ENABLED else None
+        if pdfium is None:
+            return [], layer
+        # pdfium reads the spooled file in place instead of a copy of the whole PDF
+        pdf = pdfium.PdfDocument(upload.fileobj)
+        try:
+            if len(pdf) > settings.OCR_DEDUPE_MAX_PDF_PAGES:
+                return [], layer
+            return [
+                None if layer and i < len(layer) and has_usable_text(layer[i])
+                else fingerprint(pdf[i].render(scale=_RENDER_SCALE, grayscale=True).to_pil())
+                for i in range(len(pdf))
+            ], layer
+        finally:
+            pdf.close()
+    except Exception as e:
+        logger.info("Page fingerprinting skipped for %s: %s", upload.filename, e)
+        return [], layer
+
+
+@dataclass
+class DuplicatePages:
+    """
+    Pages to skip per upload index, each pointing at the earlier page it
+    repeats, and the PDF text layers read while fingerprinting.
+    """
+
+    skip: Dict[int, Dict[int, Tuple[int, int]]] = field(default_factory=dict)
+    text_layers: Dict[int, List[str]] = field(default_factory=dict)
+
+    def for_upload(self, index: int) -> Dict[int, Tuple[int, int]]:
+        return self.skip.get(index, {})
+
+    def text_layer(self, index: int) -> Optional[List[str]]:
+        return self.text_layers.get(index)
+
+    @property
+    def count(self) -> int:
+        return sum(len(pages) for pages in self.skip.values())
+
+
+async def find_duplicate_pages(uploads: Sequence[SpooledUpload]) -> DuplicatePages:
+    """
+    Find pages of a multi-file request that repeat an earlier page (in upload,
+    then page order), so they are not sent to remote OCR again. Only images and
+    PDF pages without a usable text layer are compared; a page is a duplicate
+    when its hash is within OCR_DEDUPE_MAX_DISTANCE bits of an earlier one and
+    their thumbnails agree tile by tile.
+    """
+    duplicates = DuplicatePages()
+    if Image is None or not settings.OCR_DEDUPE_ENABLED or len(uploads) < 2:
+        return duplicates
+
+    fingerprinted = await asyncio.gather(*(asyncio.to_thread(_upload_fingerprints, upload) for upload in uploads))
+    seen: List[Tuple[PageFingerprint, Tuple[int, int]]] = []  # (fingerprint, (upload index, page))
+    for index, (pages, layer) in enumerate(fingerprinted):
+        if layer is not None:
+            duplicates.text_layers[index] = layer
+        for page, current in enumerate(pages):
+            if current is None:
+                continue
+            original = next((where for earlier, where in seen if same_content(earlier, current)), None)
+            if original is None:
+                seen.append((current, (index, page)))
+            else:
+                duplicates.skip.setdefault(index, {})[page] = original
+    return duplicates
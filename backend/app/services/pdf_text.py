@@ -0,0 +1,72 @@
+import io
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.services.upload_spool import SpooledUpload
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # optional: without pypdf every PDF goes to remote OCR
+    PdfReader = PdfWriter = None
+
+logger = logging.getLogger(__name__)
+
+
+def extract_text_layer(upload: SpooledUpload) -> Optional[List[str]]:
+    """
+    Read the embedded text layer of a born-digital PDF, one string per page.
+    Returns None when the PDF cannot be read locally. Blocking; run it in a thread.
+    """
+    if PdfReader is None:
+        return None
+    try:
+        upload.fileobj.seek(0)
+        reader = PdfReader(upload.fileobj)
+        if reader.is_encrypted:
+            return None
+        return [page.extract_text() or "" for page in reader.pages]
+    except Exception as e:
+        logger.info("No usable text layer in %s: %s", upload.filename, e)
+        return None
+
+
+def has_usable_text(text: str) -> bool:
+    """A page counts as digital when its text layer has enough alphanumeric content."""
+    return sum(1 for ch in text if ch.isalnum()) >= settings.OCR_TEXT_LAYER_MIN_CHARS
+
+
+def split_pdf(
+    upload: SpooledUpload, pages: Optional[Sequence[int]], chunk_pages: int, min_pages: int
+) -> Optional[List[Tuple[List[int], SpooledUpload]]]:
+    """
+    Split the given 0-based pages (all pages when None) into standalone PDFs of
+    at most `chunk_pages` pages each. Returns [(original page indices, chunk)]
+    in page order, or None when there are fewer than `min_pages` pages or the
+    PDF cannot be split locally. Blocking; run it in a thread.
+    """
+    if PdfReader is None:
+        return None
+    try:
+        upload.fileobj.seek(0)
+        reader = PdfReader(upload.fileobj)
+        if reader.is_encrypted:
+            return None
+        selected = list(range(len(reader.pages))) if pages is None else list(pages)
+        if len(selected) < max(min_pages, 2):
+            return None
+
+        chunks = []
+        for first in range(0, len(selected), chunk_pages):
+            indices = selected[first:first + chunk_pages]
+            writer = PdfWriter()
+            for idx in indices:
+                writer.add_page(reader.pages[idx])
+            out = io.BytesIO()
+            writer.write(out)
+            name = f"{upload.filename}#pages{indices[0] + 1}-{indices[-1] + 1}"
+            chunks.append((indices, SpooledUpload.from_bytes(name, "application/pdf", out.getvalue())))
+        return chunks
+    except Exception as e:
+        logger.info("Could not split %s into page chunks: %s", upload.filename, e)
+        return None
@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+from app.config import settings
+from app.db import catalog_meta_collection, functional_ranges_collection, supplements_collection
+
+logger = logging.getLogger(__name__)
+
+CATALOG_ID = "functional_ranges"
+
+# Resolution key for a user gender / menstruation status no range doc mentions
+ANY = None
+
+
+@lru_cache(maxsize=4096)
+def normalize_marker(name: str) -> str:
+    if not name:
+        return ""
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+
+def _score(doc: Dict, gender: Optional[str], menstruation: Optional[str]) -> int:
+    """Same scoring as the per-request lookup it replaces; gender/menstruation are lowercased or ANY."""
+    s = 0
+    doc_gender = str(doc.get("gender") or "").lower()
+    doc_men = str(doc.get("menstruation_status") or "").lower()
+    if doc_gender and gender and doc_gender == gender:
+        s += 4
+    if doc_men and menstruation and doc_men == menstruation:
+        s += 2
+    if doc.get("measurementUnits"):
+        s += 1
+    return s
+
+
+def _resolution_table(
+    groups: Dict[str, List[Dict]], genders: Iterable[Optional[str]], statuses: Iterable[Optional[str]]
+) -> Dict[Tuple[str, Optional[str], Optional[str]], Dict]:
+    """Best doc per (marker key, gender, menstruation status), ties going to the earliest doc like max()."""
+    table = {}
+    for key, candidates in groups.items():
+        for gender in genders:
+            for status in statuses:
+                table[(key, gender, status)] = max(candidates, key=lambda doc: _score(doc, gender, status))
+    return table
+
+
+def _supplement_view(supp: Dict) -> Dict:
+    return {
+        "id": supp.get("_id"),
+        "name": supp.get("name"),
+        "dosage": supp.get("dosage"),
+        "productLink": supp.get("productLink"),
+        "description": supp.get("description"),
+    }
+
+
+def _recommendation_table(docs: List[Dict], supplements: List[Dict]) -> Dict[Tuple[Any, str], Tuple[Dict, ...]]:
+    """
+    Denormalized (range doc id, "low"/"high") → supplements, in the order the
+    range doc lists them. Ids without a supplement doc are dropped.
+    """
+    by_id = {supp.get("_id"): _supplement_view(supp) for supp in supplements}
+    table = {}
+    for doc in docs:
+        for side, field_name in (("low", "ifLow"), ("high", "ifHigh")):
+            supp_field = doc.get(field_name)
+            supp_ids = supp_field.get("supplements") if isinstance(supp_field, dict) else None
+            table[(doc.get("_id"), side)] = tuple(by_id[sid] for sid in supp_ids or [] if sid and sid in by_id)
+    return table
+
+
+@dataclass(frozen=True)
+class RangesSnapshot:
+    """
+    Functional range docs indexed by marker and by normalized marker, as of one
+    catalog version, plus precompiled best-doc resolution tables for every
+    (marker, gender, menstruation status) combination the docs can tell apart
+    and the supplements each range doc recommends when low / high.
+    """
+
+    version: int
+    by_marker: Dict[str, List[Dict]]
+    by_norm: Dict[str, List[Dict]]
+    loaded_at: float
+    genders: frozenset  # lowercased values the docs carry
+    statuses: frozenset
+    exact_table: Dict[Tuple[str, Optional[str], Optional[str]], Dict]
+    norm_table: Dict[Tuple[str, Optional[str], Optional[str]], Dict]
+    recommendations: Dict[Tuple[Any, str], Tuple[Dict, ...]]
+
+    @classmethod
+    def build(cls, version: int, docs: List[Dict], supplements: List[Dict]) -> "RangesSnapshot":
+        by_marker = defaultdict(list)
+        by_norm = defaultdict(list)
+        for doc in docs:
+            marker_name = doc.get("marker")
+            if marker_name:
+                by_marker[marker_name].append(doc)
+                by_norm[normalize_marker(marker_name)].append(doc)
+
+        # A user value no doc carries scores like any other such value, so it maps to ANY
+        genders = frozenset(g for g in (str(d.get("gender") or "").lower() for d in docs) if g)
+        statuses = frozenset(m for m in (str(d.get("menstruation_status") or "").lower() for d in docs) if m)
+        gender_keys, status_keys = [*genders, ANY], [*statuses, ANY]
+        return cls(
+            version,
+            dict(by_marker),
+            dict(by_norm),
+            time.time(),
+            genders,
+            statuses,
+            _resolution_table(by_marker, gender_keys, status_keys),
+            _resolution_table(by_norm, gender_keys, status_keys),
+            _recommendation_table(docs, supplements),
+        )
+
+    def demographic(
+        self, gender_at_birth: Optional[str], menstruation_status: Optional[str]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """A user's (gender, menstruation status) resolution key; values no doc mentions map to ANY."""
+        gender = (gender_at_birth or "").lower()
+        status = (menstruation_status or "").lower()
+        return (gender if gender in self.genders else ANY, status if status in self.statuses else ANY)
+
+    def resolve(self, marker: str, gender_at_birth: Optional[str], menstruation_status: Optional[str]) -> Optional[Dict]:
+        """
+        Best functional range doc for this marker and user, in one dict lookup.
+        Exact marker name candidates win over normalized-name candidates; among
+        candidates, gender match (+4), menstruation status match (+2) and having
+        measurementUnits (+1) decide. None if the catalog has no such marker.
+        """
+        return self.resolve_for(marker, self.demographic(gender_at_birth, menstruation_status))
+
+    def resolve_for(self, marker: str, demographic: Tuple[Optional[str], Optional[str]]) -> Optional[Dict]:
+        gender, status = demographic
+        if marker in self.by_marker:
+            return self.exact_table[(marker, gender, status)]
+        return self.norm_table.get((normalize_marker(marker), gender, status))
+
+    def supplements_for(self, doc: Dict, status: str) -> List[Dict]:
+        """Supplements a range doc recommends: its ifLow list when low, its ifHigh list otherwise."""
+        side = "low" if status == "low" else "high"
+        return [dict(supp) for supp in self.recommendations.get((doc.get("_id"), side), ())]
+
+
+class RangesCatalog:
+    """
+    Process-wide snapshot of the functional ranges catalog and the supplements
+    it recommends.
+
+    Admin edits to either bump a version counter in `catalog_meta`. Every worker polls
+    that single small document and reloads the catalog only when the version
+    moved, so report generation reads memory, not Mongo, in the steady state.
+    """
+
+    def __init__(self, poll_seconds: float):
+        self.poll_seconds = poll_seconds
+        self._snapshot: Optional[RangesSnapshot] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"reloads": 0, "polls": 0}
+
+    async def start(self) -> None:
+        try:
+            await self.reload()
+        except Exception as e:
+            logger.warning("Functional ranges catalog not loaded at startup (will retry lazily): %s", e)
+        if self.poll_seconds > 0 and self._task is None:
+            self._task = asyncio.create_task(self._poll(), name="ranges-catalog-poller")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def current_version(self) -> int:
+        meta = await catalog_meta_collection.find_one({"_id": CATALOG_ID})
+        return int(meta.get("version", 0)) if meta else 0
+
+    async def reload(self, version: Optional[int] = None) -> RangesSnapshot:
+        async with self._lock:
+            # Read the version before the docs: a concurrent edit bumps it afterwards and triggers another reload
+            if version is None:
+                version = await self.current_version()
+            docs, supplements = await asyncio.gather(
+                functional_ranges_collection.find({}).to_list(None),
+                supplements_collection.find({}).to_list(None),
+            )
+            self._snapshot = RangesSnapshot.build(version, docs, supplements)
+            self.stats["reloads"] += 1
+            logger.info(
+                "Loaded functional ranges catalog v%s (%s ranges, %s supplements)", version, len(docs), len(supplements)
+            )
+            return self._snapshot
+
+    async def get_snapshot(self) -> RangesSnapshot:
+        """The current snapshot, loading it on first use if startup could not."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = await self.reload()
+        return snapshot
+
+    async def bump_version(self) -> int:
+        """Record a catalog edit and reload this worker right away; the others follow on their next poll."""
+        meta = await catalog_meta_collection.find_one_and_update(
+            {"_id": CATALOG_ID},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        await self.reload(meta["version"])
+        return meta["version"]
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                self.stats["polls"] += 1
+                version = await self.current_version()
+                if self._snapshot is None or version != self._snapshot.version:
+                    await self.reload(version)
+            except Exception as e:
+                logger.warning("Functional ranges catalog poll failed: %s", e)
+
+
+ranges_catalog = RangesCatalog(settings.RANGES_CATALOG_POLL_SECONDS)
@@ -0,0 +1,279 @@
+import asyncio
+from collections import defaultdict
+from itertools import repeat
+from typing import Dict, Iterable, List, Tuple
+
+from app.services.ranges_catalog import RangesSnapshot, ranges_catalog
+from app.services.report_rules import ReportRules, current_rules
+from app.services.report_service import MarkerEvaluations, assemble_report, evaluate
+
+try:
+    import numpy as np
+except ImportError:  # optional: without NumPy batches fall back to one evaluate() per request
+    np = None
+
+# Cell status codes, in the order evaluate_marker() checks them
+NO_DOC, UNIT_MISMATCH, NO_RANGE, BAD_VALUES, LOW, HIGH, NORMAL = range(7)
+_STATUS = {LOW: "low", HIGH: "high", NORMAL: "normal"}
+_REASON = {UNIT_MISMATCH: "unit_mismatch", NO_RANGE: "no_range", BAD_VALUES: "bad_values"}
+
+
+def _as_float(value) -> Tuple[float, bool]:
+    try:
+        return float(value), False
+    except Exception:
+        return float("nan"), True
+
+
+class _UnitCodes(dict):
+    """
+    Raw unit → small integer per normalized spelling; 0 means "no unit given"
+    (skips the unit check). Codes are memoized per raw unit.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._normalized: Dict[str, int] = {}
+
+    def __missing__(self, unit) -> int:
+        code = self._normalized.setdefault(unit.strip().lower(), len(self._normalized) + 1) if unit else 0
+        self[unit] = code
+        return code
+
+
+class MarkerBatch:
+    """
+    Every submitted marker of many requests, evaluated at once.
+
+    Requests are laid out as a patients × (panel, marker) matrix. Range docs
+    are resolved once per (demographic, marker) into low/high/unit arrays,
+    then evaluate_marker()'s checks, low/high/normal classification and
+    compute_deviation() run as one vectorized pass over the matrix. Cells are
+    numbered in submission order (request, panel, marker); `result(cell)`
+    builds the dict evaluate_marker() would have returned for one of them.
+    """
+
+    def __init__(self, users: List[Dict], catalog: RangesSnapshot):
+        self.catalog = catalog
+        self.columns: Dict[Tuple[str, str], int] = {}
+        demographics: Dict[Tuple, int] = {}
+        units = _UnitCodes()
+        patient_demo = np.empty(len(users), dtype=np.intp)
+        layouts: Dict[Tuple, List[int]] = {}  # (panel, its marker keys) → columns; most requests share a few
+        rows, cols, panel_orders, raw_values, raw_units = [], [], [], [], []  # per cell, in submission order
+
+        for row, user_data in enumerate(users):
+            demographic = catalog.demographic(
+                user_data.get("gender_at_birth") or user_data.get("gender"),
+                user_data.get("menstruation_status") or "None",
+            )
+            patient_demo[row] = demographics.setdefault(demographic, len(demographics))
+            for panel_order, (panel_name, panel) in enumerate((user_data.get("lab_reports", {}) or {}).items()):
+                layout = layouts.get((panel_name, tuple(panel)))
+                if layout is None:
+                    layout = layouts[(panel_name, tuple(panel))] = [
+                        self.columns.setdefault((panel_name, marker_key), len(self.columns)) for marker_key in panel
+                    ]
+                cols.extend(layout)
+                rows.extend(repeat(row, len(layout)))
+                panel_orders.extend(repeat(panel_order, len(layout)))
+                raw_values.extend([data.get("value") for data in panel.values()])
+                raw_units.extend([data.get("unit") for data in panel.values()])
+        unit_codes = list(map(units.__getitem__, raw_units))
+
+        # Values as float() sees them; NaN where float() fails (bad_values)
+        try:
+            values = np.fromiter(map(float, raw_values), dtype=float, count=len(raw_values))
+            bad_cells = np.zeros(len(raw_values), dtype=bool)
+        except (TypeError, ValueError):
+            converted = [_as_float(val) for val in raw_values]
+            values = np.array([value for value, _ in converted], dtype=float)
+            bad_cells = np.array([bad for _, bad in converted], dtype=bool)
+
+        self.markers = [marker_key for _, marker_key in self.columns]
+        shape = (len(demographics), len(self.markers))
+        self.docs = [[None] * len(self.markers) for _ in demographics]
+        has_doc = np.zeros(shape, dtype=bool)
+        no_range = np.zeros(shape, dtype=bool)
+        bad_range = np.zeros(shape, dtype=bool)
+        low = np.full(shape, np.nan)
+        high = np.full(shape, np.nan)
+        doc_unit = np.zeros(shape, dtype=np.int64)
+        for d, demographic in enumerate(demographics):
+            for c, marker in enumerate(self.markers):
+                doc = catalog.resolve_for(marker, demographic)
+                if not doc:
+                    continue
+                self.docs[d][c] = doc
+                has_doc[d, c] = True
+                doc_unit[d, c] = units[doc.get("measurementUnits")]
+                if doc.get("functionalLow") is None or doc.get("functionalHigh") is None:
+                    no_range[d, c] = True
+                    continue
+                low[d, c], bad_low = _as_float(doc.get("functionalLow"))
+                high[d, c], bad_high = _as_float(doc.get("functionalHigh"))
+                bad_range[d, c] = bad_low or bad_high
+
+        # Patients × markers matrices; cells nobody submitted stay NaN / 0 and are never read
+        rows = np.asarray(rows, dtype=np.intp)
+        cols = np.asarray(cols, dtype=np.intp)
+        matrix = np.full((len(users), len(self.markers)), np.nan)
+        given_unit = np.zeros(matrix.shape, dtype=np.int64)
+        bad_value = np.zeros(matrix.shape, dtype=bool)
+        matrix[rows, cols] = values
+        given_unit[rows, cols] = unit_codes
+        bad_value[rows, cols] = bad_cells
+
+        # Range arrays resolved per demographic, broadcast to patients
+        lo = low[patient_demo]
+        hi = high[patient_demo]
+        expected_unit = doc_unit[patient_demo]
+        with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+            width = hi - lo
+            width = np.where(width == 0, 1.0, width)
+            below = matrix < lo
+            above = matrix > hi
+            deviation = np.where(below, (lo - matrix) / width, np.where(above, (matrix - hi) / width, 0.0))
+        status = np.select(
+            [
+                ~has_doc[patient_demo],
+                (expected_unit != 0) & (given_unit != 0) & (expected_unit != given_unit),
+                no_range[patient_demo],
+                bad_range[patient_demo] | bad_value,
+            ],
+            [NO_DOC, UNIT_MISMATCH, NO_RANGE, BAD_VALUES],
+            default=np.where(below, LOW, np.where(above, HIGH, NORMAL)),
+        )
+
+        # Per-cell views, in submission order
+        self.cell_cols = cols
+        self.row_starts = np.searchsorted(rows, np.arange(len(users) + 1))
+        self.status = status[rows, cols]
+        self.cols = cols.tolist()
+        self.panel_orders = panel_orders
+        self.raw_values = raw_values
+        self.raw_units = raw_units
+        self.cell_demo = patient_demo[rows].tolist()
+        self.cell_status = self.status.tolist()
+        self.cell_value = values.tolist()
+        self.cell_low = lo[rows, cols].tolist()
+        self.cell_high = hi[rows, cols].tolist()
+        self.cell_deviation = deviation[rows, cols].tolist()
+
+    def result(self, cell: int) -> Dict:
+        """The evaluate_marker() result for one cell."""
+        col = self.cols[cell]
+        marker = self.markers[col]
+        val = self.raw_values[cell]
+        unit = self.raw_units[cell]
+        code = self.cell_status[cell]
+        if code >= LOW:
+            status_name = _STATUS[code]
+            return {
+                "marker": marker,
+                "value": self.cell_value[cell],
+                "unit": unit,
+                "status": status_name,
+                "low": self.cell_low[cell],
+                "high": self.cell_high[cell],
+                "deviation": self.cell_deviation[cell],
+                "supplements": self.catalog.supplements_for(self.docs[self.cell_demo[cell]][col], status_name),
+            }
+        if code == NO_DOC:
+            return {"marker": marker, "value": val, "unit": unit, "status": "unknown"}
+        if code == UNIT_MISMATCH:
+            return {
+                "marker": marker,
+                "value": val,
+                "unit": unit,
+                "status": "unknown",
+                "reason": "unit_mismatch",
+                "expected_unit": self.docs[self.cell_demo[cell]][col].get("measurementUnits"),
+            }
+        return {"marker": marker, "value": val, "unit": unit, "status": "unknown", "reason": _REASON[code]}
+
+
+class _BatchEvaluations(MarkerEvaluations):
+    """A request's evaluation table backed by its batch cells, materialized only when a section reads one."""
+
+    def __init__(self, catalog, user_data, batch: MarkerBatch, cells: Dict[Tuple, int]):
+        super().__init__(catalog, user_data)
+        self.batch = batch
+        self.cells = cells
+
+    def out_of_range(self, marker_name, value, unit):
+        key = (marker_name, value, unit)
+        cell = self.cells.get(key)
+        if cell is None or key in self:
+            return super().out_of_range(marker_name, value, unit)
+        return self.batch.cell_status[cell] in (LOW, HIGH)
+
+    def __missing__(self, key):
+        cell = self.cells.get(key)
+        if cell is None:
+            return super().__missing__(key)
+        res = self[key] = self.batch.result(cell)
+        return res
+
+
+def evaluate_batch(requests: Iterable, catalog: RangesSnapshot, rules: ReportRules = None) -> List[Dict]:
+    """
+    Reports for many requests (ReportRequests or their dicts) against one
+    catalog snapshot; the same reports as evaluate() one request at a time.
+
+    Statuses come from the vectorized MarkerBatch. Per request, only the cells
+    that are out of range or that a rule reads are visited, and full
+    evaluation dicts are built only for cells a report section includes.
+    """
+    rules = rules or current_rules()
+    users = [request if isinstance(request, dict) else request.dict() for request in requests]
+    if np is None or not users:
+        return [evaluate(user_data, catalog, rules) for user_data in users]
+
+    batch = MarkerBatch(users, catalog)
+    always_for = [rules.always_index.get(column, ()) for column in batch.columns]
+    priority_for = [rules.priority_index.get(marker_key, ()) for _, marker_key in batch.columns]
+    rule_column = [bool(a or p) for a, p in zip(always_for, priority_for)]
+
+    out_of_range_cell = (batch.status == LOW) | (batch.status == HIGH)
+    picked = np.flatnonzero(out_of_range_cell | np.array(rule_column + [False], dtype=bool)[batch.cell_cols])
+    picked_starts = np.searchsorted(picked, batch.row_starts).tolist()
+    picked = picked.tolist()
+
+    reports = []
+    for row, user_data in enumerate(users):
+        cells = {}
+        always_hits = defaultdict(list)
+        priority_hits = defaultdict(dict)
+        out_of_range = []
+        for cell in picked[picked_starts[row]:picked_starts[row + 1]]:
+            col = batch.cols[cell]
+            marker_key = batch.markers[col]
+            val = batch.raw_values[cell]
+            unit = batch.raw_units[cell]
+            code = batch.cell_status[cell]
+            if code == LOW or code == HIGH:
+                out_of_range.append(
+                    {"marker": marker_key, "value": batch.cell_value[cell], "unit": unit, "status": _STATUS[code]}
+                )
+            if not rule_column[col]:
+                continue
+            cells.setdefault((marker_key, val, unit), cell)
+            for rule_index, position in always_for[col]:
+                always_hits[rule_index].append((position, marker_key, val, unit))
+            for hit in priority_for[col]:
+                slots = priority_hits[hit.group]
+                slot = (batch.panel_orders[cell], hit.position)
+                if slot not in slots or hit.rank < slots[slot][0]:
+                    slots[slot] = (hit.rank, hit.marker, val, unit)
+
+        evaluations = _BatchEvaluations(catalog, user_data, batch, cells)
+        reports.append(assemble_report(user_data, rules, evaluations, always_hits, priority_hits, out_of_range))
+    return reports
+
+
+
+async def generate_medical_reports(requests: List) -> List[Dict]:
+    """Batch counterpart of generate_medical_report(): one catalog snapshot, evaluated off the event loop."""
+    catalog = await ranges_catalog.get_snapshot()
+    return await asyncio.to_thread(evaluate_batch, requests, catalog)
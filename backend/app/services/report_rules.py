@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+RULES_JSON_PATH = Path(__file__).resolve().parent.parent / "report_rules.json"
+
+ALWAYS_KINDS = ("answer", "out_of_range", "ratio")
+
+
+@lru_cache(maxsize=1024)
+def marker_key_variants(marker: str) -> Tuple[str, ...]:
+    """Panel keys a marker may be submitted under (underscores, spaces or neither), the marker itself first."""
+    variants = [marker, marker.replace(" ", "_"), marker.replace("_", " "), marker.replace(" ", ""), marker.replace("_", "")]
+    return tuple(dict.fromkeys(variants))
+
+
+class Ratio(NamedTuple):
+    numerator: str
+    denominator: str
+    min: float
+    max: float
+
+
+@dataclass(frozen=True)
+class AlwaysRule:
+    """
+    One always-address section:
+      answer        the questionnaire `field` is one of `values`
+      out_of_range  any of `markers` in `panel` is low/high (or `missing_message` when none was submitted)
+      ratio         a `ratios` check over `markers` in `panel` fails
+    """
+
+    section: str
+    kind: str
+    message: str
+    field: Optional[str] = None
+    values: Tuple[str, ...] = ()
+    panel: Optional[str] = None
+    markers: Tuple[str, ...] = ()
+    ratios: Tuple[Ratio, ...] = ()
+    missing_message: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class PriorityGroup:
+    name: str
+    markers: Tuple[str, ...]
+    message: str
+    most_deviant_only: frozenset  # of these, only the single one furthest from range is reported
+
+
+class PriorityHit(NamedTuple):
+    """A panel key standing for a priority group marker."""
+
+    group: int
+    position: int  # of the marker within the group
+    marker: str
+    rank: int  # of the key among the marker's key variants; the lowest present in a panel wins
+
+
+@dataclass(frozen=True)
+class ReportRules:
+    """
+    One compiled, versioned generation of the report rules. Every lookup the
+    report engine makes while walking the submitted markers is a dict hit.
+    """
+
+    version: str
+    always: Tuple[AlwaysRule, ...]
+    groups: Tuple[PriorityGroup, ...]
+    messages: Dict[str, Dict[str, Optional[str]]]  # marker → "low"/"high" → message
+    always_index: Dict[Tuple[str, str], Tuple[Tuple[int, int], ...]]  # (panel, marker) → (rule, position)
+    priority_index: Dict[str, Tuple[PriorityHit, ...]]  # panel key → priority markers it may stand for
+
+    def message_for(self, marker: str, status: str) -> Optional[str]:
+        """A marker's user message; BUN/Creatinine style markers carry separate low and high messages."""
+        side = "low" if status == "low" else "high"
+        return self.messages.get(marker, {}).get(side)
+
+
+def _always_rule(raw: Dict) -> AlwaysRule:
+    kind = raw.get("kind")
+    if kind not in ALWAYS_KINDS:
+        raise ValueError(f"Unknown always-address rule kind {kind!r} in section {raw.get('section')!r}")
+    return AlwaysRule(
+        section=raw["section"],
+        kind=kind,
+        message=raw["message"],
+        field=raw.get("field"),
+        values=tuple(raw.get("values", ())),
+        panel=raw.get("panel"),
+        markers=tuple(raw.get("markers", ())),
+        ratios=tuple(Ratio(r["numerator"], r["denominator"], float(r["min"]), float(r["max"])) for r in raw.get("ratios", ())),
+        missing_message=raw.get("missing_message"),
+    )
+
+
+def compile_report_rules(data: Dict, version: str) -> ReportRules:
+    always = tuple(_always_rule(raw) for raw in data.get("always_address", []))
+    groups = tuple(
+        PriorityGroup(
+            name=raw["name"],
+            markers=tuple(raw["markers"]),
+            message=raw.get("message") or f"{raw['name']} markers need attention.",
+            most_deviant_only=frozenset(raw.get("most_deviant_only", ())),
+        )
+        for raw in data.get("priority_groups", [])
+    )
+
+    messages = {}
+    for marker, message in data.get("messages", {}).items():
+        if isinstance(message, dict):
+            messages[marker] = {"low": message.get("low"), "high": message.get("high")}
+        else:
+            messages[marker] = {"low": message, "high": message}
+
+    always_index: Dict[Tuple[str, str], List[Tuple[int, int]]] = defaultdict(list)
+    for rule_index, rule in enumerate(always):
+        if rule.kind == "out_of_range":
+            for position, marker in enumerate(rule.markers):
+                always_index[(rule.panel, marker)].append((rule_index, position))
+
+    priority_index: Dict[str, List[PriorityHit]] = defaultdict(list)
+    for group_index, group in enumerate(groups):
+        for position, marker in enumerate(group.markers):
+            for rank, key in enumerate(marker_key_variants(marker)):
+                priority_index[key].append(PriorityHit(group_index, position, marker, rank))
+
+    return ReportRules(
+        version=version,
+        always=always,
+        groups=groups,
+        messages=messages,
+        always_index={key: tuple(hits) for key, hits in always_index.items()},
+        priority_index={key: tuple(hits) for key, hits in priority_index.items()},
+    )
+
+
+def load_report_rules(path: Path = RULES_JSON_PATH) -> ReportRules:
+    """
+    Compile the rules file. The version is a hash of the file contents, so any
+    rule edit changes it and every worker reports the same version for the same file.
+    """
+    raw = path.read_bytes()
+    rules = compile_report_rules(json.loads(raw), hashlib.sha256(raw).hexdigest()[:12])
+    logger.info(
+        "Loaded report rules %s: %s always-address rules, %s priority groups",
+        rules.version, len(rules.always), len(rules.groups),
+    )
+    return rules
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+_signature = _file_signature(RULES_JSON_PATH)
+_current = load_report_rules()
+
+
+def current_rules() -> ReportRules:
+    """The report rules in effect right now; grab once per report."""
+    return _current
+
+
+def reload_if_changed() -> bool:
+    """
+    Recompile and swap the rules when report_rules.json's mtime/size changed.
+    A file that fails to parse or compile keeps the old rules. Blocking; run it in a thread.
+    """
+    global _current, _signature
+    signature = _file_signature(RULES_JSON_PATH)
+    if signature is None or signature == _signature:
+        return False
+    try:
+        rules = load_report_rules(RULES_JSON_PATH)
+    except Exception as e:
+        logger.warning("Keeping report rules %s; reload failed: %s", _current.version, e)
+        return False
+    _signature = signature
+    _current = rules  # single reference swap
+    return True
+
+
+class ReportRulesWatcher:
+    """Polls report_rules.json and hot-swaps the compiled rules when it changes."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run(), name="report-rules-watcher")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(reload_if_changed)
+            except Exception:
+                logger.exception("Report rules reload check failed")
+
+
+report_rules_watcher = ReportRulesWatcher(settings.REPORT_RULES_RELOAD_SECONDS)
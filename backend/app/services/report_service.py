@@ -1,10 +1,11 @@
-import re
-from collections import defaultdict
-from app.db import functional_ranges_collection, supplements_collection
+from app.services.ranges_catalog import ranges_catalog
+from app.services.report_rules import current_rules
 from fpdf import FPDF
+from collections import defaultdict
 import io
 import datetime
 
+
 def clean_text(text):
     if not text:
         return ""
@@ -225,424 +226,267 @@ def add_marker_table(pdf, markers):
         pdf.ln()
     pdf.ln(2)
 
-async def generate_medical_report(request):
-    user_data = request.dict()
-    lab_reports = user_data.get("lab_reports", {}) or {}
-    gender_at_birth = user_data.get("gender_at_birth") or user_data.get("gender")
-    menstruation_status = user_data.get("menstruation_status") or "None"
-    bowel = user_data.get("bowel_movements")
-
-    # Result buckets
-    always_address = []
-    other_out_of_range = []
-
-    # --- Load functional ranges from DB and index by marker (and normalized marker) ---
-    ranges_by_marker = defaultdict(list)
-    ranges_by_norm = defaultdict(list)
-
-    cursor = functional_ranges_collection.find({})
-    async for doc in cursor:
-        marker_name = doc.get("marker")
-        if marker_name:
-            ranges_by_marker[marker_name].append(doc)
-            norm = re.sub(r'[^a-z0-9]', '', marker_name.lower())
-            ranges_by_norm[norm].append(doc)
-
-    def normalize_marker(name: str):
-        if not name:
-            return ""
-        return re.sub(r'[^a-z0-9]', '', name.lower())
-
-    def find_best_range_doc(marker: str):
-        """
-        Find the best matching functional range doc for this user.
-        Priority:
-         1) exact marker name match with gender & menstruation_status
-         2) exact marker name match with gender
-         3) normalized marker name matches
-         4) fallback to any doc for marker
-        Returns None if none found.
-        """
-        candidates = ranges_by_marker.get(marker, [])
-        # try normalized key lookup if no direct candidates
-        if not candidates:
-            candidates = ranges_by_norm.get(normalize_marker(marker), [])
-
-        if not candidates:
-            return None
-
-        # scoring function
-        def score(doc):
-            s = 0
-            doc_gender = str(doc.get("gender") or "").lower()
-            doc_men = str(doc.get("menstruation_status") or "").lower()
-            if doc_gender and gender_at_birth and doc_gender == gender_at_birth.lower():
-                s += 4
-            # prefer docs that have "None" for menstruation_status when user's is None, else exact match
-            if doc_men and menstruation_status and doc_men == menstruation_status.lower():
-                s += 2
-            # prefer docs that specify a measurementUnits (slightly)
-            if doc.get("measurementUnits"):
-                s += 1
-            return s
-
-        best = max(candidates, key=score)
-        return best
-
-    async def fetch_supplements(supp_ids):
-        out = []
-        if not supp_ids:
-            return out
-        for sid in supp_ids:
-            if not sid:
-                continue
-            supp = await supplements_collection.find_one({"_id": sid})
-            if supp:
-                # normalize expected fields
-                out.append({
-                    "id": supp.get("_id"),
-                    "name": supp.get("name"),
-                    "dosage": supp.get("dosage"),
-                    "productLink": supp.get("productLink"),
-                    "description": supp.get("description"),
-                })
-        return out
-
-    def compute_deviation(value, low, high):
-        """Normalized deviation relative to range width (so different markers comparable)."""
-        try:
-            width = float(high) - float(low)
-            if width == 0:
-                width = 1.0
-            if value < low:
-                return (low - value) / width
-            elif value > high:
-                return (value - high) / width
-            else:
-                return 0.0
-        except Exception:
-            return 0.0
-
-    async def evaluate_marker(marker_name, value, unit):
-        """
-        Return dict:
-         {
-           "marker": marker_name,
-           "value": value,
-           "unit": unit,
-           "status": "normal"|"low"|"high"|"unknown"|"unit_mismatch",
-           "low": <functionalLow or None>,
-           "high": <functionalHigh or None>,
-           "deviation": float,
-           "supplements": [supplement objects]
-         }
-        """
-        doc = find_best_range_doc(marker_name)
-        if not doc:
-            return {"marker": marker_name, "value": value, "unit": unit, "status": "unknown"}
-
-        doc_unit = doc.get("measurementUnits")
-        # If units mismatch and we don't have conversion logic, mark unknown (safe)
-        if doc_unit and unit and unit.strip().lower() != doc_unit.strip().lower():
-            return {
-                "marker": marker_name,
-                "value": value,
-                "unit": unit,
-                "status": "unknown",
-                "reason": "unit_mismatch",
-                "expected_unit": doc_unit
-            }
-
-        low = doc.get("functionalLow")
-        high = doc.get("functionalHigh")
-        try:
-            if low is None or high is None:
-                return {"marker": marker_name, "value": value, "unit": unit, "status": "unknown", "reason": "no_range"}
-            v = float(value)
-            low_f = float(low)
-            high_f = float(high)
-        except Exception:
-            return {"marker": marker_name, "value": value, "unit": unit, "status": "unknown", "reason": "bad_values"}
-
-        if v < low_f:
-            status = "low"
-        elif v > high_f:
-            status = "high"
+def find_best_range_doc(catalog, marker: str, gender_at_birth, menstruation_status):
+    """
+    Find the best matching functional range doc for this user.
+    Priority:
+     1) exact marker name match with gender & menstruation_status
+     2) exact marker name match with gender
+     3) normalized marker name matches
+     4) fallback to any doc for marker
+    Returns None if none found. Resolved through the catalog's precompiled table.
+    """
+    return catalog.resolve(marker, gender_at_birth, menstruation_status)
+
+
+def compute_deviation(value, low, high):
+    """Normalized deviation relative to range width (so different markers comparable)."""
+    try:
+        width = float(high) - float(low)
+        if width == 0:
+            width = 1.0
+        if value < low:
+            return (low - value) / width
+        elif value > high:
+            return (value - high) / width
         else:
-            status = "normal"
-
-        deviation = compute_deviation(v, low_f, high_f)
-        # get suggested supplements from doc
-        supp_field = doc.get("ifLow") if status == "low" else doc.get("ifHigh")
-        supp_ids = supp_field.get("supplements") if isinstance(supp_field, dict) else None
-        supplements = await fetch_supplements(supp_ids or [])
+            return 0.0
+    except Exception:
+        return 0.0
+
+
+def evaluate_marker(catalog, marker_name, value, unit, gender_at_birth=None, menstruation_status=None):
+    """
+    Return dict:
+     {
+       "marker": marker_name,
+       "value": value,
+       "unit": unit,
+       "status": "normal"|"low"|"high"|"unknown"|"unit_mismatch",
+       "low": <functionalLow or None>,
+       "high": <functionalHigh or None>,
+       "deviation": float,
+       "supplements": [supplement objects]
+     }
+    """
+    doc = find_best_range_doc(catalog, marker_name, gender_at_birth, menstruation_status)
+    if not doc:
+        return {"marker": marker_name, "value": value, "unit": unit, "status": "unknown"}
+
+    doc_unit = doc.get("measurementUnits")
+    # If units mismatch and we don't have conversion logic, mark unknown (safe)
+    if doc_unit and unit and unit.strip().lower() != doc_unit.strip().lower():
         return {
             "marker": marker_name,
-            "value": v,
+            "value": value,
             "unit": unit,
-            "status": status,
-            "low": low_f,
-            "high": high_f,
-            "deviation": deviation,
-            "supplements": supplements
+            "status": "unknown",
+            "reason": "unit_mismatch",
+            "expected_unit": doc_unit
         }
 
-    # -----------------------
-    # --- Always Address ---
-    # -----------------------
+    low = doc.get("functionalLow")
+    high = doc.get("functionalHigh")
+    try:
+        if low is None or high is None:
+            return {"marker": marker_name, "value": value, "unit": unit, "status": "unknown", "reason": "no_range"}
+        v = float(value)
+        low_f = float(low)
+        high_f = float(high)
+    except Exception:
+        return {"marker": marker_name, "value": value, "unit": unit, "status": "unknown", "reason": "bad_values"}
 
-    # 1) Bowel Movements
-    if bowel in ["No", "Sometimes", "no", "sometimes"]:
-        always_address.append({
-            "section": "Bowel support",
-            "message": "Bowel support is needed. Review the ‘Why Bowel Movements Matter’ module inside the membership portal."
-        })
+    if v < low_f:
+        status = "low"
+    elif v > high_f:
+        status = "high"
+    else:
+        status = "normal"
+
+    deviation = compute_deviation(v, low_f, high_f)
+    # get suggested supplements from the catalog's denormalized recommendation table
+    supplements = catalog.supplements_for(doc, status)
+    return {
+        "marker": marker_name,
+        "value": v,
+        "unit": unit,
+        "status": status,
+        "low": low_f,
+        "high": high_f,
+        "deviation": deviation,
+        "supplements": supplements
+    }
 
-    # 2) RBC group (RBC, Hemoglobin, Hematocrit, MCV, MCH, MCHC, RDW)
-    rbc_markers = ["RBC", "Hemoglobin", "Hematocrit", "MCV", "MCH", "MCHC", "RDW"]
-    rbc_out = []
-    cbc_panel = lab_reports.get("CBC_with_Differential", {}) or {}
-    for m in rbc_markers:
-        if m in cbc_panel:
-            val = cbc_panel[m].get("value")
-            unit = cbc_panel[m].get("unit")
-            res = await evaluate_marker(m, val, unit)
-            if res.get("status") in ("low", "high"):
-                rbc_out.append(res)
-    if rbc_out:
-        always_address.append({
-            "section": "RBC Markers",
-            "results": rbc_out,
-            "message": "Methylation or iron is needed. Review the ‘Red Blood Cells’ module inside the membership portal to help determine which (or if both) is needed."
-        })
 
-    # 3) Platelets
-    if "Platelets" in cbc_panel:
-        pl_val = cbc_panel["Platelets"].get("value")
-        pl_unit = cbc_panel["Platelets"].get("unit")
-        pl_res = await evaluate_marker("Platelets", pl_val, pl_unit)
-        if pl_res.get("status") in ("low", "high"):
-            always_address.append({
-                "section": "Platelets",
-                "results": [pl_res],
-                "message": "Circulation support is needed. Review the ‘Platelet’ module inside the membership portal."
-            })
-
-    # 4) Cholesterol Pattern (always evaluate when lipid panel present)
-    lipid = lab_reports.get("Lipid_Panel")
-    if lipid:
-        try:
-            tc = float(lipid.get("Total_Cholesterol", {}).get("value"))
-            tg = float(lipid.get("Triglycerides", {}).get("value"))
-            hdl = float(lipid.get("HDL", {}).get("value"))
-            # Rule: Triglycerides approximately 1/2 of Total Cholesterol -> TC ≈ 2 * TG
-            # Acceptable 20% range: TC between 1.6*TG and 2.4*TG
-            tc_ok = (1.6 * tg) <= tc <= (2.4 * tg) if tg != 0 else True
-            # HDL approximately 1/2 of Triglycerides -> TG ≈ 2 * HDL
-            tg_ok = (1.6 * hdl) <= tg <= (2.4 * hdl) if hdl != 0 else True
-            if not (tc_ok and tg_ok):
-                always_address.append({
-                    "section": "Cholesterol Pattern",
-                    "results": [
-                        {"marker": "Total_Cholesterol", "value": tc, "unit": lipid.get("Total_Cholesterol", {}).get("unit")},
-                        {"marker": "Triglycerides", "value": tg, "unit": lipid.get("Triglycerides", {}).get("unit")},
-                        {"marker": "HDL", "value": hdl, "unit": lipid.get("HDL", {}).get("unit")},
-                    ],
-                    "message": "Your cholesterol pattern suggests deeper imbalance. Focus on your recommended food plan, balanced blood sugar, and bringing your markers into their functional ranges. Re-check in 6–8 weeks."
-                })
-        except Exception:
-            # ignore calculation if any missing or bad formatting
-            pass
-    else:
-        # Not required to add message when missing; spec wants cholesterol pattern flagged only when present.
+def ratio_section(rule, panel):
+    """
+    Ratio rule (e.g. the cholesterol pattern: TC ≈ 2 × TG and TG ≈ 2 × HDL, within 20%).
+    Returns the always-address section when a ratio is off; None when it holds
+    or any marker is missing or malformed.
+    """
+    if not panel:
+        return None
+    try:
+        values = {m: float(panel.get(m, {}).get("value")) for m in rule.markers}
+        ok = all(
+            r.min * values[r.denominator] <= values[r.numerator] <= r.max * values[r.denominator]
+            if values[r.denominator] != 0 else True
+            for r in rule.ratios
+        )
+    except Exception:
+        return None
+    if ok:
+        return None
+    return {
+        "section": rule.section,
+        "results": [{"marker": m, "value": values[m], "unit": panel.get(m, {}).get("unit")} for m in rule.markers],
+        "message": rule.message,
+    }
 
-        pass
 
-    # 5) Vitamin D
-    vit_panel = lab_reports.get("Vitamin_D_25_Hydroxy")
-    if vit_panel and "25_Hydroxy_Vitamin_D" in vit_panel:
-        vd = vit_panel["25_Hydroxy_Vitamin_D"]
-        vd_val = vd.get("value")
-        vd_unit = vd.get("unit")
-        vd_res = await evaluate_marker("25_Hydroxy_Vitamin_D", vd_val, vd_unit)
-        if vd_res.get("status") in ("low", "high"):
-            always_address.append({
-                "section": "Vitamin D",
-                "results": [vd_res],
-                "message": "Immune and hormone support is needed. Review the ‘Vitamin D’ module inside the membership portal."
-            })
-    else:
-        always_address.append({
-            "section": "Vitamin D",
-            "message": "Vitamin D not provided. You may want to check your level. You can ask your provider or order a 25-Hydroxy Vitamin D test."
-        })
+async def generate_medical_report(request):
+    """Prefetch the functional ranges catalog, then run the rules."""
+    catalog = await ranges_catalog.get_snapshot()
+    return evaluate(request, catalog)
+
+
+def evaluate(request, catalog, rules=None):
+    """
+    Build the structured report for one request (a ReportRequest or its dict)
+    against a ranges catalog snapshot and compiled report rules (the current
+    ones by default). Pure and synchronous: no I/O, so it can run in a worker
+    thread or process, or replay stored requests offline.
+    """
+    rules = rules or current_rules()
+    user_data = request if isinstance(request, dict) else request.dict()
+    lab_reports = user_data.get("lab_reports", {}) or {}
+    evaluations = MarkerEvaluations(catalog, user_data)
+
+    # --- One pass over the submitted markers, routed through the compiled rule index ---
+    always_hits = defaultdict(list)  # always rule → [(position, marker, value, unit)]
+    priority_hits = defaultdict(dict)  # group → (panel order, position) → (key rank, marker, value, unit)
+    out_of_range = []  # submission order, for "Other Markers Out of Range"
+    for panel_order, (panel_name, panel) in enumerate(lab_reports.items()):
+        for marker_key, data in panel.items():
+            val = data.get("value")
+            unit = data.get("unit")
+            res = evaluations(marker_key, val, unit)
+            if res.get("status") in ("low", "high"):
+                out_of_range.append(res)
+            for rule_index, position in rules.always_index.get((panel_name, marker_key), ()):
+                always_hits[rule_index].append((position, marker_key, val, unit))
+            # some labs use underscores or spaces: the first key variant of a marker present in a panel wins
+            for hit in rules.priority_index.get(marker_key, ()):
+                slots = priority_hits[hit.group]
+                slot = (panel_order, hit.position)
+                if slot not in slots or hit.rank < slots[slot][0]:
+                    slots[slot] = (hit.rank, hit.marker, val, unit)
+
+    return assemble_report(user_data, rules, evaluations, always_hits, priority_hits, out_of_range)
+
+
+class MarkerEvaluations(dict):
+    """
+    Per-request evaluation table, (marker, value, unit) → evaluate_marker()
+    result. Every report section reads through it, so each submitted marker is
+    resolved and evaluated once per report. Call it like evaluate_marker().
+    """
+
+    def __init__(self, catalog, user_data):
+        super().__init__()
+        self.catalog = catalog
+        self.gender_at_birth = user_data.get("gender_at_birth") or user_data.get("gender")
+        self.menstruation_status = user_data.get("menstruation_status") or "None"
+
+    def __call__(self, marker_name, value, unit):
+        return self[(marker_name, value, unit)]
+
+    def out_of_range(self, marker_name, value, unit):
+        """Whether the marker evaluates low or high."""
+        return self[(marker_name, value, unit)].get("status") in ("low", "high")
+
+    def __missing__(self, key):
+        marker_name, value, unit = key
+        res = self[key] = evaluate_marker(self.catalog, marker_name, value, unit, self.gender_at_birth, self.menstruation_status)
+        return res
+
+
+def assemble_report(user_data, rules, evaluations, always_hits, priority_hits, out_of_range):
+    """
+    Report sections from one routed pass over a request's markers (see evaluate()).
+    Only marker/value/unit/status are read from the `out_of_range` entries.
+    """
+    lab_reports = user_data.get("lab_reports", {}) or {}
 
     # -----------------------
-    # --- Priority Engine ---
+    # --- Always Address ---
     # -----------------------
+    always_address = []
+    for rule_index, rule in enumerate(rules.always):
+        if rule.kind == "answer":
+            if user_data.get(rule.field) in rule.values:
+                always_address.append({"section": rule.section, "message": rule.message})
+        elif rule.kind == "out_of_range":
+            hits = sorted(always_hits.get(rule_index, ()), key=lambda hit: hit[0])
+            results = [evaluations(*hit[1:]) for hit in hits if evaluations.out_of_range(*hit[1:])]
+            if results:
+                always_address.append({"section": rule.section, "results": results, "message": rule.message})
+            elif not hits and rule.missing_message:
+                always_address.append({"section": rule.section, "message": rule.missing_message})
+        elif rule.kind == "ratio":
+            section = ratio_section(rule, lab_reports.get(rule.panel))
+            if section:
+                always_address.append(section)
 
-    # Priority groups (ordered). Use canonical marker strings that match the lab input when possible.
-    top_priority_markers = ["Neutrophils", "Lymphocytes", "Monocytes", "Eosinophils", "Basophils", "Globulin", "Total_Protein", "Total Protein"]
-    second_priority_markers = ["Sodium", "Potassium", "Magnesium"]
-    third_priority_markers = ["Glucose", "Ferritin", "Iron", "TIBC"]
-    fourth_priority_markers = ["AST_SGOT", "ALT_SGPT", "AST", "ALT", "BUN", "Creatinine"]
-    fifth_priority_markers = ["TSH", "Free_T3", "Free_T4", "Reverse_T3", "T3", "T4", "Anti_TPO"]
-
-    # mapping of marker -> user message (per spec)
-    user_messages_map = {
-        # Top Priority
-        "Neutrophils": "Specific immune support is needed. Review the ‘Neutrophils’ module inside the membership portal.",
-        "Lymphocytes": "Specific immune support is needed. Review the ‘Lymphocytes’ module inside the membership portal.",
-        "Monocytes": "Drainage support is needed. Review the ‘Monocytes’ module inside the membership portal.",
-        "Eosinophils": "Specific immune support is needed. Review the ‘Eosinophils’ module inside the membership portal.",
-        "Basophils": "Specific immune support is needed. Review the ‘Basophils’ module inside the membership portal.",
-        "Globulin": "Intestinal and protein support is needed. Review the ‘Leaky Gut & Protein Balance’ module inside the membership portal.",
-        "Total_Protein": "Intestinal and protein support is needed. Review the ‘Leaky Gut & Protein Balance’ module inside the membership portal.",
-        "Total Protein": "Intestinal and protein support is needed. Review the ‘Leaky Gut & Protein Balance’ module inside the membership portal.",
-
-        # 2nd Priority
-        "Sodium": "Adrenal and mineral support is needed. Review the ‘Adrenal Stress’ module inside the membership portal.",
-        "Potassium": "Adrenal and mineral support is needed. Review the ‘Adrenal Stress’ module inside the membership portal.",
-        "Magnesium": "Mineral balance is needed. Review the ‘Magnesium’ module inside the membership portal.",
-
-        # 3rd Priority
-        "Glucose": "Blood sugar balance is needed. Review the ‘Blood Sugar Balance’ module inside the membership portal.",
-        "Ferritin": "Iron balance needs adjusted. Review the ‘Iron Panel’ module inside the membership portal.",
-        "Iron": "Iron balance needs adjusted. Review the ‘Iron Panel’ module inside the membership portal.",
-        "TIBC": "Iron balance needs adjusted. Review the ‘Iron Panel’ module inside the membership portal.",
-
-        # 4th Priority
-        "AST": "Congested liver needs support. Review the ‘Liver Stress’ module inside the membership portal.",
-        "AST_SGOT": "Congested liver needs support. Review the ‘Liver Stress’ module inside the membership portal.",
-        "ALT": "Congested liver needs support. Review the ‘Liver Stress’ module inside the membership portal.",
-        "ALT_SGPT": "Congested liver needs support. Review the ‘Liver Stress’ module inside the membership portal.",
-        "BUN_low": "Congested liver needs support. Review the ‘Liver Stress’ module inside the membership portal.",
-        "BUN_high": "Kidney function needs support. Review the ‘Kidney Stress’ module inside the membership portal.",
-        "Creatinine_low": "Congested liver needs support. Review the ‘Liver Stress’ module inside the membership portal.",
-        "Creatinine_high": "Kidney function needs support. Review the ‘Kidney Stress’ module inside the membership portal.",
-
-        # 5th Priority (Thyroid)
-        "TSH": "Thyroid balance needs support. Review the ‘Thyroid Health’ section inside the membership portal.",
-        "Free_T3": "Thyroid balance needs support. Review the ‘Thyroid Health’ section inside the membership portal.",
-        "Free_T4": "Thyroid balance needs support. Review the ‘Thyroid Health’ section inside the membership portal.",
-        "Reverse_T3": "Thyroid balance needs support. Review the ‘Thyroid Health’ section inside the membership portal.",
-        "T3": "Thyroid balance needs support. Review the ‘Thyroid Health’ section inside the membership portal.",
-        "T4": "Thyroid balance needs support. Review the ‘Thyroid Health’ section inside the membership portal.",
-        "Anti_TPO": "Thyroid balance needs support. Review the ‘Thyroid Health’ section inside the membership portal.",
-    }
-
-    # convenience to scan markers in lab_reports
-    async def collect_out_of_range_for_list(marker_list):
-        found = []
-        for panel in lab_reports.values():
-            for marker in marker_list:
-                # attempt multiple possible keys (some labs use underscores or spaces / different capitalization)
-                possible_keys = {marker, marker.replace(" ", "_"), marker.replace("_", " "), marker.replace(" ", ""), marker.replace("_", "")}
-                for key in possible_keys:
-                    if key in panel:
-                        val = panel[key].get("value")
-                        unit = panel[key].get("unit")
-                        res = await evaluate_marker(marker, val, unit)
-                        if res.get("status") in ("low", "high"):
-                            found.append(res)
-                        break  # found marker in this panel, don't check other possible key variants
-        return found
-
-    # Priority evaluation order
-    priority_groups = [
-        ("Top Priority", top_priority_markers),
-        ("2nd Priority", second_priority_markers),
-        ("3rd Priority", third_priority_markers),
-        ("4th Priority", fourth_priority_markers),
-        ("5th Priority", fifth_priority_markers),
-    ]
-
-    # Keep track of which markers were used in Always Address so we don't duplicate
-    always_markers = set()
-    for a in always_address:
-        results = a.get("results") or []
-        for r in results:
-            always_markers.add(r.get("marker"))
+    # -----------------------
+    # --- Priority Engine ---
+    # -----------------------
 
     # Evaluate priorities in order, stop at first where we find out-of-range markers
     selected_priority = None
-    selected_priority_results = []
-
-    for pname, plist in priority_groups:
-        group_out = await collect_out_of_range_for_list(plist)
+    for group_index, group in enumerate(rules.groups):
+        slots = priority_hits.get(group_index, {})
+        found = [slots[slot][1:] for slot in sorted(slots)]
+        group_out = [evaluations(*key) for key in found if evaluations.out_of_range(*key)]
         if not group_out:
             continue
 
-        # Top Priority special rule: for "Differentials" only select the single one furthest from range
-        if pname == "Top Priority":
-            # extract differential subset
-            differentials = [m for m in group_out if m["marker"] in ["Neutrophils", "Lymphocytes", "Monocytes", "Eosinophils", "Basophils"]]
-            if differentials:
-                # pick single differential with largest deviation
-                chosen = max(differentials, key=lambda x: x.get("deviation", 0.0))
-                # create result for chosen
-                chosen_marker = chosen["marker"]
-                msg = user_messages_map.get(chosen_marker)
-                # add supplements already present in chosen
-                # priority result only contains the chosen differential
-                selected_priority = {"priority": pname, "results": [chosen], "message": msg}
-                # Other group_out items (including globulin/total protein) should be moved to other_out_of_range (per spec)
-                # We'll let other_out_of_range be populated later below.
-                break
-            else:
-                # no differentials out-of-range; use other top markers (e.g., Globulin, Total Protein)
-                # include all of them as the group's out-of-range markers
-                # attach messages per marker
-                res_with_msgs = []
-                for m in group_out:
-                    # skip differentials (none present here) - only globulin/total protein expected
-                    msg = user_messages_map.get(m["marker"], None)
-                    res_with_msgs.append({**m, "user_message": msg})
-                selected_priority = {"priority": pname, "results": res_with_msgs, "message": "Top priority markers need attention."}
-                break
+        # e.g. Top Priority differentials: only the single one furthest from range is reported
+        most_deviant = [m for m in group_out if m["marker"] in group.most_deviant_only]
+        if most_deviant:
+            chosen = max(most_deviant, key=lambda x: x.get("deviation", 0.0))
+            msg = rules.message_for(chosen["marker"], chosen["status"])
+            # the other group markers (e.g. globulin/total protein) are reported under other_out_of_range
+            selected_priority = {"priority": group.name, "results": [chosen], "message": msg}
         else:
-            # For other priorities include all out-of-range markers found in this group
-            res_with_msgs = []
-            for m in group_out:
-                # special handling for BUN and Creatinine messages depend on high/low
-                msg_key = m["marker"]
-                if m["marker"] == "BUN":
-                    key = "BUN_low" if m["status"] == "low" else "BUN_high"
-                    msg = user_messages_map.get(key)
-                elif m["marker"] == "Creatinine":
-                    key = "Creatinine_low" if m["status"] == "low" else "Creatinine_high"
-                    msg = user_messages_map.get(key)
-                else:
-                    msg = user_messages_map.get(m["marker"])
-                res_with_msgs.append({**m, "user_message": msg})
-            selected_priority = {"priority": pname, "results": res_with_msgs, "message": f"{pname} markers need attention."}
-            break
-
-    # build list of all markers that were included in priority_focus and always_address to exclude from "other" list
+            res_with_msgs = [{**m, "user_message": rules.message_for(m["marker"], m["status"])} for m in group_out]
+            selected_priority = {"priority": group.name, "results": res_with_msgs, "message": group.message}
+        break
+
+    # Markers included in always_address and priority_focus are excluded from the "other" list
+    always_markers = set()
+    for a in always_address:
+        for r in a.get("results") or []:
+            always_markers.add(r.get("marker"))
     priority_markers_included = set()
     if selected_priority:
         for r in selected_priority.get("results", []):
             priority_markers_included.add(r.get("marker"))
 
-    # Finally, populate "Other Markers Out of Range" by scanning all lab markers
-    for panel_name, panel in lab_reports.items():
-        for marker_key, data in panel.items():
-            # we will evaluate by canonical marker_key (but evaluate_marker accepts any string)
-            val = data.get("value")
-            unit = data.get("unit")
-            eval_res = await evaluate_marker(marker_key, val, unit)
-            if eval_res.get("status") in ("low", "high"):
-                if marker_key in always_markers or eval_res.get("marker") in priority_markers_included:
-                    continue
-                # avoid duplicates in other_out_of_range
-                already = any(o.get("marker") == eval_res.get("marker") for o in other_out_of_range)
-                if not already:
-                    other_out_of_range.append({
-                        "marker": eval_res.get("marker"),
-                        "value": eval_res.get("value"),
-                        "unit": eval_res.get("unit"),
-                        "status": eval_res.get("status")
-                    })
+    # Finally, populate "Other Markers Out of Range" (first occurrence of each marker)
+    other_out_of_range = []
+    other_markers = set()
+    for eval_res in out_of_range:
+        marker = eval_res.get("marker")
+        if marker in always_markers or marker in priority_markers_included or marker in other_markers:
+            continue
+        other_markers.add(marker)
+        other_out_of_range.append({
+            "marker": marker,
+            "value": eval_res.get("value"),
+            "unit": eval_res.get("unit"),
+            "status": eval_res.get("status")
+        })
 
     # Compose final structured report consistent with spec
     report = {
@@ -650,9 +494,10 @@ async def generate_medical_report(request):
         "always_address": always_address,
         "priority_focus": selected_priority,
         "other_out_of_range": other_out_of_range,
+        "rules_version": rules.version,
         "note": "We are prioritizing the most important markers first. By addressing these, other markers may come into range. Please recheck in 6–8 weeks.",
         "recheck_window": "Re-test in 6–8 weeks unless otherwise specified by your healthcare provider.",
         "safety_note": "If any of your results are far outside the healthy window, it may mean your body needs immediate support. Please contact your licensed healthcare provider promptly. If you feel unwell, seek urgent care."
     }
 
-    return report
\ No newline at end of file
+    return report
@@ -0,0 +1,134 @@
+import base64
+import hashlib
+import json
+import tempfile
+from dataclasses import dataclass, field
+from typing import IO, AsyncIterator, Dict, Iterator, Optional
+
+from fastapi import HTTPException, UploadFile
+
+from app.config import settings
+
+# Read/encode granularity; a multiple of 3 so base64 chunks concatenate without padding
+CHUNK_SIZE = 3 * 64 * 1024
+
+SUPPORTED_EXTENSIONS = (".pdf", ".png", ".jpg", ".jpeg", ".webp")
+
+
+def sniff_mime(head: bytes) -> Optional[str]:
+    """Detect the upload type from its magic bytes."""
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+@dataclass
+class SpooledUpload:
+    """An upload held in a spooled temp file (memory up to a threshold, then disk)."""
+
+    filename: str
+    mime: str
+    size: int
+    sha256: str
+    fileobj: IO[bytes] = field(repr=False)
+
+    @classmethod
+    def from_bytes(cls, filename: str, mime: str, data: bytes) -> "SpooledUpload":
+        fileobj = tempfile.SpooledTemporaryFile(max_size=settings.OCR_SPOOL_MEMORY_BYTES)
+        fileobj.write(data)
+        return cls(filename, mime, len(data), hashlib.sha256(data).hexdigest(), fileobj)
+
+    def iter_chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        # Seek before every read so concurrent readers (e.g. hedged requests) don't interfere
+        position = 0
+        while True:
+            self.fileobj.seek(position)
+            chunk = self.fileobj.read(chunk_size)
+            if not chunk:
+                return
+            position += len(chunk)
+            yield chunk
+
+    def read_all(self) -> bytes:
+        """Load the whole upload; only for stages that genuinely need every byte at once."""
+        self.fileobj.seek(0)
+        return self.fileobj.read()
+
+    def close(self) -> None:
+        self.fileobj.close()
+
+
+async def spool_upload(file: UploadFile) -> SpooledUpload:
+    """
+    Copy an upload into a spooled temp file chunk by chunk, hashing as it goes.
+    The type is checked against the magic bytes of the first chunk and the size
+    limit is enforced while reading, so bad files are rejected early.
+    """
+    filename = (file.filename or "upload").lower()
+    if not filename.endswith(SUPPORTED_EXTENSIONS):
+        raise HTTPException(status_code=400, detail=f"Unsupported file type: {filename}")
+
+    limit = settings.OCR_MAX_UPLOAD_BYTES
+    if file.size is not None and file.size > limit:
+        raise HTTPException(status_code=413, detail=f"File too large: {filename} (max {limit} bytes)")
+
+    first = await file.read(CHUNK_SIZE)
+    mime = sniff_mime(first)
+    if mime is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported or corrupt file: {filename}")
+
+    digest = hashlib.sha256()
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.OCR_SPOOL_MEMORY_BYTES)
+    size = 0
+    chunk = first
+    try:
+        while chunk:
+            size += len(chunk)
+            if size > limit:
+                raise HTTPException(status_code=413, detail=f"File too large: {filename} (max {limit} bytes)")
+            digest.update(chunk)
+            spool.write(chunk)
+            chunk = await file.read(CHUNK_SIZE)
+    except BaseException:
+        spool.close()
+        raise
+
+    return SpooledUpload(filename, mime, size, digest.hexdigest(), spool)
+
+
+def data_url_payload(upload: SpooledUpload, payload: Dict, url_field: str) -> "StreamedPayload":
+    """
+    Build a JSON body whose document.<url_field> is a base64 data URL of the
+    upload, encoded and streamed chunk by chunk instead of held in memory.
+    """
+    marker = "__UPLOAD_BASE64__"
+    body = json.loads(json.dumps(payload))
+    body["document"][url_field] = marker
+    prefix, suffix = json.dumps(body).split(marker)
+    prefix = f"{prefix}data:{upload.mime};base64,".encode()
+    return StreamedPayload(upload, prefix, suffix.encode())
+
+
+class StreamedPayload:
+    """Async byte stream of a JSON OCR payload with a known Content-Length."""
+
+    def __init__(self, upload: SpooledUpload, prefix: bytes, suffix: bytes):
+        self.upload = upload
+        self.prefix = prefix
+        self.suffix = suffix
+
+    @property
+    def content_length(self) -> int:
+        return len(self.prefix) + 4 * ((self.upload.size + 2) // 3) + len(self.suffix)
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield self.prefix
+        for chunk in self.upload.iter_chunks():
+            yield base64.b64encode(chunk)
+        yield self.suffix
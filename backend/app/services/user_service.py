@@ -22,6 +22,12 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
         logger.info(f"Error occurred while fetching user against id ",ex)
         raise HTTPException(status_code=401, detail="Invalid token")
 
+async def get_current_admin(user_id: str = Depends(get_current_user)):
+    user = await db.users.find_one({"_id": ObjectId(user_id)}, {"is_admin": 1})
+    if not user or not user.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user_id
+
 async def update_user_profile(user_id: str, name: str = None, gender: str = None, profile_pic: str = None):
     try:
         # Only include fields that are not None and not empty strings
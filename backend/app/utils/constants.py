@@ -52,4 +52,5 @@ MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY")
 # if not MISTRAL_API_KEY:
 #     raise RuntimeError("Please set MISTRAL_API_KEY in environment variables")
 
-MISTRAL_API_URL = "https://api.mistral.ai/v1/ocr"
\ No newline at end of file
+MISTRAL_API_URL = "https://api.mistral.ai/v1/ocr"
+MISTRAL_OCR_MODEL = "mistral-ocr-latest"
\ No newline at end of file
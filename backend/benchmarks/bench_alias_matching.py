@@ -0,0 +1,130 @@
+"""
+Alias matching scaling benchmark.
+
+Compares the legacy per-alias regex scan (aliases × text length) against the
+single-pass AliasMatcher (text length only), then the legacy scan against the
+whole extraction pipeline, extract_markers_from_pages() (tables, free text and
+the fuzzy pass), over alias tables built from the same synthetic aliases.
+
+The legacy snippet helpers live here only as the baseline; the service no
+longer uses them.
+
+Run from backend/:  python -m benchmarks.bench_alias_matching
+"""
+import random
+import re
+import string
+import time
+from typing import Optional, Tuple
+
+from app.services.alias_matcher import AliasMatcher
+from app.services.alias_tables import build_alias_tables
+from app.services.marker_extraction import PageIndex
+from app.services.ocr_service import extract_markers_from_pages
+from app.utils.constants import NUMERIC_PATTERN, UNIT_PATTERN
+
+random.seed(7)
+
+_NUMERIC_RE = re.compile(NUMERIC_PATTERN)
+_UNIT_RE = re.compile(UNIT_PATTERN)
+
+
+def find_value_unit_after(text: str, start_idx: int) -> Tuple[Optional[float], Optional[str]]:
+    """Legacy: the first numeric and unit in the 100 chars following start_idx."""
+    snippet = text[max(0, start_idx) : start_idx + 100]
+
+    val_match = _NUMERIC_RE.search(snippet)
+    if not val_match:
+        return None, None
+
+    try:
+        value = float(val_match.group())
+    except ValueError:
+        return None, None
+
+    unit_match = _UNIT_RE.search(snippet, val_match.end())
+    unit = unit_match.group().strip() if unit_match else None
+
+    return value, unit
+
+
+def find_value_unit_near(text: str, keyword: str) -> Tuple[Optional[float], Optional[str]]:
+    """Legacy: the value and unit after the first occurrence of keyword."""
+    match = re.search(re.escape(keyword), text, re.IGNORECASE)
+    if not match:
+        return None, None
+    return find_value_unit_after(text, match.end())
+
+
+def make_aliases(count):
+    aliases = set()
+    while len(aliases) < count:
+        aliases.add("".join(random.choices(string.ascii_lowercase, k=random.randint(6, 14))))
+    return list(aliases)
+
+
+def make_text(aliases, size):
+    words = ["result", "range", "flag", "page", "collected", "reported", "specimen", "normal"]
+    lines = []
+    length = 0
+    while length < size:
+        if random.random() < 0.2:
+            line = f"{random.choice(aliases)} {random.uniform(0.1, 300):.1f} mg/dL"
+        else:
+            line = " ".join(random.choices(words, k=8))
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+
+def make_tables(aliases):
+    return build_alias_tables(
+        {"labTests": [{"officialName": alias, "aliases": [], "units": ["mg/dL"]} for alias in aliases]}, "bench"
+    )
+
+
+def legacy_extract(aliases, text):
+    found = {}
+    for alias in aliases:
+        if re.search(re.escape(alias), text, re.IGNORECASE):
+            found[alias] = find_value_unit_near(text, alias)
+    return found
+
+
+def matcher_extract(matcher, text):
+    index = PageIndex(text)
+    return {alias: index.value_unit_after(end) for alias, (_, end) in matcher.first_occurrences(text).items()}
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def run(label, cases):
+    print(f"\n{label}")
+    print(
+        f"{'aliases':>8} {'text_chars':>11} {'legacy_ms':>10} {'matcher_ms':>11} {'speedup':>8}"
+        f" {'pipeline_ms':>12} {'speedup':>8}"
+    )
+    for n_aliases, text_size in cases:
+        aliases = make_aliases(n_aliases)
+        text = make_text(aliases[:50], text_size)
+        matcher = AliasMatcher(aliases)
+        tables = make_tables(aliases)
+        legacy = timed(lambda: legacy_extract(aliases, text))
+        single = timed(lambda: matcher_extract(matcher, text))
+        pipeline = timed(lambda: extract_markers_from_pages([text], tables))
+        print(
+            f"{n_aliases:>8} {len(text):>11} {legacy:>10.2f} {single:>11.2f} {legacy / single:>7.1f}x"
+            f" {pipeline:>12.2f} {legacy / pipeline:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    run("Alias-count scaling (text fixed at ~50k chars)", [(n, 50_000) for n in (100, 200, 400, 800, 1600, 3200)])
+    run("Text-size scaling (aliases fixed at 400)", [(400, n) for n in (10_000, 20_000, 40_000, 80_000, 160_000, 320_000)])
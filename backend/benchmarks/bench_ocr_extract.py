@@ -0,0 +1,82 @@
+"""
+OCR pipeline throughput / tail-latency benchmark against the fake OCR server.
+
+Start the stand-in server first (see benchmarks/fake_ocr_server.py), e.g.
+  FAKE_OCR_MODE=synthetic FAKE_OCR_LATENCY=lognormal:0.5:0.6 FAKE_OCR_ERROR_RATE=0.02 \
+      uvicorn benchmarks.fake_ocr_server:app --port 9100
+
+then run from backend/:
+  OCR_API_URL=http://127.0.0.1:9100/v1/ocr python -m benchmarks.bench_ocr_extract [requests] [concurrency] [pages]
+
+Each request is one run_extraction() over a freshly generated scanned PDF
+(no text layer), so every page goes through remote OCR; the result cache is
+disabled so repeated documents still hit the server.
+"""
+import asyncio
+import io
+import statistics
+import sys
+import time
+
+from pypdf import PdfWriter
+
+from app.config import settings
+from app.services.ocr_client import close_ocr_client, pool_stats, start_ocr_client
+from app.services.ocr_resilience import ocr_caller
+from app.services.ocr_service import OcrExtractionError, run_extraction
+from app.services.upload_spool import SpooledUpload
+
+
+def make_pdf(number: int, pages: int) -> SpooledUpload:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=612, height=792)
+    writer.add_metadata({"/Title": f"bench-{number}"})  # distinct bytes → distinct hash
+    out = io.BytesIO()
+    writer.write(out)
+    return SpooledUpload.from_bytes(f"bench-{number}.pdf", "application/pdf", out.getvalue())
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def main(requests: int, concurrency: int, pages: int) -> None:
+    settings.OCR_CACHE_ENABLED = False
+    await start_ocr_client()
+    slots = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+
+    async def one(number: int) -> None:
+        nonlocal failures
+        upload = make_pdf(number, pages)
+        async with slots:
+            started = time.perf_counter()
+            try:
+                await run_extraction([upload])
+            except OcrExtractionError:
+                failures += 1
+            finally:
+                latencies.append(time.perf_counter() - started)
+                upload.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    stats = pool_stats()
+    await close_ocr_client()
+
+    print(f"OCR endpoint: {settings.OCR_API_URL or '(Mistral)'}")
+    print(f"{requests} requests x {pages} pages, concurrency {concurrency}: {elapsed:.2f}s")
+    print(f"throughput   {requests / elapsed:8.2f} req/s  {requests * pages / elapsed:8.2f} pages/s")
+    print(f"latency ms   p50 {percentile(latencies, 50) * 1000:8.1f}  p95 {percentile(latencies, 95) * 1000:8.1f}"
+          f"  p99 {percentile(latencies, 99) * 1000:8.1f}  mean {statistics.mean(latencies) * 1000:8.1f}")
+    print(f"failed       {failures}")
+    print(f"resilience   {ocr_caller.snapshot()}")
+    print(f"http pool    {stats}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    asyncio.run(main(*(args + [200, 20, 3][len(args):])))
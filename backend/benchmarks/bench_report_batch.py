@@ -0,0 +1,51 @@
+"""
+Batch report evaluation throughput: one evaluate() per patient vs. the
+vectorized evaluate_batch(), at 1k / 10k / 100k patients by default.
+
+Both paths keep the reports they build, as a caller would; only one
+path's reports are alive at a time, and every batch report is then checked
+against a fresh evaluate() of the same request. The
+catalog snapshot is built from the bundled JSON seed files (no database);
+requests are full lab submissions as in bench_report_evaluations.
+
+Run from backend/:  python -m benchmarks.bench_report_batch [patients ...]
+"""
+import random
+import sys
+import time
+
+from app.services.report_batch import evaluate_batch
+from app.services.report_service import evaluate
+from benchmarks.bench_report_evaluations import load_snapshot, make_request
+
+
+def single_path(requests, snapshot):
+    return [evaluate(request, snapshot) for request in requests]
+
+
+def main(sizes):
+    ranges, snapshot = load_snapshot()
+    rng = random.Random(11)
+    pool = [make_request(rng, ranges).dict() for _ in range(1000)]
+
+    print(f"{'patients':>9} {'single (s)':>11} {'batch (s)':>10} {'single/s':>10} {'batch/s':>10} {'speedup':>8}")
+    for size in sizes:
+        requests = [pool[i % len(pool)] for i in range(size)]
+        started = time.perf_counter()
+        single = single_path(requests, snapshot)
+        single_s = time.perf_counter() - started
+        del single
+        started = time.perf_counter()
+        batch = evaluate_batch(requests, snapshot)
+        batch_s = time.perf_counter() - started
+        if any(report != evaluate(request, snapshot) for request, report in zip(requests, batch)):
+            raise SystemExit(f"batch reports differ from single-report path at {size} patients")
+        del batch
+        print(
+            f"{size:>9} {single_s:>11.2f} {batch_s:>10.2f} {size / single_s:>10.0f} {size / batch_s:>10.0f}"
+            f" {single_s / batch_s:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000])
@@ -0,0 +1,119 @@
+"""
+Marker evaluations per report, without and with the per-request evaluation table.
+
+Both runs count the same thing: evaluate_marker() calls (range resolution, unit
+check, deviation, supplement copies), by wrapping it for the run. Without the
+table every section read of a marker runs one, as before the table existed;
+with it only distinct (marker, value, unit) triples do. The catalog snapshot
+is built from the bundled JSON seed files, so no database is needed.
+
+Run from backend/:  python -m benchmarks.bench_report_evaluations [reports]
+"""
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+from app.auth.schemas import ReportRequest
+from app.services import report_service
+from app.services.ranges_catalog import RangesSnapshot
+from app.utils.constants import CANONICAL_PANELS
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+
+
+def load_snapshot():
+    ranges = json.loads((APP_DIR / "functional_ranges.json").read_text())
+    for i, doc in enumerate(ranges):
+        doc.setdefault("_id", f"range_{i}")
+    supplements = json.loads((APP_DIR / "supplements.json").read_text())
+    return ranges, RangesSnapshot.build(1, ranges, supplements)
+
+
+def make_request(rng, ranges):
+    """A full lab submission: every canonical panel, values spread across and outside the functional ranges."""
+    bounds = {doc["marker"]: (doc.get("functionalLow"), doc.get("functionalHigh"), doc.get("measurementUnits")) for doc in ranges}
+    lab_reports = {}
+    for panel, markers in CANONICAL_PANELS.items():
+        lab_reports[panel] = {}
+        for marker in markers:
+            low, high, unit = bounds.get(marker, (1, 100, ""))
+            low = low if isinstance(low, (int, float)) else 1
+            high = high if isinstance(high, (int, float)) else 100
+            span = (high - low) or 1
+            lab_reports[panel][marker] = {"value": round(rng.uniform(low - span, high + span), 2), "unit": unit or ""}
+    return ReportRequest(
+        user_id=f"bench-{rng.randint(1, 999)}",
+        age_over_18=True,
+        bloodwork_within_6_months=True,
+        gender="Female",
+        gender_at_birth=rng.choice(["Male", "Female"]),
+        pregnant_or_nursing=False,
+        menstruation_status=rng.choice(["None", "Menstruating"]),
+        bowel_movements=rng.choice(["Yes", "No"]),
+        lab_upload_option="manual",
+        lab_reports=lab_reports,
+    )
+
+
+class UnmemoizedEvaluations(report_service.MarkerEvaluations):
+    """
+    Every section read of a marker runs a full evaluation, as before the table.
+    An out_of_range() check and the read right after it are one section read.
+    """
+
+    def __init__(self, catalog, user_data):
+        super().__init__(catalog, user_data)
+        self._peeked = None
+
+    def out_of_range(self, marker_name, value, unit):
+        key = (marker_name, value, unit)
+        self._peeked = key, self.__missing__(key)
+        return self._peeked[1].get("status") in ("low", "high")
+
+    def __getitem__(self, key):
+        peeked, self._peeked = self._peeked, None
+        if peeked is not None and peeked[0] == key:
+            return peeked[1]
+        return self.__missing__(key)
+
+
+def count_evaluations(requests, snapshot, table):
+    """(evaluate_marker() calls, seconds) for one evaluate() per request using `table`."""
+    calls = 0
+    evaluate_marker = report_service.evaluate_marker
+
+    def counted(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return evaluate_marker(*args, **kwargs)
+
+    original_table = report_service.MarkerEvaluations
+    report_service.evaluate_marker = counted
+    report_service.MarkerEvaluations = table
+    try:
+        started = time.perf_counter()
+        for request in requests:
+            report_service.evaluate(request, snapshot)
+        return calls, time.perf_counter() - started
+    finally:
+        report_service.evaluate_marker = evaluate_marker
+        report_service.MarkerEvaluations = original_table
+
+
+def main(count: int):
+    ranges, snapshot = load_snapshot()
+    rng = random.Random(7)
+    requests = [make_request(rng, ranges) for _ in range(count)]
+    submitted = sum(len(panel) for panel in requests[0].dict()["lab_reports"].values())
+
+    print(f"{count} reports, {submitted} submitted markers each; evaluate_marker() calls per report:")
+    for label, table in (("without table (one per section read)", UnmemoizedEvaluations),
+                         ("with per-request table", report_service.MarkerEvaluations)):
+        calls, elapsed = count_evaluations(requests, snapshot, table)
+        print(f"  {label:<38} {calls / count:6.1f}   {elapsed * 1000 / count:.2f} ms/report")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,208 @@
+"""
+Stand-in for Mistral's /v1/ocr endpoint, for offline load and regression testing.
+
+Responses are looked up by the SHA-256 of the decoded document:
+  replay     serve <recordings>/<sha256>.json when present, else a synthetic page set
+  record     forward to the real API, save the response, then serve it
+  synthetic  always generate lab-table pages from lab_test_aliases.json
+
+Run from backend/:
+  FAKE_OCR_LATENCY=lognormal:0.8:0.6 FAKE_OCR_ERROR_RATE=0.02 \
+      uvicorn benchmarks.fake_ocr_server:app --port 9100
+and point the API at it with OCR_API_URL=http://127.0.0.1:9100/v1/ocr.
+
+Environment:
+  FAKE_OCR_MODE            replay | record | synthetic            (replay)
+  FAKE_OCR_RECORDINGS_DIR  where <sha256>.json files live         (benchmarks/ocr_recordings)
+  FAKE_OCR_UPSTREAM_URL    real endpoint for record mode          (MISTRAL_API_URL)
+  FAKE_OCR_LATENCY         fixed:S | uniform:LO:HI | lognormal:MEDIAN:SIGMA   (fixed:0)
+  FAKE_OCR_PAGE_LATENCY    extra seconds per page                 (0)
+  FAKE_OCR_ERROR_RATE      share of calls answered 503            (0)
+  FAKE_OCR_RATE_LIMIT_RATE share of calls answered 429 + Retry-After  (0)
+  FAKE_OCR_PAGES           pages synthesized for an image / unreadable PDF  (1)
+  FAKE_OCR_IMAGE_BYTES     base64 image payload per page when include_image_base64  (0)
+  FAKE_OCR_SEED            RNG seed                               (unset)
+"""
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import math
+import os
+import random
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.services.alias_tables import current_tables
+from app.utils.constants import MISTRAL_API_KEY, MISTRAL_API_URL
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+
+@dataclass
+class FakeOcrConfig:
+    mode: str
+    recordings_dir: Path
+    upstream_url: str
+    latency: str
+    page_latency: float
+    error_rate: float
+    rate_limit_rate: float
+    pages: int
+    image_bytes: int
+
+    @classmethod
+    def from_env(cls) -> "FakeOcrConfig":
+        env = os.environ.get
+        return cls(
+            mode=env("FAKE_OCR_MODE", "replay"),
+            recordings_dir=Path(env("FAKE_OCR_RECORDINGS_DIR", Path(__file__).parent / "ocr_recordings")),
+            upstream_url=env("FAKE_OCR_UPSTREAM_URL", MISTRAL_API_URL),
+            latency=env("FAKE_OCR_LATENCY", "fixed:0"),
+            page_latency=float(env("FAKE_OCR_PAGE_LATENCY", "0")),
+            error_rate=float(env("FAKE_OCR_ERROR_RATE", "0")),
+            rate_limit_rate=float(env("FAKE_OCR_RATE_LIMIT_RATE", "0")),
+            pages=int(env("FAKE_OCR_PAGES", "1")),
+            image_bytes=int(env("FAKE_OCR_IMAGE_BYTES", "0")),
+        )
+
+
+def sample_latency(spec: str, rng: random.Random) -> float:
+    kind, *params = spec.split(":")
+    values = [float(p) for p in params]
+    if kind == "fixed":
+        return values[0] if values else 0.0
+    if kind == "uniform":
+        return rng.uniform(values[0], values[1])
+    if kind == "lognormal":
+        median, sigma = values
+        return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def decode_document(body: Dict) -> bytes:
+    document = body.get("document", {})
+    url = document.get("document_url") or document.get("image_url") or ""
+    if not url.startswith("data:"):
+        return url.encode()
+    return base64.b64decode(url.split(",", 1)[1])
+
+
+def _pdf_page_count(data: bytes) -> Optional[int]:
+    if PdfReader is None or not data.startswith(b"%PDF-"):
+        return None
+    try:
+        return len(PdfReader(io.BytesIO(data)).pages)
+    except Exception:
+        return None
+
+
+def synthetic_pages(data: bytes, indices: List[int]) -> List[Dict]:
+    """Markdown lab tables built from the alias file, deterministic per document."""
+    doc_rng = random.Random(hashlib.sha256(data).digest())
+    tables = current_tables()
+    names = sorted(tables.canonical_units)
+    pages = []
+    for index in indices:
+        rows = ["| Test | Result | Unit | Reference Range | Flag |", "|---|---|---|---|---|"]
+        for name in doc_rng.sample(names, min(12, len(names))):
+            units = tables.canonical_units[name] or [""]
+            value = round(doc_rng.uniform(0.5, 250), 1)
+            rows.append(f"| {name} | {value} | {units[0]} | {round(value * 0.8, 1)} - {round(value * 1.2, 1)} | |")
+        pages.append({"index": index, "markdown": "\n".join(rows), "images": [], "dimensions": None})
+    return pages
+
+
+class FakeOcrServer:
+    def __init__(self, config: FakeOcrConfig, seed: Optional[int] = None):
+        self.config = config
+        self.rng = random.Random(seed)
+        self.stats: Counter = Counter()
+
+    def _recording_path(self, digest: str, pages: Optional[List[int]] = None) -> Path:
+        suffix = "" if pages is None else "-pages-" + "_".join(map(str, pages))
+        return self.config.recordings_dir / f"{digest}{suffix}.json"
+
+    async def _record(self, body: Dict, path: Path) -> Dict:
+        async with httpx.AsyncClient(timeout=120) as client:
+            resp = await client.post(
+                self.config.upstream_url, json=body, headers={"Authorization": f"Bearer {MISTRAL_API_KEY}"}
+            )
+            resp.raise_for_status()
+            data = resp.json()
+        self.config.recordings_dir.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data))
+        self.stats["recorded"] += 1
+        return data
+
+    async def _response_for(self, body: Dict, data: bytes) -> Dict:
+        digest = hashlib.sha256(data).hexdigest()
+        wanted = body.get("pages")
+        path = self._recording_path(digest, wanted)
+        if self.config.mode != "synthetic":
+            if path.exists():
+                self.stats["replayed"] += 1
+                return json.loads(path.read_text())
+            full = self._recording_path(digest)
+            if wanted is not None and full.exists():
+                # A whole-document recording also answers page-subset requests
+                self.stats["replayed"] += 1
+                recorded = json.loads(full.read_text())
+                return {**recorded, "pages": [p for p in recorded.get("pages", []) if p.get("index") in wanted]}
+        if self.config.mode == "record":
+            return await self._record(body, path)
+
+        self.stats["synthesized"] += 1
+        count = _pdf_page_count(data) or self.config.pages
+        indices = wanted if wanted is not None else list(range(count))
+        pages = synthetic_pages(data, [i for i in indices if 0 <= i < count])
+        return {"pages": pages, "model": body.get("model"), "usage_info": {"pages_processed": len(pages)}}
+
+    async def handle(self, body: Dict) -> JSONResponse:
+        self.stats["requests"] += 1
+        roll = self.rng.random()
+        if roll < self.config.error_rate:
+            self.stats["errors"] += 1
+            return JSONResponse({"detail": "fake upstream error"}, status_code=503)
+        if roll < self.config.error_rate + self.config.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            return JSONResponse({"detail": "fake rate limit"}, status_code=429, headers={"Retry-After": "1"})
+
+        data = decode_document(body)
+        result = await self._response_for(body, data)
+        pages = result.get("pages", [])
+        if body.get("include_image_base64") and self.config.image_bytes:
+            blob = base64.b64encode(os.urandom(self.config.image_bytes * 3 // 4)).decode()
+            for page in pages:
+                page["images"] = [{"id": "img-0.jpeg", "image_base64": blob}]
+
+        delay = sample_latency(self.config.latency, self.rng) + self.config.page_latency * len(pages)
+        await asyncio.sleep(delay)
+        return JSONResponse(result)
+
+
+server = FakeOcrServer(
+    FakeOcrConfig.from_env(),
+    seed=int(os.environ["FAKE_OCR_SEED"]) if os.environ.get("FAKE_OCR_SEED") else None,
+)
+app = FastAPI(title="Fake OCR server")
+
+
+@app.post("/v1/ocr")
+async def fake_ocr(request: Request):
+    return await server.handle(await request.json())
+
+
+@app.get("/stats")
+async def fake_ocr_stats():
+    return dict(server.stats)
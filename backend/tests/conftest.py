@@ -0,0 +1,39 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+# Settings() requires these at import time; tests never reach the services behind them
+for _name, _value in {
+    "MONGO_URI": "mongodb://localhost:27017",
+    "PUBLIC_APP_URL": "http://localhost",
+    "APP_NAME": "test",
+    "BACKEND_BASE_URL": "http://localhost",
+    "MAIL_FROM": "test@example.com",
+    "MAIL_SERVER": "localhost",
+    "GOOGLE_CLIENT_ID": "test",
+    "GOOGLE_CLIENT_SECRET": "test",
+    "SESSION_SECRET": "test",
+    "MISTRAL_API_KEY": "test",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+
+
+@pytest.fixture(scope="session")
+def seed_ranges():
+    ranges = json.loads((APP_DIR / "functional_ranges.json").read_text())
+    for i, doc in enumerate(ranges):
+        doc.setdefault("_id", f"range_{i}")
+    return ranges
+
+
+@pytest.fixture(scope="session")
+def catalog(seed_ranges):
+    """Ranges catalog snapshot built from the bundled seed files, no database."""
+    from app.services.ranges_catalog import RangesSnapshot
+
+    supplements = json.loads((APP_DIR / "supplements.json").read_text())
+    return RangesSnapshot.build(1, seed_ranges, supplements)
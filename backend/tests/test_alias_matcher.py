@@ -0,0 +1,39 @@
+from app.services.alias_matcher import AliasMatcher, normalize_with_offsets
+
+
+def test_normalize_with_offsets_maps_back_to_original_text():
+    normalized, offsets = normalize_with_offsets("Vit-D, 25 OH")
+    assert normalized == "vitd25oh"
+    assert [("Vit-D, 25 OH")[i] for i in offsets] == list("VitD25OH")
+
+
+def test_normalize_with_offsets_handles_length_changing_lowercase():
+    normalized, offsets = normalize_with_offsets("İron")
+    assert normalized.endswith("ron")
+    assert offsets[-3:] == [1, 2, 3]
+
+
+def test_iter_matches_reports_overlapping_aliases():
+    matcher = AliasMatcher(["he", "she", "hers"])
+    found = sorted(matcher.iter_matches("ushers"))
+    assert found == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+
+
+def test_first_occurrences_uses_original_offsets_and_first_hit():
+    matcher = AliasMatcher(["hemoglobin", "glucose"])
+    text = "Glucose 90\nHemoglobin 14.1\nglucose 95"
+    found = matcher.first_occurrences(text)
+    assert found["glucose"] == (0, 7)
+    start, end = found["hemoglobin"]
+    assert text[start:end] == "Hemoglobin"
+
+
+def test_first_occurrences_requires_word_start():
+    matcher = AliasMatcher(["iron"])
+    assert matcher.first_occurrences("Siron 12") == {}
+    assert matcher.first_occurrences("Serum iron 80") == {"iron": (6, 10)}
+
+
+def test_duplicate_aliases_are_counted_once():
+    matcher = AliasMatcher(["tsh", "tsh", ""])
+    assert matcher.size == 1
@@ -0,0 +1,62 @@
+import json
+import os
+
+from app.services import alias_tables
+from app.services.alias_tables import build_alias_tables, current_tables, reload_if_changed
+
+DATA = {
+    "labTests": [
+        {"officialName": "Glucose", "aliases": ["Blood Sugar", "GLU"], "units": ["mg/dL", "mmol/L"]},
+        {"officialName": "TSH", "aliases": ["Thyrotropin"], "units": [" uIU/mL "]},
+        {"aliases": ["orphan"]},
+    ]
+}
+
+
+def test_build_normalizes_aliases_and_skips_unnamed_entries():
+    tables = build_alias_tables(DATA, "v1")
+    assert tables.aliases_map == {
+        "glucose": "Glucose", "bloodsugar": "Glucose", "glu": "Glucose", "tsh": "TSH", "thyrotropin": "TSH",
+    }
+    assert tables.matcher.first_occurrences("Fasting blood sugar 90") == {"bloodsugar": (8, 19)}
+
+
+def test_canonical_unit_validates_and_fills():
+    tables = build_alias_tables(DATA, "v1")
+    assert tables.canonical_unit("Glucose", "MG/DL") == "mg/dL"
+    assert tables.canonical_unit("Glucose", "g/L") is None
+    assert tables.canonical_unit("Glucose", None) is None  # two allowed units: no guess
+    assert tables.canonical_unit("TSH", None) == "uIU/mL"
+    assert tables.canonical_unit("Unlisted", "x") == "x"
+
+
+def _write(path, data, mtime):
+    path.write_text(json.dumps(data))
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_reload_swaps_only_on_changed_content(tmp_path, monkeypatch):
+    path = tmp_path / "aliases.json"
+    _write(path, DATA, 1_000_000_000)
+    monkeypatch.setattr(alias_tables, "ALIASES_JSON_PATH", path)
+    monkeypatch.setattr(alias_tables, "_signature", None)
+    monkeypatch.setattr(alias_tables, "_current", build_alias_tables({}, "empty"))
+
+    assert reload_if_changed()
+    first = current_tables()
+    assert first.aliases_map["glu"] == "Glucose"
+    assert not reload_if_changed()  # unchanged file
+
+    _write(path, DATA, 2_000_000_000)  # touched, same content
+    assert not reload_if_changed()
+    assert current_tables() is first
+
+    path.write_text("{ broken")  # caught mid-write
+    assert not reload_if_changed()
+    assert current_tables() is first
+
+    changed = {"labTests": DATA["labTests"] + [{"officialName": "Iron", "aliases": ["Fe"], "units": []}]}
+    _write(path, changed, 3_000_000_000)
+    assert reload_if_changed()
+    assert current_tables().aliases_map["fe"] == "Iron"
+    assert current_tables().version != first.version
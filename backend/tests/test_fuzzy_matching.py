@@ -0,0 +1,91 @@
+import pytest
+
+from app.config import settings
+from app.services.alias_tables import current_tables
+from app.services.fuzzy_alias import FuzzyAliasIndex, bounded_levenshtein, max_edits
+from app.services.ocr_service import extract_markers_from_pages, lookup_canonical
+
+
+@pytest.fixture(autouse=True)
+def fuzzy_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_FUZZY_MATCHING_ENABLED", True)
+
+
+def test_bounded_levenshtein_stops_past_limit():
+    assert bounded_levenshtein("hemog1obin", "hemoglobin", 2) == 1
+    assert bounded_levenshtein("kitten", "sitting", 3) == 3
+    assert bounded_levenshtein("kitten", "sitting", 2) is None
+    assert bounded_levenshtein("abc", "abcdef", 2) is None
+
+
+def test_short_terms_get_no_edit_budget():
+    assert max_edits(4) == 0
+    assert max_edits(5) == 1
+    assert max_edits(9) == 2
+
+
+def test_index_search_and_min_confidence():
+    index = FuzzyAliasIndex(["hemoglobin", "vitamind", "tsh"])
+    assert index.search("hemog1obin").alias == "hemoglobin"
+    assert index.search("vitam1nd").confidence == 0.875
+    assert index.search("vitamina") is None  # the last character tells near-identical markers apart
+    assert index.search("tsk") is None  # too short for fuzzy matching
+
+    strict = FuzzyAliasIndex(["hemoglobin", "vitamind"], min_confidence=0.95)
+    assert strict.search("hemog1obin") is None
+
+
+def test_equally_close_aliases_of_two_markers_are_ambiguous():
+    index = FuzzyAliasIndex({"ferritin": "Ferritin", "fe": "Iron", "ferrotin": "Other", "serumiron": "Iron", "serumiran": "Iron"})
+    assert index.search("ferr1tin") is None
+    assert index.search("serum1ron").alias == "serumiron"  # two aliases, one marker
+
+
+@pytest.mark.parametrize("text, canonical", [
+    ("Ferr1tin 45 ng/mL", "Iron - Ferritin"),
+    ("Sod1um 140 mmol/L", "Sodium"),
+    ("Thyr0xine 8.1 ug/dL", "Total T4"),
+    ("M0nocytes % 7.2 %", "Monocytes %"),
+    ("Bas0phils % 1.0 %", "Basophils %"),
+    ("R0W-CV 13.1 %", "RDW"),
+])
+def test_ocr_typos_in_short_aliases_match(text, canonical):
+    found = extract_markers_from_pages([text])
+    assert found[canonical]["matched"] == text.rsplit(" ", 2)[0]
+
+
+def test_one_edit_on_seven_letter_alias_matches():
+    tables = current_tables()
+    assert tables.aliases_map[tables.fuzzy.search("tota1t4").alias] == "Total T4"
+    assert tables.fuzzy.search("totalt5") is None
+
+
+def test_table_cell_near_miss_is_not_a_known_marker():
+    assert lookup_canonical("Vitamin A") is None
+    rows = "| Test | Result |\n|---|---|\n| Vitamin A | 40 |"
+    assert "Vitamin D" not in extract_markers_from_pages([rows])
+
+
+def test_word_run_must_end_at_the_value():
+    found = extract_markers_from_pages(["Vitamin B12 450 pg/mL"])
+    assert found["Vitamin B12"]["value"] == 450.0
+    assert "Vitamin D" not in found
+
+
+def test_free_text_near_miss_is_not_a_known_marker():
+    assert "Vitamin D" not in extract_markers_from_pages(["Vitamin A 40 ug/dL"])
+
+
+def test_ocr_typo_still_matches():
+    tables = current_tables()
+    target = tables.aliases_map["hemoglobin"]
+    found = extract_markers_from_pages(["Hemog1obin 13.5 g/dL"])
+    assert found[target]["value"] == 13.5
+    assert found[target]["matched"] == "Hemog1obin"
+    assert found[target]["confidence"] < 1.0
+
+
+def test_word_between_term_and_value_rules_out_fuzzy_match():
+    tables = current_tables()
+    target = tables.aliases_map["hemoglobin"]
+    assert target not in extract_markers_from_pages(["Hemog1obin pending review 13.5 g/dL"])
@@ -0,0 +1,45 @@
+import asyncio
+import io
+
+from PIL import Image, ImageDraw
+
+from app.config import settings
+from app.services.image_preprocess import preprocess_image
+from app.services.upload_spool import SpooledUpload
+
+
+def _photo(size=(1200, 800)):
+    """A phone photo of a page: sensor noise keeps the PNG large."""
+    img = Image.effect_noise(size, 30).convert("RGB")
+    draw = ImageDraw.Draw(img)
+    for y in range(0, size[1], 40):
+        draw.line((0, y, size[0], y + 15), fill=(20, 20, 20), width=3)
+    buf = io.BytesIO()
+    img.save(buf, "PNG")
+    return SpooledUpload.from_bytes("photo.png", "image/png", buf.getvalue())
+
+
+def test_large_photo_is_downscaled_to_jpeg(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_IMAGE_PREPROCESS_ENABLED", True)
+    monkeypatch.setattr(settings, "OCR_IMAGE_MAX_SIDE", 400)
+    upload = _photo()
+    processed, report = asyncio.run(preprocess_image(upload))
+    assert processed is not upload
+    assert (processed.filename, processed.mime) == ("photo.jpg", "image/jpeg")
+    assert report["original_size"] == [1200, 800]
+    assert max(report["processed_size"]) == 400
+    assert report["bytes_saved"] == upload.size - processed.size > 0
+    assert max(Image.open(processed.fileobj).size) == 400
+
+
+def test_unreadable_image_is_sent_unchanged(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_IMAGE_PREPROCESS_ENABLED", True)
+    upload = SpooledUpload.from_bytes("photo.png", "image/png", b"\x89PNG\r\n\x1a\nbroken")
+    processed, report = asyncio.run(preprocess_image(upload))
+    assert processed is upload and report["bytes_saved"] == 0
+
+
+def test_disabled_preprocessing_is_a_no_op(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_IMAGE_PREPROCESS_ENABLED", False)
+    upload = _photo((200, 100))
+    assert asyncio.run(preprocess_image(upload))[0] is upload
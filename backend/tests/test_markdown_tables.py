@@ -0,0 +1,49 @@
+from app.services.markdown_tables import TableRow, split_tables
+
+
+def test_header_roles_pick_value_and_unit_columns():
+    text = (
+        "| Test | Reference Range | Result | Units |\n"
+        "|------|-----------------|--------|-------|\n"
+        "| Glucose | 70-99 | 95 | mg/dL |\n"
+        "| TSH | 0.4-4.0 | 2.1 | uIU/mL |"
+    )
+    rows, remainder = split_tables(text)
+    assert rows == [TableRow("Glucose", 95.0, "mg/dL"), TableRow("TSH", 2.1, "uIU/mL")]
+    assert remainder == ""
+
+
+def test_single_dash_and_aligned_separators():
+    for separator in ("|-|-|", "|:--|--:|", "| :-: | - |"):
+        rows, _ = split_tables(f"| Test | Result |\n{separator}\n| Sodium | 140 mmol/L |")
+        assert rows == [TableRow("Sodium", 140.0, "mmol/L")], separator
+
+
+def test_headerless_table_uses_first_numeric_cell():
+    rows, _ = split_tables("| Potassium | 4.2 | mmol/L |\n| Iron | pending | |")
+    assert rows == [TableRow("Potassium", 4.2, "mmol/L")]
+
+
+def test_quest_in_and_out_of_range_columns():
+    header = "| Test Name | In Range | Out Of Range | Reference Range |\n|---|---|---|---|\n"
+    rows, _ = split_tables(
+        header + "| Ferritin | 45 | | 16-232 ng/mL |\n| Glucose | | 128 | 65-99 mg/dL |\n| Iron | | | 27-159 mcg/dL |"
+    )
+    assert rows == [TableRow("Ferritin", 45.0, None), TableRow("Glucose", 128.0, None)]
+
+
+def test_fallback_never_reads_role_columns():
+    rows, _ = split_tables("| Test Name | Reference Range | Units | Notes |\n|---|---|---|---|\n| Ferritin | 16-232 | ng/mL | |")
+    assert rows == []
+
+
+def test_text_outside_tables_is_kept_in_order():
+    text = "Patient: Jane\n| Test | Result |\n|---|---|\n| Ferritin | 50 |\nSigned by lab"
+    rows, remainder = split_tables(text)
+    assert rows == [TableRow("Ferritin", 50.0, None)]
+    assert remainder == "Patient: Jane\nSigned by lab"
+
+
+def test_body_rows_after_separator_are_all_read():
+    rows, _ = split_tables("| Test | Result |\n|---|---|\n| Vitamin D | 40 |\n| Hemoglobin | 13.5 |")
+    assert [row.test for row in rows] == ["Vitamin D", "Hemoglobin"]
@@ -0,0 +1,36 @@
+from app.services.marker_extraction import NUMBER, UNIT, WORD, PageIndex, tokenize
+
+
+def test_tokenize_kinds_and_offsets():
+    text = "Glucose 95 mg/dL"
+    tokens = tokenize(text)
+    assert [t.kind for t in tokens] == [WORD, NUMBER, UNIT]
+    assert [text[t.start:t.end] for t in tokens] == ["Glucose", "95", "mg/dL"]
+
+
+def test_tokenize_signed_and_decimal_numbers():
+    tokens = tokenize("Ferritin -1.5 .25 %")
+    assert [(t.kind, t.text) for t in tokens] == [(WORD, "Ferritin"), (NUMBER, "-1.5"), (NUMBER, ".25"), (UNIT, "%")]
+
+
+def test_value_unit_after_reads_first_number_and_its_unit():
+    text = "TSH 2.1 uIU/mL\nGlucose 95 mg/dL"
+    index = PageIndex(text)
+    assert index.value_unit_after(len("TSH")) == (2.1, "uIU/mL")
+    assert index.value_unit_after(text.index("Glucose") + len("Glucose")) == (95.0, "mg/dL")
+
+
+def test_value_unit_after_respects_window():
+    text = "Vitamin D" + " " * 120 + "40 ng/mL"
+    index = PageIndex(text)
+    assert index.value_unit_after(len("Vitamin D")) == (None, None)
+    assert index.value_unit_after(len("Vitamin D"), window=200) == (40.0, "ng/mL")
+
+
+def test_value_unit_after_without_number():
+    assert PageIndex("Hemoglobin pending").value_unit_after(10) == (None, None)
+    assert PageIndex("Iron 80").value_unit_after(7) == (None, None)
+
+
+def test_value_unit_after_unit_missing():
+    assert PageIndex("Iron 80").value_unit_after(4) == (80.0, None)
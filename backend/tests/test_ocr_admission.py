@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services.ocr_admission import AdmissionController, AdmissionRejected, LocalAdmissionStore
+
+
+@pytest.fixture
+def admission(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_ADMISSION_ENABLED", True)
+    monkeypatch.setattr(settings, "OCR_ADMISSION_BURST", 4)
+    monkeypatch.setattr(settings, "OCR_ADMISSION_RATE_PER_SECOND", 0.001)
+    monkeypatch.setattr(settings, "OCR_ADMISSION_MAX_CONCURRENT", 2)
+    monkeypatch.setattr(settings, "OCR_ADMISSION_PER_USER_CONCURRENT", 1)
+    monkeypatch.setattr(settings, "OCR_ADMISSION_QUEUE_SIZE", 0)
+    return AdmissionController(LocalAdmissionStore())
+
+
+def test_local_store_token_bucket():
+    store = LocalAdmissionStore()
+    assert asyncio.run(store.take_tokens("k", 3, rate=1.0, capacity=4)) == (True, 0.0)
+    granted, retry_in = asyncio.run(store.take_tokens("k", 3, rate=1.0, capacity=4))
+    assert not granted and retry_in > 0
+
+
+def test_cost_above_capacity_is_admitted(admission):
+    async def run():
+        async with admission.slot("u1", cost=50):
+            return True
+
+    assert asyncio.run(run())
+    assert admission.stats["admitted"] == 1
+
+
+def test_per_user_concurrency_rejects_when_queue_is_full(admission):
+    async def run():
+        async with admission.slot("u1"):
+            with pytest.raises(AdmissionRejected) as rejected:
+                async with admission.slot("u1"):
+                    pass
+            return rejected.value
+
+    rejected = asyncio.run(run())
+    assert rejected.retry_after >= 1.0
+    assert admission.stats["rejected_queue_full"] == 1
+
+
+def test_slot_is_released_on_exit(admission):
+    async def run():
+        for _ in range(3):
+            async with admission.slot("u1"):
+                pass
+
+    asyncio.run(run())
+    assert admission.stats["admitted"] == 3
+
+
+def test_disabled_admission_is_a_no_op(admission, monkeypatch):
+    monkeypatch.setattr(settings, "OCR_ADMISSION_ENABLED", False)
+
+    async def run():
+        async with admission.slot("u1", cost=1000):
+            return True
+
+    assert asyncio.run(run())
+    assert admission.stats["admitted"] == 0
+
+
+def test_unbounded_waiters_do_not_fill_the_wait_queue(admission, monkeypatch):
+    monkeypatch.setattr(settings, "OCR_ADMISSION_QUEUE_SIZE", 1)
+    monkeypatch.setattr(settings, "OCR_ADMISSION_PER_USER_QUEUE", 1)
+
+    async def run():
+        async with admission.slot("u1"):
+            waiter = asyncio.create_task(admission.slot("u1", max_wait=5, bounded=False).__aenter__())
+            await asyncio.sleep(0.1)
+            snapshot = admission.snapshot()
+            waiter.cancel()
+            return snapshot
+
+    snapshot = asyncio.run(run())
+    assert snapshot["waiting"] == 0 and snapshot["waiting_users"] == 0
+    assert admission.stats["waited"] == 1
+
+
+def test_held_slot_lease_is_renewed(admission, monkeypatch):
+    monkeypatch.setattr(settings, "OCR_ADMISSION_LEASE_SECONDS", 0.15)
+    monkeypatch.setattr(settings, "OCR_ADMISSION_PER_USER_CONCURRENT", 2)
+
+    async def run():
+        async with admission.slot("u1"):
+            await asyncio.sleep(0.4)  # well past the original lease
+            # The lease is still live, so the only other global slot is the last one left
+            async with admission.slot("u2"):
+                with pytest.raises(AdmissionRejected):
+                    async with admission.slot("u1"):
+                        pass
+
+    asyncio.run(run())
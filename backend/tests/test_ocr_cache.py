@@ -0,0 +1,103 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services import ocr_cache as ocr_cache_module
+from app.services.ocr_cache import OcrCache, cache_key
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = docs or {}
+
+    async def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.docs[query["_id"]] = doc
+
+    async def delete_many(self, query):
+        deleted, self.docs = len(self.docs), {}
+        return type("DeleteResult", (), {"deleted_count": deleted})()
+
+    async def find_one_and_update(self, query, update, upsert=False, return_document=None):
+        doc = self.docs.setdefault(query["_id"], {"_id": query["_id"]})
+        for field, step in update["$inc"].items():
+            doc[field] = doc.get(field, 0) + step
+        return doc
+
+
+@pytest.fixture(autouse=True)
+def meta(monkeypatch):
+    collection = FakeCollection()
+    monkeypatch.setattr(ocr_cache_module, "catalog_meta_collection", collection)
+    return collection
+
+
+def naive_utc(seconds_ago):
+    """What motor hands back for a stored datetime: naive, in UTC."""
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds_ago)).replace(tzinfo=None)
+
+
+def test_cache_key_includes_model():
+    assert cache_key("abc", "mistral-ocr-latest") == "abc:mistral-ocr-latest"
+
+
+def test_db_entry_within_ttl_is_a_hit_with_utc_timestamp(monkeypatch):
+    monkeypatch.setattr(
+        ocr_cache_module, "ocr_cache_collection",
+        FakeCollection({"k": {"_id": "k", "pages": ["p1"], "created_at": naive_utc(50)}}),
+    )
+    cache = OcrCache(max_entries=10, ttl_seconds=100, generation_check_seconds=60)
+    assert asyncio.run(cache.get("k")) == ["p1"]
+    stored_at, _ = cache._lru["k"]
+    assert abs((time.time() - stored_at) - 50) < 5
+
+
+def test_db_entry_past_ttl_is_a_miss(monkeypatch):
+    monkeypatch.setattr(
+        ocr_cache_module, "ocr_cache_collection",
+        FakeCollection({"k": {"_id": "k", "pages": ["p1"], "created_at": naive_utc(150)}}),
+    )
+    cache = OcrCache(max_entries=10, ttl_seconds=100, generation_check_seconds=60)
+    assert asyncio.run(cache.get("k")) is None
+    assert cache.stats["misses"] == 1
+
+
+def test_put_stores_aware_utc_and_serves_from_memory(monkeypatch):
+    collection = FakeCollection()
+    monkeypatch.setattr(ocr_cache_module, "ocr_cache_collection", collection)
+    cache = OcrCache(max_entries=1, ttl_seconds=100, generation_check_seconds=60)
+    asyncio.run(cache.put("a", ["x"]))
+    assert collection.docs["a"]["created_at"].tzinfo is timezone.utc
+    assert asyncio.run(cache.get("a")) == ["x"]
+    assert cache.stats["memory_hits"] == 1
+
+    asyncio.run(cache.put("b", ["y"]))  # evicts "a" from the LRU
+    assert "a" not in cache._lru
+
+
+def test_purge_on_one_worker_invalidates_another(monkeypatch):
+    monkeypatch.setattr(ocr_cache_module, "ocr_cache_collection", FakeCollection())
+    purger = OcrCache(max_entries=10, ttl_seconds=100, generation_check_seconds=0)
+    other = OcrCache(max_entries=10, ttl_seconds=100, generation_check_seconds=0)
+
+    async def run():
+        await other.put("k", ["stale"])
+        assert await other.get("k") == ["stale"]
+        assert await purger.purge() == 1
+        return await other.get("k")
+
+    assert asyncio.run(run()) is None
+    assert other.stats["purges_seen"] == 1 and "k" not in other._lru
+
+
+def test_generation_is_checked_at_most_once_per_interval(monkeypatch, meta):
+    monkeypatch.setattr(ocr_cache_module, "ocr_cache_collection", FakeCollection())
+    cache = OcrCache(max_entries=10, ttl_seconds=100, generation_check_seconds=60)
+    asyncio.run(cache.put("k", ["x"]))
+    asyncio.run(cache.get("k"))  # first lookup reads the generation
+    meta.docs[ocr_cache_module.CACHE_META_ID] = {"generation": 5}
+    assert asyncio.run(cache.get("k")) == ["x"]  # not re-read within the interval
@@ -0,0 +1,44 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import ocr_client
+
+
+@pytest.fixture
+def mock_client(monkeypatch):
+    def handler(request):
+        return httpx.Response(500 if request.url.path == "/fail" else 200, json={"pages": []})
+
+    monkeypatch.setattr(ocr_client, "_client", None)
+    monkeypatch.setattr(ocr_client, "_counters", dict.fromkeys(ocr_client._counters, 0))
+    monkeypatch.setattr(ocr_client, "_build_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+
+def test_one_client_is_shared_until_closed(mock_client):
+    async def run():
+        first = await ocr_client.start_ocr_client()
+        assert ocr_client.get_ocr_client() is first
+        await ocr_client.close_ocr_client()
+        assert first.is_closed
+        second = ocr_client.get_ocr_client()  # created lazily again outside the app lifecycle
+        await ocr_client.close_ocr_client()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first is not second
+
+
+def test_requests_are_counted(mock_client):
+    async def run():
+        await ocr_client.post("https://ocr.test/ok")
+        async with ocr_client.stream_post("https://ocr.test/fail") as resp:
+            assert resp.status_code == 500
+        stats = ocr_client.pool_stats()
+        await ocr_client.close_ocr_client()
+        return stats
+
+    stats = asyncio.run(run())
+    assert (stats["requests_total"], stats["in_flight"], stats["peak_in_flight"]) == (2, 0, 1)
+    assert stats["client_open"]
@@ -0,0 +1,35 @@
+import asyncio
+
+from app.services import ocr_service
+from app.services.ocr_service import ocr_files_concurrently
+from app.services.upload_spool import SpooledUpload
+
+
+def _uploads(count):
+    return [SpooledUpload.from_bytes(f"f{i}.png", "image/png", b"\x89PNG") for i in range(count)]
+
+
+def test_fanout_is_bounded_ordered_and_isolates_failures(monkeypatch):
+    running = peak = 0
+
+    async def ocr_file(upload, skip=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01 if upload.filename != "f0.png" else 0.03)  # the first file finishes last
+        running -= 1
+        if upload.filename == "f2.png":
+            raise RuntimeError("bad scan")
+        return {"pages": [f"text of {upload.filename}"], "routing": [{"page": 0, "route": "ocr"}]}
+
+    monkeypatch.setattr(ocr_service, "ocr_file", ocr_file)
+    events = []
+    results = asyncio.run(
+        ocr_files_concurrently(_uploads(6), per_request_limit=2, on_progress=lambda e, d: events.append(e))
+    )
+
+    assert peak == 2
+    assert [r["filename"] for r in results] == [f"f{i}.png" for i in range(6)]
+    assert results[2] == {"filename": "f2.png", "error": "bad scan"}
+    assert results[0]["pages"] == ["text of f0.png"]
+    assert events.count("file_failed") == 1 and events.count("file_done") == 5
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services import ocr_jobs as jobs_module
+from app.services.ocr_jobs import FAILED, SUCCEEDED, JobQueueFull, OcrJobManager, TooManyUserJobs
+from app.services.ocr_service import OcrExtractionError
+from app.services.upload_spool import SpooledUpload
+
+
+@pytest.fixture(autouse=True)
+def no_admission(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_ADMISSION_ENABLED", False)
+
+
+def _uploads(count=2):
+    return [SpooledUpload.from_bytes(f"f{i}.pdf", "application/pdf", b"%PDF-1.4") for i in range(count)]
+
+
+async def _fake_extraction(uploads, on_progress):
+    for index, upload in enumerate(uploads):
+        on_progress("file_started", {"file_index": index, "filename": upload.filename})
+        on_progress("page_done", {"file_index": index, "page_index": 0, "page_count": 1})
+        on_progress("file_done", {"file_index": index, "filename": upload.filename, "pages": 1})
+    return {"success": True, "lab_reports": {}}
+
+
+def test_job_runs_and_streams_events(monkeypatch):
+    monkeypatch.setattr(jobs_module, "run_extraction", _fake_extraction)
+    manager = OcrJobManager(workers=1, queue_size=4, retention_seconds=60, max_per_user=4)
+
+    async def run():
+        manager.start()
+        uploads = _uploads()
+        job = manager.submit("u1", uploads)
+        events = [event["event"] async for event in manager.events(job, keepalive_seconds=1) if event]
+        await manager.shutdown(grace_seconds=1)
+        return job, uploads, events
+
+    job, uploads, events = asyncio.run(run())
+    assert job.status == SUCCEEDED and job.result == {"success": True, "lab_reports": {}}
+    assert events[:2] == ["queued", "running"] and events[-1] == SUCCEEDED
+    assert events.count("file_done") == 2
+    progress = job.summary()["progress"]
+    assert progress == {"files_total": 2, "files_done": 2, "pages_done": 2, "pages_total": 2}
+    assert all(upload.fileobj.closed for upload in uploads)
+
+
+def test_failed_extraction_marks_job_failed(monkeypatch):
+    async def failing(uploads, on_progress):
+        raise OcrExtractionError("OCR processing failed for f0.pdf: boom")
+
+    monkeypatch.setattr(jobs_module, "run_extraction", failing)
+    manager = OcrJobManager(workers=1, queue_size=4, retention_seconds=60, max_per_user=4)
+
+    async def run():
+        manager.start()
+        job = manager.submit("u1", _uploads(1))
+        await manager.shutdown(grace_seconds=1)
+        return job
+
+    job = asyncio.run(run())
+    assert job.status == FAILED and "boom" in job.error
+
+
+def test_submit_rejects_when_stopped_or_full():
+    manager = OcrJobManager(workers=1, queue_size=1, retention_seconds=60, max_per_user=4)
+
+    async def run():
+        with pytest.raises(JobQueueFull):
+            manager.submit("u1", _uploads(1))  # not started
+        manager._accepting = True  # accepting, but no worker draining the queue
+        manager.submit("u1", _uploads(1))
+        with pytest.raises(JobQueueFull):
+            manager.submit("u1", _uploads(1))
+
+    asyncio.run(run())
+
+
+def test_submit_caps_active_jobs_per_user():
+    manager = OcrJobManager(workers=1, queue_size=10, retention_seconds=60, max_per_user=2)
+
+    async def run():
+        manager._accepting = True
+        first = manager.submit("u1", _uploads(1))
+        manager.submit("u1", _uploads(1))
+        with pytest.raises(TooManyUserJobs):
+            manager.submit("u1", _uploads(1))
+        manager.submit("u2", _uploads(1))  # other users are unaffected
+        manager._finish(first, SUCCEEDED, result={})
+        manager.submit("u1", _uploads(1))  # a finished job frees the user's share
+
+    asyncio.run(run())
@@ -0,0 +1,35 @@
+import asyncio
+
+import httpx
+
+from app.config import settings
+from app.services import ocr_client, ocr_service
+from app.services.ocr_resilience import CircuitBreaker, ResilientCaller
+from app.services.upload_spool import SpooledUpload
+
+
+def test_waiting_for_a_global_slot_is_not_a_backend_failure(monkeypatch):
+    """One slot, a healthy backend answering in 50ms, a 80ms deadline: queued calls must not trip the breaker."""
+    caller = ResilientCaller(CircuitBreaker(failure_threshold=2, reset_seconds=60))
+    monkeypatch.setattr(settings, "OCR_LEAN_RESPONSE", False)
+    monkeypatch.setattr(settings, "OCR_HEDGE_AFTER_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "OCR_DEADLINE_BASE_SECONDS", 0.08)
+    monkeypatch.setattr(settings, "OCR_DEADLINE_PER_MB_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "OCR_DEADLINE_MAX_SECONDS", 0.08)
+    monkeypatch.setattr(ocr_service, "ocr_caller", caller)
+
+    async def post(url, **kwargs):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"pages": [{"index": 0, "markdown": "ok"}]}, request=httpx.Request("POST", url))
+
+    monkeypatch.setattr(ocr_client, "post", post)
+    upload = SpooledUpload.from_bytes("report.pdf", "application/pdf", b"%PDF-1.4")
+
+    async def run():
+        monkeypatch.setattr(ocr_service, "_global_ocr_slots", asyncio.Semaphore(1))
+        return await asyncio.gather(*(ocr_service.call_mistral_ocr(upload) for _ in range(6)))
+
+    results = asyncio.run(run())
+    assert all(result["pages"][0]["markdown"] == "ok" for result in results)
+    assert caller.breaker.state == "closed" and caller.breaker.failures == 0
+    assert caller.stats["deadline_exceeded"] == 0
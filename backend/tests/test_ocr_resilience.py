@@ -0,0 +1,110 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services.ocr_resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    OcrDeadlineExceeded,
+    ResilientCaller,
+    retry_after_seconds,
+)
+
+
+def _status_error(code: int, headers=None) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://ocr.test")
+    response = httpx.Response(code, request=request, headers=headers)
+    return httpx.HTTPStatusError("failed", request=request, response=response)
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_RETRY_BASE_DELAY", 0.0)
+    monkeypatch.setattr(settings, "OCR_RETRY_MAX_DELAY", 0.0)
+    monkeypatch.setattr(settings, "OCR_HEDGE_AFTER_SECONDS", 0.0)
+
+
+def test_breaker_opens_after_threshold_and_half_opens():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.0)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    breaker.before_call()  # reset elapsed: this call is the probe
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+
+
+def test_retry_after_seconds_parses_delta():
+    assert retry_after_seconds(_status_error(429, {"Retry-After": "3"})) == 3.0
+    assert retry_after_seconds(_status_error(429)) is None
+
+
+def test_retryable_errors_are_retried(fast_retries, monkeypatch):
+    monkeypatch.setattr(settings, "OCR_RETRY_MAX_ATTEMPTS", 3)
+    caller = ResilientCaller(CircuitBreaker(failure_threshold=5, reset_seconds=60))
+    calls = []
+
+    async def send():
+        calls.append(1)
+        if len(calls) < 3:
+            raise _status_error(503)
+        return "ok"
+
+    assert asyncio.run(caller.call(send)) == "ok"
+    assert len(calls) == 3 and caller.stats["retries"] == 2
+    assert caller.breaker.state == "closed"
+
+
+def test_client_errors_are_not_retried(fast_retries):
+    caller = ResilientCaller(CircuitBreaker(failure_threshold=1, reset_seconds=60))
+
+    async def send():
+        raise _status_error(400)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(caller.call(send))
+    assert caller.breaker.state == "closed"
+
+
+def test_deadline_counts_as_breaker_failure(fast_retries, monkeypatch):
+    monkeypatch.setattr(settings, "OCR_DEADLINE_BASE_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "OCR_DEADLINE_PER_MB_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "OCR_DEADLINE_MAX_SECONDS", 0.05)
+    caller = ResilientCaller(CircuitBreaker(failure_threshold=2, reset_seconds=60))
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    for _ in range(2):
+        with pytest.raises(OcrDeadlineExceeded):
+            asyncio.run(caller.call(hang))
+    assert caller.breaker.state == "open"
+    assert caller.stats["deadline_exceeded"] == 2
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(caller.call(hang))
+
+
+def test_caller_cancellation_does_not_count_as_failure(fast_retries):
+    caller = ResilientCaller(CircuitBreaker(failure_threshold=1, reset_seconds=60))
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def cancel_midway():
+        task = asyncio.create_task(caller.call(hang))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_midway())
+    assert caller.breaker.state == "closed" and caller.breaker.failures == 0
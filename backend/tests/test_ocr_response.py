@@ -0,0 +1,35 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services import ocr_response
+from app.services.ocr_response import iter_page_texts
+
+BODY = {
+    "pages": [
+        {"index": 0, "markdown": "| Test | Result |", "images": [{"image_base64": "A" * 1000}], "dimensions": {"dpi": 200}},
+        {"index": 1, "text": "Glucose 95 mg/dL", "images": []},
+    ],
+    "model": "mistral-ocr-latest",
+    "usage_info": {"pages_processed": 2},
+}
+
+
+def _pages():
+    async def collect():
+        resp = httpx.Response(200, content=json.dumps(BODY).encode())
+        return [page async for page in iter_page_texts(resp)]
+
+    return asyncio.run(collect())
+
+
+@pytest.mark.skipif(ocr_response.ijson is None, reason="ijson not installed")
+def test_streamed_pages_keep_only_text_fields():
+    assert _pages() == [{"index": 0, "markdown": "| Test | Result |"}, {"index": 1, "text": "Glucose 95 mg/dL"}]
+
+
+def test_fallback_without_ijson(monkeypatch):
+    monkeypatch.setattr(ocr_response, "ijson", None)
+    assert _pages() == [{"index": 0, "markdown": "| Test | Result |"}, {"index": 1, "text": "Glucose 95 mg/dL"}]
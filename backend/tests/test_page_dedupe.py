@@ -0,0 +1,136 @@
+import asyncio
+import io
+
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from app.config import settings
+from app.services import ocr_service, page_dedupe
+from app.services.page_dedupe import DuplicatePages, find_duplicate_pages, fingerprint, same_content
+from app.services.pdf_text import has_usable_text
+from app.services.upload_spool import SpooledUpload
+
+
+def _page(rows):
+    """A lab report page; every page shares the header and layout, like one lab's template."""
+    img = Image.new("RGB", (850, 1100), "white")
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=22)
+    draw.text((60, 50), "ACME LABORATORIES - Comprehensive Panel", fill="black", font=font)
+    for i, (name, value) in enumerate(rows):
+        y = 150 + i * 45
+        draw.line((50, y - 8, 800, y - 8), fill="gray")
+        draw.text((60, y), name, fill="black", font=font)
+        draw.text((450, y), value, fill="black", font=font)
+    return img
+
+
+FIRST = _page([("Glucose", "95 mg/dL"), ("Sodium", "140 mmol/L"), ("Potassium", "4.2 mmol/L")])
+SECOND = _page([("Glucose", "95 mg/dL"), ("Sodium", "140 mmol/L"), ("Potassium", "4.7 mmol/L")])
+
+
+def _encode(img, fmt, scale=1.0, **params) -> bytes:
+    buf = io.BytesIO()
+    img.resize((int(img.width * scale), int(img.height * scale))).save(buf, fmt, **params)
+    return buf.getvalue()
+
+
+def _upload(name, img, fmt="PNG", **params):
+    return SpooledUpload.from_bytes(name, f"image/{fmt.lower()}", _encode(img, fmt, **params))
+
+
+@pytest.fixture(autouse=True)
+def dedupe_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_DEDUPE_ENABLED", True)
+
+
+def test_same_template_pages_are_not_duplicates():
+    first, second = fingerprint(FIRST), fingerprint(SECOND)
+    assert bin(first.hash ^ second.hash).count("1") <= settings.OCR_DEDUPE_MAX_DISTANCE  # the hash alone can't tell
+    assert not same_content(first, second)
+
+
+def test_reencoded_copy_is_a_duplicate():
+    copy = Image.open(io.BytesIO(_encode(FIRST, "JPEG", quality=75)))
+    assert same_content(fingerprint(FIRST), fingerprint(copy))
+
+
+def test_find_duplicate_pages_across_uploads():
+    uploads = [
+        _upload("first.png", FIRST),
+        _upload("second.png", SECOND),
+        _upload("first-again.jpg", FIRST, "JPEG", quality=75),
+    ]
+    duplicates = asyncio.run(find_duplicate_pages(uploads))
+    assert duplicates.skip == {2: {0: (0, 0)}}
+    assert duplicates.count == 1
+
+
+def test_single_upload_is_not_fingerprinted(monkeypatch):
+    def fail(upload):
+        raise AssertionError("single uploads must not be rendered")
+
+    monkeypatch.setattr(page_dedupe, "_upload_fingerprints", fail)
+    pdf = SpooledUpload.from_bytes("report.pdf", "application/pdf", b"%PDF-1.4")
+    assert asyncio.run(find_duplicate_pages([pdf])).count == 0
+
+
+def test_skipped_pages_keep_their_text_layer(monkeypatch):
+    layer = ["Sodium 140 mmol/L Potassium 4.2 mmol/L Glucose 95 mg/dL TSH 2.1 uIU/mL", ""]
+    remote_calls = []
+
+    async def call_mistral_ocr(upload, pages=None):
+        remote_calls.append(pages)
+        return {"pages": []}
+
+    monkeypatch.setattr(settings, "OCR_TEXT_LAYER_ENABLED", True)
+    monkeypatch.setattr(settings, "OCR_PDF_SPLIT_ENABLED", False)
+    monkeypatch.setattr(ocr_service, "extract_text_layer", lambda upload: list(layer))
+    monkeypatch.setattr(ocr_service, "call_mistral_ocr", call_mistral_ocr)
+    upload = SpooledUpload.from_bytes("report.pdf", "application/pdf", b"%PDF-1.4")
+
+    result = asyncio.run(ocr_service._ocr_pdf(upload, {0: (0, 0), 1: (0, 1)}))
+    assert result["pages"] == layer
+    assert remote_calls == []
+    assert [page["route"] for page in result["routing"]] == ["text_layer", "duplicate"]
+
+
+def _scanned_pdf(name, img):
+    return SpooledUpload.from_bytes(name, "application/pdf", _encode(img, "PDF", resolution=100))
+
+
+@pytest.mark.skipif(page_dedupe.pdfium is None, reason="pypdfium2 not installed")
+def test_pdf_pages_render_from_the_spooled_file_and_keep_the_text_layer(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_TEXT_LAYER_ENABLED", True)
+
+    def read_all(self):
+        raise AssertionError("the whole PDF must not be read into memory")
+
+    monkeypatch.setattr(SpooledUpload, "read_all", read_all)
+    uploads = [_scanned_pdf("first.pdf", FIRST), _scanned_pdf("second.pdf", SECOND), _scanned_pdf("again.pdf", FIRST)]
+    duplicates = asyncio.run(find_duplicate_pages(uploads))
+    assert duplicates.skip == {2: {0: (0, 0)}}
+    assert duplicates.text_layer(2) is not None and not has_usable_text(duplicates.text_layer(2)[0])
+
+
+def test_only_pages_actually_skipped_are_counted(monkeypatch):
+    layer = [""]
+    scanned = SpooledUpload.from_bytes("scan.pdf", "application/pdf", b"%PDF-1.4")
+    cached = SpooledUpload.from_bytes("cached.pdf", "application/pdf", b"%PDF-1.5")
+
+    async def find(uploads):
+        return DuplicatePages(skip={0: {0: (9, 0)}, 1: {0: (9, 0)}}, text_layers={0: layer, 1: layer})
+
+    async def cache_get(key):
+        return ["Glucose 95 mg/dL"] if key.startswith(cached.sha256) else None
+
+    def extract(upload):
+        raise AssertionError("the text layer read while fingerprinting is reused")
+
+    monkeypatch.setattr(settings, "OCR_TEXT_LAYER_ENABLED", True)
+    monkeypatch.setattr(settings, "OCR_CACHE_ENABLED", True)
+    monkeypatch.setattr(ocr_service, "find_duplicate_pages", find)
+    monkeypatch.setattr(ocr_service.ocr_cache, "get", cache_get)
+    monkeypatch.setattr(ocr_service, "extract_text_layer", extract)
+    result = asyncio.run(ocr_service.run_extraction([scanned, cached]))
+    assert result["metadata"]["pages_skipped_duplicate"] == 1  # the cached upload skipped nothing
@@ -0,0 +1,94 @@
+import asyncio
+
+from fpdf import FPDF
+
+from app.config import settings
+from app.services import ocr_service
+from app.services.pdf_text import extract_text_layer, has_usable_text, split_pdf
+from app.services.upload_spool import SpooledUpload
+
+PAGE_TEXT = "Sodium 140 mmol/L  Potassium 4.2 mmol/L  Glucose 95 mg/dL  Ferritin 80 ng/mL  Hemoglobin 13.5 g/dL"
+
+
+def _pdf(pages):
+    """A born-digital PDF; None pages are left blank, like a scanned page without a text layer."""
+    pdf = FPDF()
+    pdf.set_font("Arial", size=12)
+    for text in pages:
+        pdf.add_page()
+        if text:
+            pdf.cell(0, 10, text)
+    return SpooledUpload.from_bytes("report.pdf", "application/pdf", pdf.output(dest="S").encode("latin-1"))
+
+
+def test_extract_text_layer_per_page():
+    layer = extract_text_layer(_pdf([PAGE_TEXT, None]))
+    assert len(layer) == 2
+    assert "Potassium 4.2" in layer[0]
+    assert not has_usable_text(layer[1])
+    assert has_usable_text(layer[0])
+
+
+def test_unreadable_pdf_has_no_text_layer():
+    assert extract_text_layer(SpooledUpload.from_bytes("x.pdf", "application/pdf", b"%PDF-1.4 garbage")) is None
+
+
+def test_only_pages_without_text_go_to_remote_ocr(monkeypatch):
+    calls = []
+
+    async def call_mistral_ocr(upload, pages=None):
+        calls.append(pages)
+        return {"pages": [{"index": 1, "markdown": "TSH 2.1 uIU/mL"}]}
+
+    monkeypatch.setattr(settings, "OCR_TEXT_LAYER_ENABLED", True)
+    monkeypatch.setattr(settings, "OCR_PDF_SPLIT_ENABLED", False)
+    monkeypatch.setattr(ocr_service, "call_mistral_ocr", call_mistral_ocr)
+
+    result = asyncio.run(ocr_service._ocr_pdf(_pdf([PAGE_TEXT, None, PAGE_TEXT])))
+    assert calls == [[1]]
+    assert result["pages"][1] == "TSH 2.1 uIU/mL"
+    assert "Glucose 95" in result["pages"][2]
+    assert [page["route"] for page in result["routing"]] == ["text_layer", "ocr", "text_layer"]
+
+
+def test_fully_digital_pdf_makes_no_remote_call(monkeypatch):
+    async def call_mistral_ocr(upload, pages=None):
+        raise AssertionError("digital pages must not be OCR'd")
+
+    monkeypatch.setattr(settings, "OCR_TEXT_LAYER_ENABLED", True)
+    monkeypatch.setattr(ocr_service, "call_mistral_ocr", call_mistral_ocr)
+    result = asyncio.run(ocr_service._ocr_pdf(_pdf([PAGE_TEXT, PAGE_TEXT])))
+    assert result["ocr_ms"] == 0.0 and len(result["pages"]) == 2
+
+
+
+def test_split_pdf_chunks_selected_pages():
+    upload = _pdf([f"page {i}" for i in range(7)])
+    assert split_pdf(upload, [0, 1], chunk_pages=2, min_pages=3) is None  # too few pages to be worth splitting
+
+    chunks = split_pdf(upload, [0, 2, 3, 4, 6], chunk_pages=2, min_pages=3)
+    assert [indices for indices, _ in chunks] == [[0, 2], [3, 4], [6]]
+    assert [len(extract_text_layer(part)) for _, part in chunks] == [2, 2, 1]
+    assert "page 2" in extract_text_layer(chunks[0][1])[1]
+    for _, part in chunks:
+        part.close()
+
+
+def test_large_scanned_pdf_is_ocrd_in_chunks(monkeypatch):
+    calls = []
+
+    async def call_mistral_ocr(part, pages=None):
+        texts = extract_text_layer(part)  # stands in for the remote OCR of the chunk
+        calls.append(part.filename)
+        return {"pages": [{"index": i, "markdown": f"ocr {text.strip()}"} for i, text in enumerate(texts)]}
+
+    monkeypatch.setattr(settings, "OCR_TEXT_LAYER_ENABLED", False)
+    monkeypatch.setattr(settings, "OCR_PDF_SPLIT_ENABLED", True)
+    monkeypatch.setattr(settings, "OCR_PDF_SPLIT_MIN_PAGES", 4)
+    monkeypatch.setattr(settings, "OCR_PDF_CHUNK_PAGES", 2)
+    monkeypatch.setattr(ocr_service, "call_mistral_ocr", call_mistral_ocr)
+
+    result = asyncio.run(ocr_service._ocr_pdf(_pdf([f"page {i}" for i in range(5)])))
+    assert result["pages"] == [f"ocr page {i}" for i in range(5)]
+    assert result["ocr_chunks"] == 3
+    assert sorted(calls) == ["report.pdf#pages1-2", "report.pdf#pages3-4", "report.pdf#pages5-5"]
@@ -0,0 +1,165 @@
+import asyncio
+
+from app.services import ranges_catalog as catalog_module
+from app.services.ranges_catalog import ANY, CATALOG_ID, RangesCatalog, RangesSnapshot, normalize_marker
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return list(self.docs)
+
+
+class FakeCollection:
+    def __init__(self, docs=()):
+        self.docs = {doc["_id"]: doc for doc in docs}
+        self.finds = 0
+
+    def find(self, query):
+        self.finds += 1
+        return Cursor(self.docs.values())
+
+    async def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+    async def find_one_and_update(self, query, update, upsert=False, return_document=None):
+        doc = self.docs.setdefault(query["_id"], {"_id": query["_id"]})
+        for field, step in update["$inc"].items():
+            doc[field] = doc.get(field, 0) + step
+        return doc
+
+
+def _install(monkeypatch, ranges, supplements=(), version=None):
+    meta = FakeCollection([{"_id": CATALOG_ID, "version": version}] if version is not None else [])
+    collections = {
+        "catalog_meta_collection": meta,
+        "functional_ranges_collection": FakeCollection(ranges),
+        "supplements_collection": FakeCollection(supplements),
+    }
+    for name, collection in collections.items():
+        monkeypatch.setattr(catalog_module, name, collection)
+    return collections
+
+
+RANGES = [{"_id": "r1", "marker": "Glucose", "gender": "Both", "functionalLow": 85, "functionalHigh": 99}]
+
+
+def test_snapshot_is_loaded_once_and_reused(monkeypatch):
+    collections = _install(monkeypatch, RANGES, version=3)
+    catalog = RangesCatalog(poll_seconds=0)
+
+    async def run():
+        return await catalog.get_snapshot(), await catalog.get_snapshot()
+
+    first, second = asyncio.run(run())
+    assert first is second and first.version == 3
+    assert collections["functional_ranges_collection"].finds == 1
+    assert first.resolve("Glucose", "Male", None)["_id"] == "r1"
+
+
+def test_bump_version_reloads_with_new_docs(monkeypatch):
+    collections = _install(monkeypatch, RANGES)
+    catalog = RangesCatalog(poll_seconds=0)
+
+    async def run():
+        before = await catalog.get_snapshot()
+        collections["functional_ranges_collection"].docs["r2"] = {"_id": "r2", "marker": "TSH", "functionalLow": 1, "functionalHigh": 2}
+        version = await catalog.bump_version()
+        return before, version, await catalog.get_snapshot()
+
+    before, version, after = asyncio.run(run())
+    assert (before.version, version, after.version) == (0, 1, 1)
+    assert before.resolve("TSH", None, None) is None
+    assert after.resolve("TSH", None, None)["_id"] == "r2"
+    assert catalog.stats["reloads"] == 2
+
+
+def test_poll_reloads_only_when_version_moves(monkeypatch):
+    collections = _install(monkeypatch, RANGES, version=1)
+    catalog = RangesCatalog(poll_seconds=0.01)
+
+    async def run():
+        await catalog.start()
+        await asyncio.sleep(0.05)
+        unchanged = catalog.stats["reloads"]
+        collections["catalog_meta_collection"].docs[CATALOG_ID]["version"] = 2
+        await asyncio.sleep(0.05)
+        await catalog.stop()
+        return unchanged
+
+    assert asyncio.run(run()) == 1
+    assert catalog.stats["reloads"] == 2
+    assert catalog._snapshot.version == 2
+
+
+def _reference_resolve(docs, marker, gender_at_birth, menstruation_status):
+    """The per-request lookup the resolution table replaced: score every candidate doc."""
+    gender = (gender_at_birth or "").lower()
+    status = (menstruation_status or "").lower()
+    candidates = [doc for doc in docs if doc.get("marker") == marker] or [
+        doc for doc in docs if normalize_marker(doc.get("marker")) == normalize_marker(marker)
+    ]
+    if not candidates:
+        return None
+
+    def score(doc):
+        s = 0
+        if doc.get("gender") and gender and str(doc["gender"]).lower() == gender:
+            s += 4
+        if doc.get("menstruation_status") and status and str(doc["menstruation_status"]).lower() == status:
+            s += 2
+        if doc.get("measurementUnits"):
+            s += 1
+        return s
+
+    return max(candidates, key=score)
+
+
+def test_resolution_table_matches_per_request_scoring():
+    docs = [
+        {"_id": 1, "marker": "Ferritin", "gender": "Both", "menstruation_status": "None"},
+        {"_id": 2, "marker": "Ferritin", "gender": "Female", "menstruation_status": "Menstruating", "measurementUnits": "ng/mL"},
+        {"_id": 3, "marker": "Ferritin", "gender": "Female", "menstruation_status": "None", "measurementUnits": "ng/mL"},
+        {"_id": 4, "marker": "Ferritin", "gender": "Male", "measurementUnits": "ng/mL"},
+        {"_id": 5, "marker": "Total_Protein", "gender": "Both", "measurementUnits": "g/dL"},
+        {"_id": 6, "marker": "Total_Protein", "gender": "Both"},
+    ]
+    snapshot = RangesSnapshot.build(1, docs, [])
+    markers = ["Ferritin", "ferritin", "Total Protein", "TotalProtein", "Total_Protein", "Iron"]
+    for marker in markers:
+        for gender in ["Male", "female", "FEMALE", "Both", "other", None]:
+            for status in ["None", "menstruating", "Post", None]:
+                expected = _reference_resolve(docs, marker, gender, status)
+                assert snapshot.resolve(marker, gender, status) is expected, (marker, gender, status)
+
+
+def test_demographic_maps_unknown_values_to_any():
+    snapshot = RangesSnapshot.build(1, [{"_id": 1, "marker": "TSH", "gender": "Female", "menstruation_status": "None"}], [])
+    assert snapshot.demographic("FEMALE", "none") == ("female", "none")
+    assert snapshot.demographic("Other", None) == (ANY, ANY)
+
+
+def test_supplements_follow_the_doc_order_and_side():
+    docs = [
+        {"_id": "r1", "marker": "Iron", "ifLow": {"supplements": ["s2", "missing", "s1"]}, "ifHigh": {"supplements": []}},
+        {"_id": "r2", "marker": "TSH", "ifLow": None},
+    ]
+    supplements = [
+        {"_id": "s1", "name": "Iron bisglycinate", "dosage": "25 mg", "productLink": None, "description": "d1", "is_active": True},
+        {"_id": "s2", "name": "Vitamin C", "dosage": "500 mg", "productLink": "https://x", "description": "d2"},
+    ]
+    snapshot = RangesSnapshot.build(1, docs, supplements)
+    low = snapshot.supplements_for(docs[0], "low")
+    assert [supp["id"] for supp in low] == ["s2", "s1"]
+    assert set(low[0]) == {"id", "name", "dosage", "productLink", "description"}
+    assert snapshot.supplements_for(docs[0], "high") == []
+    assert snapshot.supplements_for(docs[1], "low") == []
+
+
+def test_supplement_lists_are_copies():
+    docs = [{"_id": "r1", "marker": "Iron", "ifLow": {"supplements": ["s1"]}}]
+    snapshot = RangesSnapshot.build(1, docs, [{"_id": "s1", "name": "Iron"}])
+    snapshot.supplements_for(docs[0], "low")[0]["name"] = "edited"
+    assert snapshot.supplements_for(docs[0], "low")[0]["name"] == "Iron"
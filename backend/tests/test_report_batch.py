@@ -0,0 +1,77 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+from app.services import report_batch
+from app.auth.schemas import ReportRequest
+from app.services.report_batch import evaluate_batch, generate_medical_reports
+from app.services.report_service import evaluate
+from app.utils.constants import CANONICAL_PANELS
+
+VALUES = [0.0, 5, "7.5", None, "x", float("nan"), float("inf")]
+UNITS = ["", None, " ", "mg/dL", "MG/DL ", "%", "weird"]
+
+
+def _requests(seed_ranges, count, seed=3):
+    """Randomized submissions: canonical and odd marker keys, values around and outside the ranges, bad values and units."""
+    rng = random.Random(seed)
+    names = sorted({doc["marker"] for doc in seed_ranges}) + ["Total Protein", "TotalProtein", "AST SGOT", "Free T3", "Foo"]
+    panels = list(CANONICAL_PANELS) + ["Other"]
+    units = UNITS + sorted({doc.get("measurementUnits") or "" for doc in seed_ranges})
+    requests = []
+    for _ in range(count):
+        lab_reports = {}
+        for panel in rng.sample(panels, rng.randint(0, len(panels))):
+            lab_reports[panel] = {
+                marker: {"value": rng.choice(VALUES + [round(rng.uniform(-5, 400), 1)] * 4), "unit": rng.choice(units)}
+                for marker in rng.sample(names, rng.randint(0, 25))
+            }
+        requests.append({
+            "user_id": "u",
+            "gender_at_birth": rng.choice(["Male", "Female", "FEMALE", None]),
+            "gender": rng.choice(["Male", None]),
+            "menstruation_status": rng.choice(["None", "Menstruating", "menstruating", None]),
+            "bowel_movements": rng.choice(["Yes", "No", None]),
+            "lab_reports": lab_reports,
+        })
+    return requests
+
+
+def _dump(reports):
+    return [json.dumps(report, sort_keys=True, default=str) for report in reports]  # NaN-safe comparison
+
+
+@pytest.mark.skipif(report_batch.np is None, reason="NumPy not installed")
+def test_batch_matches_single_evaluation(catalog, seed_ranges):
+    requests = _requests(seed_ranges, 400)
+    assert _dump(evaluate_batch(requests, catalog)) == _dump([evaluate(request, catalog) for request in requests])
+
+
+def test_batch_without_numpy_falls_back_to_evaluate(catalog, seed_ranges, monkeypatch):
+    requests = _requests(seed_ranges, 20, seed=5)
+    monkeypatch.setattr(report_batch, "np", None)
+    assert _dump(evaluate_batch(requests, catalog)) == _dump([evaluate(request, catalog) for request in requests])
+
+
+def test_empty_batch(catalog):
+    assert evaluate_batch([], catalog) == []
+
+
+def test_generate_medical_reports_uses_the_catalog_snapshot(catalog, monkeypatch):
+    class FakeCatalog:
+        async def get_snapshot(self):
+            return catalog
+
+    monkeypatch.setattr(report_batch, "ranges_catalog", FakeCatalog())
+    requests = [
+        ReportRequest(
+            user_id=f"patient-{glucose}", age_over_18=True, bloodwork_within_6_months=True, gender="Female",
+            gender_at_birth="Female", pregnant_or_nursing=False, menstruation_status="None", bowel_movements="Yes",
+            lab_upload_option="manual", lab_reports={"Metabolic": {"Glucose": {"value": glucose, "unit": "mg/dL"}}},
+        )
+        for glucose in (92, 113)
+    ]
+    reports = asyncio.run(generate_medical_reports(requests))
+    assert _dump(reports) == _dump([evaluate(request, catalog) for request in requests])
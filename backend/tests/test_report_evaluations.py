@@ -0,0 +1,27 @@
+from app.services import report_service
+from app.services.report_service import MarkerEvaluations, evaluate_marker
+
+
+def test_evaluate_marker_classifies_against_functional_range(catalog):
+    assert evaluate_marker(catalog, "Glucose", 92, "mg/dL")["status"] == "normal"
+    high = evaluate_marker(catalog, "Glucose", 113, "mg/dL")
+    assert (high["status"], high["low"], high["high"], high["deviation"]) == ("high", 85, 99, 1.0)
+    assert evaluate_marker(catalog, "Glucose", 92, "mmol/L")["reason"] == "unit_mismatch"
+    assert evaluate_marker(catalog, "Glucose", "n/a", "mg/dL")["reason"] == "bad_values"
+    assert evaluate_marker(catalog, "Unlisted", 1, None) == {"marker": "Unlisted", "value": 1, "unit": None, "status": "unknown"}
+
+
+def test_each_distinct_marker_is_evaluated_once(catalog, monkeypatch):
+    calls = []
+
+    def counted(*args):
+        calls.append(args[1:4])
+        return evaluate_marker(*args)
+
+    monkeypatch.setattr(report_service, "evaluate_marker", counted)
+    evaluations = MarkerEvaluations(catalog, {"gender_at_birth": "Female"})
+    assert evaluations.out_of_range("Glucose", 113, "mg/dL")
+    assert evaluations("Glucose", 113, "mg/dL")["status"] == "high"
+    assert evaluations("Glucose", 113, "mg/dL") is evaluations("Glucose", 113, "mg/dL")
+    assert not evaluations.out_of_range("Glucose", 90, "mg/dL")
+    assert calls == [("Glucose", 113, "mg/dL"), ("Glucose", 90, "mg/dL")]
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+
+import pytest
+
+from app.services import report_rules
+from app.services.ranges_catalog import RangesSnapshot
+from app.services.report_rules import compile_report_rules, current_rules, marker_key_variants, reload_if_changed
+from app.services.report_service import evaluate
+
+RULES = {
+    "always_address": [
+        {"section": "Bowel support", "kind": "answer", "field": "bowel_movements", "values": ["No"], "message": "bowel"},
+        {
+            "section": "Vitamin D", "kind": "out_of_range", "panel": "Vitamin_D", "markers": ["25_Hydroxy_Vitamin_D"],
+            "message": "vitamin d", "missing_message": "test vitamin d",
+        },
+    ],
+    "priority_groups": [
+        {"name": "Thyroid", "markers": ["TSH", "Free_T4"]},
+        {"name": "Protein", "markers": ["Total_Protein", "Albumin"], "most_deviant_only": ["Total_Protein", "Albumin"]},
+    ],
+    "messages": {"TSH": "tsh message", "Albumin": {"low": "albumin low", "high": "albumin high"}},
+}
+
+DOCS = [
+    {"_id": "d", "marker": "25_Hydroxy_Vitamin_D", "functionalLow": 50, "functionalHigh": 80},
+    {"_id": "t", "marker": "TSH", "functionalLow": 1, "functionalHigh": 2},
+    {"_id": "f", "marker": "Free_T4", "functionalLow": 1, "functionalHigh": 1.5},
+    {"_id": "p", "marker": "Total_Protein", "functionalLow": 6.9, "functionalHigh": 7.4},
+    {"_id": "a", "marker": "Albumin", "functionalLow": 4.0, "functionalHigh": 5.0},
+    {"_id": "g", "marker": "Glucose", "functionalLow": 85, "functionalHigh": 99},
+]
+
+
+def _request(bowel="Yes", **panels):
+    return {"user_id": "u", "gender_at_birth": "Female", "bowel_movements": bowel, "lab_reports": panels}
+
+
+def _value(v):
+    return {"value": v, "unit": None}
+
+
+def test_compile_builds_indexes_and_messages():
+    rules = compile_report_rules(RULES, "7")
+    assert rules.version == "7"
+    assert rules.always_index[("Vitamin_D", "25_Hydroxy_Vitamin_D")] == ((1, 0),)
+    assert [hit.marker for hit in rules.priority_index["Total Protein"]] == ["Total_Protein"]
+    assert rules.groups[0].message == "Thyroid markers need attention."
+    assert rules.message_for("Albumin", "low") == "albumin low"
+    assert rules.message_for("Albumin", "high") == "albumin high"
+    assert rules.message_for("TSH", "low") == "tsh message"
+    assert rules.message_for("Glucose", "high") is None
+
+
+def test_compile_rejects_unknown_rule_kind():
+    with pytest.raises(ValueError):
+        compile_report_rules({"always_address": [{"section": "x", "kind": "sometimes", "message": "m"}]}, "1")
+
+
+def test_marker_key_variants_keep_marker_first():
+    assert marker_key_variants("Total_Protein") == ("Total_Protein", "Total Protein", "TotalProtein")
+
+
+def test_report_sections_follow_the_rules():
+    catalog = RangesSnapshot.build(1, DOCS, [])
+    rules = compile_report_rules(RULES, "7")
+    report = evaluate(_request(
+        bowel="No",
+        Vitamin_D={"25_Hydroxy_Vitamin_D": _value(30)},
+        Thyroid={"TSH": _value(1.5), "Free_T4": _value(1.2)},
+        CMP={"Total_Protein": _value(5.0), "Albumin": _value(3.9), "Glucose": _value(120)},
+    ), catalog, rules)
+
+    assert [section["section"] for section in report["always_address"]] == ["Bowel support", "Vitamin D"]
+    assert report["always_address"][1]["results"][0]["status"] == "low"
+    # Thyroid is all in range, so the Protein group is picked; only its most deviant marker is reported
+    assert report["priority_focus"]["priority"] == "Protein"
+    assert [r["marker"] for r in report["priority_focus"]["results"]] == ["Total_Protein"]
+    assert [r["marker"] for r in report["other_out_of_range"]] == ["Albumin", "Glucose"]
+    assert report["rules_version"] == "7"
+
+
+def test_missing_always_marker_uses_missing_message():
+    catalog = RangesSnapshot.build(1, DOCS, [])
+    report = evaluate(_request(), catalog, compile_report_rules(RULES, "7"))
+    assert report["always_address"] == [{"section": "Vitamin D", "message": "test vitamin d"}]
+    assert report["priority_focus"] is None
+
+
+def test_reload_keeps_rules_when_file_is_broken(tmp_path, monkeypatch):
+    path = tmp_path / "report_rules.json"
+    monkeypatch.setattr(report_rules, "RULES_JSON_PATH", path)
+    monkeypatch.setattr(report_rules, "_signature", None)
+    monkeypatch.setattr(report_rules, "_current", compile_report_rules({}, "1"))
+
+    path.write_text("{ broken")
+    assert not reload_if_changed()
+    assert current_rules().version == "1"
+
+    path.write_text(json.dumps(RULES))
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    assert reload_if_changed()
+    assert current_rules().version == hashlib.sha256(path.read_bytes()).hexdigest()[:12]
+    assert not reload_if_changed()
+
+
+def test_version_follows_the_rule_contents(tmp_path):
+    path = tmp_path / "report_rules.json"
+    path.write_text(json.dumps(RULES))
+    first = report_rules.load_report_rules(path).version
+    assert report_rules.load_report_rules(path).version == first
+
+    edited = json.loads(json.dumps(RULES))
+    edited["always_address"][0]["values"] = ["No", "Sometimes"]
+    path.write_text(json.dumps(edited))
+    assert report_rules.load_report_rules(path).version != first
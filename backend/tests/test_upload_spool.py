@@ -0,0 +1,61 @@
+import asyncio
+import base64
+import hashlib
+import io
+import json
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.config import settings
+from app.services.upload_spool import CHUNK_SIZE, SpooledUpload, data_url_payload, sniff_mime, spool_upload
+
+PDF = b"%PDF-1.4\n" + bytes(range(256)) * 2000  # spans several read chunks
+
+
+def _spool(data, filename="report.pdf"):
+    return asyncio.run(spool_upload(UploadFile(file=io.BytesIO(data), filename=filename)))
+
+
+def test_sniff_mime():
+    assert sniff_mime(b"%PDF-1.7") == "application/pdf"
+    assert sniff_mime(b"\x89PNG\r\n\x1a\n....") == "image/png"
+    assert sniff_mime(b"\xff\xd8\xff\xe0") == "image/jpeg"
+    assert sniff_mime(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "image/webp"
+    assert sniff_mime(b"GIF89a") is None
+
+
+def test_spool_upload_hashes_and_keeps_bytes():
+    upload = _spool(PDF, "Report.PDF")
+    assert (upload.filename, upload.mime, upload.size) == ("report.pdf", "application/pdf", len(PDF))
+    assert upload.sha256 == hashlib.sha256(PDF).hexdigest()
+    assert b"".join(upload.iter_chunks()) == PDF
+    assert len(next(upload.iter_chunks())) == CHUNK_SIZE
+    upload.close()
+
+
+def test_spool_upload_rejects_wrong_type_and_oversize(monkeypatch):
+    with pytest.raises(HTTPException) as error:
+        _spool(b"%PDF-1.4", "report.txt")
+    assert error.value.status_code == 400
+    with pytest.raises(HTTPException) as error:
+        _spool(b"not a pdf at all", "report.pdf")
+    assert error.value.status_code == 400
+
+    monkeypatch.setattr(settings, "OCR_MAX_UPLOAD_BYTES", 1000)
+    with pytest.raises(HTTPException) as error:
+        _spool(PDF)
+    assert error.value.status_code == 413
+
+
+def test_streamed_payload_is_the_json_body():
+    upload = SpooledUpload.from_bytes("report.pdf", "application/pdf", PDF)
+    payload = data_url_payload(upload, {"model": "m", "document": {"type": "document_url"}}, "document_url")
+
+    async def collect():
+        return b"".join([chunk async for chunk in payload])
+
+    body = asyncio.run(collect())
+    assert len(body) == payload.content_length
+    document = json.loads(body)["document"]
+    assert document["document_url"] == "data:application/pdf;base64," + base64.b64encode(PDF).decode()